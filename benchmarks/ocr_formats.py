@@ -0,0 +1,89 @@
+"""
+Compare the OCR output formats sent to the LLM.
+
+Reports the prompt token count of every format and, when a schema is given, the end-to-end latency
+(OCR + formatting + LLM) of the extraction.
+
+Usage:
+    python -m benchmarks.ocr_formats invoice.pdf scan.png [--schema schema.json] [--backend ollama] [--model mistral:7b]
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import json
+import mimetypes
+from time import perf_counter
+import tiktoken
+
+from src.container import llm_backends
+from src.entities.json_schema_entity import JsonSchemaEntity
+from src.enums.llm_backend_type import LLMBackendType
+from src.enums.ocr_output_format import OCROutputFormat
+from src.services.llm import interpret_text
+from src.services.ocr import extract_markup
+from src.services.ocr.format_markup import format_markup
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("files", nargs="+", help="Documents to extract.")
+    parser.add_argument("--schema", help="JSON schema file used to run the LLM.")
+    parser.add_argument(
+        "--backend",
+        default=LLMBackendType.OLLAMA.value,
+        choices=[backend.value for backend in LLMBackendType],
+        help="LLM backend, `stub` measures everything but the model.",
+    )
+    parser.add_argument("--model", help="Model, defaults to the backend's model.")
+    parser.add_argument("--language", default="en", help="Prompt language.")
+    parser.add_argument(
+        "--encoding",
+        default="cl100k_base",
+        help="tiktoken encoding used to approximate the model tokenizer.",
+    )
+    args = parser.parse_args()
+
+    encoding = tiktoken.get_encoding(args.encoding)
+    schema = None
+    if args.schema:
+        with open(args.schema) as schema_file:
+            schema = JsonSchemaEntity(**json.load(schema_file))
+
+    print(f"{'file':<30} {'format':<8} {'chars':>9} {'tokens':>8} {'latency (s)':>12}")
+    for path in args.files:
+        content_type, _ = mimetypes.guess_type(path)
+        with open(path, "rb") as file:
+            content = file.read()
+
+        start_time = perf_counter()
+        markup = extract_markup(content_type or "application/octet-stream", content)
+        ocr_time = perf_counter() - start_time
+
+        for format in OCROutputFormat:
+            start_time = perf_counter()
+            text = format_markup(markup, format)
+            if schema:
+                await interpret_text(
+                    llm_backends[LLMBackendType(args.backend)],
+                    text,
+                    schema.as_model(),
+                    schema.as_prompt_metadata(),
+                    model=args.model,
+                    prompt_json_schema=True,
+                    language=args.language,
+                    document_format=format,
+                )
+            latency = ocr_time + perf_counter() - start_time
+
+            print(
+                f"{path[-30:]:<30} {format.value:<8} {len(text):>9} "
+                f"{len(encoding.encode(text)):>8} {latency:>12.3f}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,117 @@
+"""
+Measure the S3 object I/O throughput of the async client against a local stand-in.
+
+Uploads, downloads (streamed) and deletes `--count` random objects of `--size` bytes with `--concurrency`
+requests in flight, reporting the objects per second and MB/s of each operation. The `filesystem` backend
+stores the objects in a temporary directory, `moto` mocks S3 in memory so the boto3 path is exercised too.
+
+Usage:
+    python -m benchmarks.s3_throughput [--backend filesystem|moto] [--count 200] [--size 1048576] [--concurrency 16]
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import tempfile
+from time import perf_counter
+
+from src.entities.s3_file_entity import S3FileEntity
+from src.infrastructure.S3 import S3Client, S3Config
+from src.infrastructure.S3.async_s3_client import AsyncS3Client
+from src.infrastructure.S3.filesystem_client import FilesystemS3Client
+
+
+def create_backend(
+    backend: str, stack: contextlib.ExitStack, concurrency: int
+) -> S3Client | FilesystemS3Client:
+    if backend == "filesystem":
+        return FilesystemS3Client(
+            stack.enter_context(tempfile.TemporaryDirectory()), "benchmark"
+        )
+
+    from moto import mock_aws
+
+    stack.enter_context(mock_aws())
+    return S3Client(
+        S3Config(
+            url="https://s3.amazonaws.com",
+            access_key="benchmark",
+            secret_access_key="benchmark",
+            region="us-east-1",
+            bucket="benchmark",
+            max_pool_connections=concurrency,
+        )
+    )
+
+
+async def measure(
+    name: str, count: int, size: int, concurrency: int, operation
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int) -> None:
+        async with semaphore:
+            await operation(index)
+
+    start_time = perf_counter()
+    await asyncio.gather(*(run(index) for index in range(count)))
+    elapsed = perf_counter() - start_time
+    print(
+        f"{name:<10} {elapsed:>9.2f} {count / elapsed:>10.1f} {count * size / elapsed / 1024**2:>10.1f}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--backend", choices=["filesystem", "moto"], default="filesystem"
+    )
+    parser.add_argument("--count", type=int, default=200, help="Amount of objects.")
+    parser.add_argument(
+        "--size", type=int, default=1024 * 1024, help="Object size in bytes."
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Requests in flight."
+    )
+    args = parser.parse_args()
+
+    with contextlib.ExitStack() as stack:
+        s3_client = AsyncS3Client(
+            create_backend(args.backend, stack, args.concurrency),
+            max_concurrency=args.concurrency,
+        )
+        await s3_client.create_butcket()
+
+        files = [
+            S3FileEntity(ext=".bin", content=os.urandom(args.size))
+            for _ in range(args.count)
+        ]
+        keys = [file.key for file in files]
+
+        async def upload(index: int) -> None:
+            await s3_client.upload_fileobj(
+                keys[index], io.BytesIO(files[index].content)
+            )
+
+        async def download(index: int) -> None:
+            async for _ in s3_client.stream_file(keys[index]):
+                pass
+
+        async def delete(index: int) -> None:
+            await s3_client.delete_file(keys[index])
+
+        print(f"{'operation':<10} {'time (s)':>9} {'objects/s':>10} {'MB/s':>10}")
+        await measure("upload", args.count, args.size, args.concurrency, upload)
+        await measure("download", args.count, args.size, args.concurrency, download)
+        await measure("delete", args.count, 0, args.concurrency, delete)
+        s3_client.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -19,7 +19,20 @@ from fastapi.concurrency import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from src.infrastructure.mongodb import load_collection, MongoConfig
-from src.controllers import files_controller, schemas_controller, pipelines_controller
+from src.container import (
+    s3_client,
+    ocr_pool,
+    llm_pool,
+    embedding_pool,
+    jobs_service,
+    model_router_service,
+)
+from src.controllers import (
+    files_controller,
+    schemas_controller,
+    pipelines_controller,
+    metrics_controller,
+)
 from src.logger import logger, log_context
 
 
@@ -29,8 +42,16 @@ async def lifespan(app: FastAPI):
     await load_collection(
         MongoConfig(user=os.getenv("DB_USER"), password=os.getenv("DB_PASSWORD"))
     )
+    await ocr_pool.start()
+    await model_router_service.start()
+    await jobs_service.start()
     yield
     # Execute after the application has finished
+    await jobs_service.stop()
+    ocr_pool.shutdown()
+    llm_pool.shutdown()
+    embedding_pool.shutdown()
+    s3_client.shutdown()
 
 
 app = FastAPI(
@@ -78,9 +99,12 @@ async def logging_middleware(request: Request, call_next):
 async def http_exception_handler(request, exc):
     message = str(exc.detail)
 
-    return JSONResponse({"message": message}, status_code=exc.status_code)
+    return JSONResponse(
+        {"message": message}, status_code=exc.status_code, headers=exc.headers
+    )
 
 
 app.include_router(files_controller.router)
 app.include_router(schemas_controller.router)
 app.include_router(pipelines_controller.router)
+app.include_router(metrics_controller.router)
@@ -8,8 +8,10 @@ def validate_token(token: str = Depends(get_bearer_token)):
     return JsonWebToken(token).validate()
 
 
-def get_current_user(token: str = Depends(get_bearer_token)) -> str:
-    return JsonWebToken(token).decode()["sub"].replace("auth0|", "")
+# FastAPI caches dependency results per request, so depending on `validate_token`
+# shares a single token verification with the router and `PermissionsValidator`
+def get_current_user(token: dict = Depends(validate_token)) -> str:
+    return token["sub"].replace("auth0|", "")
 
 
 class PermissionsValidator:
@@ -17,7 +19,7 @@ class PermissionsValidator:
         self.required_permissions = required_permissions
 
     def __call__(self, token: str = Depends(validate_token)):
-        token_permissions = token.get("permissions")
+        token_permissions = token.get("permissions", [])
         token_permissions_set = set(token_permissions)
         required_permissions_set = set(self.required_permissions)
 
@@ -1,12 +1,97 @@
 from datetime import timedelta
+from functools import lru_cache
 import logging
 import os
+import threading
+import time
 import jwt
 from dataclasses import dataclass
 
 from src.logger import logger
 from .custom_exceptions import BadCredentialsException, UnableCredentialsException
 
+JWKS_CACHE_TTL = int(os.getenv("JWKS_CACHE_TTL", "3600"))
+"""
+Seconds the fetched signing keys are trusted before being refreshed.
+"""
+
+JWKS_MIN_REFRESH_INTERVAL = int(os.getenv("JWKS_MIN_REFRESH_INTERVAL", "30"))
+"""
+Minimum seconds between refreshes triggered by unknown key ids, so forged tokens cannot flood the JWKS endpoint.
+"""
+
+
+class JwksCache:
+    """
+    Process-wide cache of the JWKS signing keys.
+
+    Keys are refreshed when the TTL expires or an unknown key id shows up (key rotation). Refreshes are single-flight:
+    concurrent requests wait for the one in progress instead of fetching the JWKS again.
+    """
+
+    def __init__(self, jwks_uri: str) -> None:
+        self._jwks_uri = jwks_uri
+        self._lock = threading.Lock()
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+
+    def get_signing_key(self, kid: str) -> jwt.PyJWK:
+        fetched_at = self._fetched_at
+        key = self._keys.get(kid)
+        if key is not None and not self._is_expired():
+            return key
+
+        with self._lock:
+            # Another request refreshed the keys while this one was waiting
+            if self._fetched_at != fetched_at:
+                key = self._keys.get(kid)
+                if key is not None:
+                    return key
+
+            if key is not None or self._can_refresh():
+                try:
+                    self._refresh()
+                except jwt.exceptions.PyJWKClientError as ex:
+                    if key is None:
+                        raise
+                    # Keep serving the known key while the JWKS endpoint is unreachable
+                    logger.log(logging.WARNING, f"Unable to refresh JWKS: {ex}")
+                    return key
+
+            key = self._keys.get(kid)
+            if key is None:
+                raise jwt.exceptions.PyJWKClientError(
+                    f'Unable to find a signing key that matches: "{kid}"'
+                )
+            return key
+
+    def _is_expired(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at > JWKS_CACHE_TTL
+        )
+
+    def _can_refresh(self) -> bool:
+        return (
+            self._fetched_at is None
+            or time.monotonic() - self._fetched_at > JWKS_MIN_REFRESH_INTERVAL
+        )
+
+    def _refresh(self) -> None:
+        data = jwt.PyJWKClient(self._jwks_uri, cache_jwk_set=False).fetch_data()
+        try:
+            jwk_set = jwt.PyJWKSet.from_dict(data)
+        except jwt.exceptions.PyJWKSetError as ex:
+            # An empty or invalid JWKS response is handled like an unreachable endpoint
+            raise jwt.exceptions.PyJWKClientError(f"Invalid JWKS: {ex}") from ex
+        self._keys = {key.key_id: key for key in jwk_set.keys}
+        self._fetched_at = time.monotonic()
+
+
+@lru_cache(maxsize=None)
+def get_jwks_cache(jwks_uri: str) -> JwksCache:
+    return JwksCache(jwks_uri)
+
 
 @dataclass
 class JsonWebToken:
@@ -33,10 +118,8 @@ class JsonWebToken:
             raise BadCredentialsException
 
     def decode(self):
-        jwks_client = jwt.PyJWKClient(self.jwks_uri)
-        jwt_signing_key = jwks_client.get_signing_key_from_jwt(
-            self.jwt_access_token
-        ).key
+        kid = jwt.get_unverified_header(self.jwt_access_token).get("kid")
+        jwt_signing_key = get_jwks_cache(self.jwks_uri).get_signing_key(kid).key
         payload = jwt.decode(
             self.jwt_access_token,
             jwt_signing_key,
@@ -0,0 +1,152 @@
+# Wiring of the application services, kept out of `src/__init__.py` so spawned OCR workers importing
+# `src.services.ocr` do not build the S3 and Mongo clients
+import os
+from .services.rag_pipeline_service import RAGPipelineService
+from .services.files_service import FilesService
+from .services.jobs_service import JobsService
+from .services.ocr_cache_service import OCRCacheService
+from .services.schema_cache_service import SchemaCacheService
+from .services.retrieval_service import RetrievalService
+from .services.model_router_service import ModelRouterService
+from .services.ocr import OCR_CONFIG_VERSION, OCR_POOL_WORKERS
+from .services.llm import (
+    LLM_MODEL,
+    LLM_SMALL_MODEL,
+    OPENAI_MODEL,
+    OPENAI_SMALL_MODEL,
+    LLM_STUB_LATENCY,
+)
+from .services.llm.backends.ollama_backend import OllamaBackend
+from .services.llm.backends.openai_backend import OpenAIBackend
+from .services.llm.backends.stub_backend import StubBackend
+from .enums.llm_backend_type import LLMBackendType
+from .infrastructure.S3 import S3Client, S3Config
+from .infrastructure.S3.async_s3_client import AsyncS3Client
+from .infrastructure.S3.filesystem_client import FilesystemS3Client
+from .infrastructure.mongodb import (
+    FilesCollection,
+    SchemasCollection,
+    OCRResultsCollection,
+    JobsCollection,
+    ExtractionsCollection,
+)
+from .infrastructure.workers import WorkerPool, WorkerPoolConfig
+
+
+if os.getenv("S3_BACKEND", "s3") == "filesystem":
+    # Local stand-in for development and offline benchmarks
+    s3_backend = FilesystemS3Client(
+        os.getenv("S3_FILESYSTEM_ROOT", ".s3"), os.getenv("S3_BUCKET", "docuxtract")
+    )
+else:
+    s3_backend = S3Client(
+        S3Config(
+            url=os.getenv("S3_URL"),
+            access_key=os.getenv("S3_ACESS_KEY"),
+            secret_access_key=os.getenv("S3_SECRET_KEY"),
+            bucket=os.getenv("S3_BUCKET"),
+            region=os.getenv("S3_REGION"),
+            multipart_threshold=int(
+                os.getenv("S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024)
+            ),
+            multipart_chunksize=int(
+                os.getenv("S3_MULTIPART_CHUNKSIZE", 8 * 1024 * 1024)
+            ),
+            multipart_concurrency=int(os.getenv("S3_MULTIPART_CONCURRENCY", "4")),
+            max_pool_connections=int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32")),
+            max_attempts=int(os.getenv("S3_MAX_ATTEMPTS", "5")),
+            retry_mode=os.getenv("S3_RETRY_MODE", "standard"),
+        )
+    )
+
+# Blocking S3 calls run in a bounded thread pool instead of on the event loop
+s3_client = AsyncS3Client(
+    s3_backend, max_concurrency=int(os.getenv("S3_MAX_CONCURRENCY", "8"))
+)
+
+# CPU bound OCR work (Tesseract, OpenCV, pdf2image) runs in separate processes
+ocr_pool = WorkerPool(
+    WorkerPoolConfig(
+        name="ocr",
+        kind="process",
+        max_workers=OCR_POOL_WORKERS,
+        max_queue=int(os.getenv("OCR_POOL_MAX_QUEUE", "16")),
+        max_tasks_per_child=int(os.getenv("OCR_POOL_MAX_TASKS_PER_CHILD", "50")),
+    )
+)
+
+# LLM calls are async I/O on the event loop, the pool only bounds how many run against the server
+llm_pool = WorkerPool(
+    WorkerPoolConfig(
+        name="llm",
+        kind="async",
+        max_workers=int(os.getenv("LLM_MAX_CONCURRENCY", "2")),
+        max_queue=int(os.getenv("LLM_MAX_QUEUE", "8")),
+    )
+)
+
+# Embedding models run on torch, which releases the GIL, a thread keeps the model loaded once
+embedding_pool = WorkerPool(
+    WorkerPoolConfig(
+        name="embedding",
+        kind="thread",
+        max_workers=int(os.getenv("EMBEDDING_POOL_WORKERS", "1")),
+        max_queue=int(os.getenv("EMBEDDING_POOL_MAX_QUEUE", "16")),
+    )
+)
+
+llm_backends = {
+    LLMBackendType.OLLAMA: OllamaBackend(
+        os.getenv("OLLAMA_HOST"), LLM_MODEL, LLM_SMALL_MODEL
+    ),
+    LLMBackendType.OPENAI: OpenAIBackend(
+        os.getenv("OPENAI_BASE_URL"),
+        os.getenv("OPENAI_API_KEY", ""),
+        OPENAI_MODEL,
+        OPENAI_SMALL_MODEL,
+    ),
+    # Deterministic stand-in for the model, benchmarks everything else offline
+    LLMBackendType.STUB: StubBackend(LLM_STUB_LATENCY),
+}
+
+files_collection = FilesCollection()
+schemas_collection = SchemasCollection()
+ocr_results_collection = OCRResultsCollection()
+jobs_collection = JobsCollection()
+extractions_collection = ExtractionsCollection()
+
+files_service = FilesService(s3_client, files_collection)
+ocr_cache_service = OCRCacheService(
+    ocr_results_collection,
+    version=OCR_CONFIG_VERSION,
+    max_entries=int(os.getenv("OCR_CACHE_MAX_ENTRIES", "128")),
+)
+schema_cache_service = SchemaCacheService(
+    max_entries=int(os.getenv("SCHEMA_CACHE_MAX_ENTRIES", "256"))
+)
+retrieval_service = RetrievalService(
+    embedding_pool,
+    max_documents=int(os.getenv("RETRIEVAL_INDEX_MAX_DOCUMENTS", "64")),
+)
+model_router_service = ModelRouterService()
+rag_pipeline_service = RAGPipelineService(
+    files_service,
+    s3_client,
+    ocr_cache_service,
+    schema_cache_service,
+    extractions_collection,
+    retrieval_service,
+    model_router_service,
+    ocr_pool=ocr_pool,
+    llm_pool=llm_pool,
+    llm_backends=llm_backends,
+)
+jobs_service = JobsService(
+    jobs_collection,
+    schemas_collection,
+    files_service,
+    rag_pipeline_service,
+    workers=int(os.getenv("JOBS_WORKERS", "2")),
+    max_queue=int(os.getenv("JOBS_MAX_QUEUE", "100")),
+    lease=float(os.getenv("JOBS_LEASE_SECONDS", "60")),
+)
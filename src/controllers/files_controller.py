@@ -1,29 +1,107 @@
 import logging
-from io import BytesIO
 import os
-from fastapi import APIRouter, HTTPException, UploadFile
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Response, UploadFile
 from fastapi.responses import StreamingResponse
-from src import files_service
+from src.container import files_service
 from src.logger import logger
+from src.utils.hashing_upload import HashingRoute
 
-router = APIRouter(prefix="/files", tags=["Files"])
+router = APIRouter(prefix="/files", tags=["Files"], route_class=HashingRoute)
 
 
-@router.get("/{key}")
-async def download_file(key: str) -> StreamingResponse:
+@router.get(
+    "/{key}",
+    responses={
+        "206": {"description": "The requested byte range of the file."},
+        "304": {"description": "The file matches the `If-None-Match` ETag."},
+        "416": {"description": "The requested byte range is not satisfiable."},
+    },
+)
+async def download_file(
+    key: str,
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+) -> StreamingResponse:
     try:
-        # file = await files_collection.find_by_key(key)
-        # s3_file = S3Client.download_file(file.key)
-        filename, content = await files_service.download_file(key)
-        return StreamingResponse(
-            BytesIO(content),
-            media_type="application/octet-stream",
-            headers={"Content-Disposition": f"attachment; filename={filename}"},
-        )
+        file = await files_service.find_file(key)
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         raise HTTPException(status_code=500, detail=str(ex))
 
+    if file is None:
+        raise HTTPException(status_code=404, detail=f"File {key} not found")
+
+    # Keys are the content hash, so the key itself is a strong ETag of the stored file
+    etag = f'"{key}"'
+    if if_none_match is not None and _matches_etag(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    filename, size = file
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Content-Disposition": f"attachment; filename={filename}",
+    }
+
+    byte_range = None
+    if range is not None and (if_range is None or if_range.strip() == etag):
+        byte_range = _parse_range(range, size)
+
+    # Chunks are read in the S3 client thread pool, without blocking the event loop
+    if byte_range is None:
+        return StreamingResponse(
+            files_service.stream_file(key),
+            media_type="application/octet-stream",
+            headers={**headers, "Content-Length": str(size)},
+        )
+
+    start, end = byte_range
+    return StreamingResponse(
+        files_service.stream_file(key, start, end),
+        status_code=206,
+        media_type="application/octet-stream",
+        headers={
+            **headers,
+            "Content-Length": str(end - start + 1),
+            "Content-Range": f"bytes {start}-{end}/{size}",
+        },
+    )
+
+
+def _matches_etag(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _parse_range(range: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single `bytes` range into inclusive offsets, other ranges are ignored and the whole file is served.
+    """
+    unit, _, ranges = range.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        return None
+
+    first, _, last = ranges.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            # Suffix range, the last N bytes
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+
+    if start > end or start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail=f"Range {range} not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
 
 @router.post("", status_code=204)
 async def upload_file(file: UploadFile) -> None:
@@ -38,7 +116,9 @@ async def upload_file(file: UploadFile) -> None:
         #         FileEntity(name=file.filename, key=s3_file.key)
         #     )
         name, ext = os.path.splitext(file.filename)
-        await files_service.upload_file(name, ext, await file.read())
+        await files_service.upload_stream(name, ext, file)
+    except HTTPException:
+        raise
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         raise HTTPException(status_code=500, detail=str(ex))
@@ -50,6 +130,8 @@ async def delete_file(key: str) -> StreamingResponse:
         # file = await files_collection.find_by_key(key)
         # s3_file = S3Client.download_file(file.key)
         await files_service.delete_file(key)
+    except HTTPException:
+        raise
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         raise HTTPException(status_code=500, detail=str(ex))
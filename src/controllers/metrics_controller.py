@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends
+
+from src.auth.dependencies import validate_token
+from src.container import ocr_pool, llm_pool, embedding_pool, model_router_service
+from src.infrastructure.workers import WorkerPoolStats
+from src.services.model_router_service import ModelRouteStats
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("/pools", dependencies=[Depends(validate_token)])
+async def get_pools_metrics() -> list[WorkerPoolStats]:
+    """
+    Current saturation of the OCR, LLM and embedding worker pools, used to size the replicas.
+    """
+    return [ocr_pool.stats(), llm_pool.stats(), embedding_pool.stats()]
+
+
+@router.get("/routes", dependencies=[Depends(validate_token)])
+async def get_routes_metrics() -> list[ModelRouteStats]:
+    """
+    Requests and latency of every model route, used to tune the routing thresholds.
+    """
+    return model_router_service.stats()
@@ -1,18 +1,47 @@
 import logging
 
 import os
-from typing import Any
-from fastapi import APIRouter, Depends, File, Query, UploadFile
-from fastapi.responses import JSONResponse
+from typing import Any, Optional
+from beanie import PydanticObjectId
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    HTTPException,
+    Query,
+    UploadFile,
+)
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from ..auth.dependencies import validate_token
-from ..services.ocr import extract_markup
-from src import schemas_collection, rag_pipeline_service
+from ..auth.dependencies import (
+    PermissionsValidator,
+    get_current_user,
+    validate_token,
+)
+from ..dtos.batch_document_dto import BatchDocumentDto
+from ..dtos.extraction_dto import ExtractionDto
+from ..dtos.job_dto import JobDto
+from ..entities.job_entity import JobEntity
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+from ..services.ocr.format_markup import format_markup
+from ..utils.hashing_upload import HashingRoute, upload_key
+from src.container import (
+    schemas_collection,
+    files_service,
+    rag_pipeline_service,
+    ocr_cache_service,
+    jobs_service,
+    extractions_collection,
+)
 from src.logger import logger
-from llama_index.llms.ollama import Ollama
 
 router = APIRouter(
-    prefix="/pipelines", tags=["Pipelines"], dependencies=[Depends(validate_token)]
+    prefix="/pipelines",
+    tags=["Pipelines"],
+    dependencies=[Depends(validate_token)],
+    route_class=HashingRoute,
 )
 
 
@@ -32,12 +61,38 @@ router = APIRouter(
     },
 )
 async def ocr_pipeline(
-    file: UploadFile = File(..., description="File to process through OCR.")
+    file: UploadFile = File(..., description="File to process through OCR."),
+    format: OCROutputFormat = Query(
+        OCROutputFormat.ALTO, description="The format of the OCR output."
+    ),
 ) -> str:
     """
     Run only the OCR tool and return OCR processing.
     """
-    return extract_markup(file.content_type, await file.read()).decode("utf-8")
+    _, ext = os.path.splitext(file.filename)
+    key = await upload_key(file, ext)
+
+    markup = await rag_pipeline_service.extract_markup(
+        key, file.content_type, file.read
+    )
+    return format_markup(markup, format)
+
+
+@router.delete(
+    "/ocr/cache",
+    dependencies=[Depends(PermissionsValidator(["delete:ocr-cache"]))],
+)
+async def invalidate_ocr_cache(
+    key: Optional[str] = Query(
+        None,
+        description="The file key to invalidate, when omitted every OCR output from previous configuration versions is dropped.",
+    )
+) -> dict[str, Any]:
+    """
+    Invalidate cached OCR outputs, e.g. after changing the preprocessing settings.
+    """
+    deleted = await ocr_cache_service.invalidate(key)
+    return {"version": ocr_cache_service.version, "deleted": deleted}
 
 
 @router.post(
@@ -79,6 +134,19 @@ async def rag_pipeline(
     file: UploadFile = File(
         ..., description="File to be processed through the RAG pipeline."
     ),
+    format: Optional[OCROutputFormat] = Query(
+        None,
+        description="The format of the OCR output sent to the LLM, overrides the schema's format.",
+    ),
+    backend: Optional[LLMBackendType] = Query(
+        None,
+        description="The backend running the LLM, overrides the schema's backend.",
+    ),
+    refresh: bool = Query(
+        False,
+        description="Run the extraction again instead of returning a stored result of an identical extraction.",
+    ),
+    user: str = Depends(get_current_user),
 ) -> dict[str, Any]:
     """
     Process the document with the specific schema through the RAG Pipeline.
@@ -87,12 +155,261 @@ async def rag_pipeline(
         entity = await schemas_collection.find_by_id(id)
 
         result = await rag_pipeline_service.process(
-            file, entity.json_schema, language=entity.language
+            file,
+            entity.json_schema,
+            schema_id=id,
+            user=user,
+            language=entity.language,
+            ocr_format=format or entity.ocr_format,
+            extraction_mode=entity.extraction_mode,
+            llm_backend=backend or entity.llm_backend,
+            refresh=refresh,
         )
         return JSONResponse(status_code=200, content=result.model_dump())
+    except HTTPException:
+        raise
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         return JSONResponse(
             status_code=500,
             content={"message": str(ex)},
         )
+
+
+@router.post(
+    "/rag/batch",
+    responses={
+        "200": {
+            "description": "One JSON result per line, streamed as each document completes.",
+            "content": {
+                "application/x-ndjson": {
+                    "example": """
+                    {"index": 1, "name": "invoice-2.pdf", "key": "5d41...c2.pdf", "status": 200, "result": {"due_date": "2024-09-27"}, "error": null}
+                    {"index": 0, "name": "invoice-1.pdf", "key": "7b52...e1.pdf", "status": 500, "result": null, "error": "Unsupported content type application/zip"}
+                    """
+                }
+            },
+        }
+    },
+)
+async def rag_batch_pipeline(
+    id: str = Query(
+        ..., description="The output schema's ID to be used in the pipeline."
+    ),
+    files: list[UploadFile] = File(
+        [], description="Files to be processed through the RAG pipeline."
+    ),
+    keys: list[str] = Form(
+        [], description="Keys of already uploaded files to be processed."
+    ),
+    format: Optional[OCROutputFormat] = Query(
+        None,
+        description="The format of the OCR output sent to the LLM, overrides the schema's format.",
+    ),
+    backend: Optional[LLMBackendType] = Query(
+        None,
+        description="The backend running the LLM, overrides the schema's backend.",
+    ),
+    user: str = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Process many documents with the same schema through the RAG Pipeline, streaming the results as NDJSON.
+    """
+    if not files and not keys:
+        raise HTTPException(status_code=400, detail="No files or keys to process")
+
+    entity = await schemas_collection.find_by_id(id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail=f"Schema {id} not found")
+
+    # Uploaded files are closed by the route once the response is sent, each one is read when processed
+    documents = [
+        BatchDocumentDto(name=file.filename, content_type=file.content_type, file=file)
+        for file in files
+    ] + [BatchDocumentDto(name=key, key=key) for key in keys]
+
+    results = rag_pipeline_service.extract_batch(
+        documents,
+        entity.json_schema,
+        schema_id=id,
+        user=user,
+        language=entity.language,
+        ocr_format=format or entity.ocr_format,
+        extraction_mode=entity.extraction_mode,
+        llm_backend=backend or entity.llm_backend,
+    )
+    return StreamingResponse(
+        (result.model_dump_json() + "\n" async for result in results),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.post(
+    "/rag/stream",
+    responses={
+        "200": {
+            "description": "One JSON event per line, the OCR progress per page, the fields extracted so far and the validated result.",
+            "content": {
+                "application/x-ndjson": {
+                    "example": """
+                    {"event": "ocr_page", "page": 2, "pages": 2}
+                    {"event": "ocr_page", "page": 1, "pages": 2}
+                    {"event": "ocr"}
+                    {"event": "partial", "data": {"due_date": "2024-09-27"}}
+                    {"event": "partial", "data": {"due_date": "2024-09-27", "bill_to_name": "BTG Pactual"}}
+                    {"event": "result", "data": {"due_date": "2024-09-27", "bill_to_name": "BTG Pactual", "items": []}}
+                    """
+                }
+            },
+        }
+    },
+)
+async def rag_stream_pipeline(
+    id: str = Query(
+        ..., description="The output schema's ID to be used in the pipeline."
+    ),
+    file: UploadFile = File(
+        ..., description="File to be processed through the RAG pipeline."
+    ),
+    format: Optional[OCROutputFormat] = Query(
+        None,
+        description="The format of the OCR output sent to the LLM, overrides the schema's format.",
+    ),
+    backend: Optional[LLMBackendType] = Query(
+        None,
+        description="The backend running the LLM, overrides the schema's backend.",
+    ),
+    refresh: bool = Query(
+        False,
+        description="Run the extraction again instead of returning a stored result of an identical extraction.",
+    ),
+    user: str = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Process the document with the specific schema through the RAG Pipeline, streaming its progress as NDJSON.
+    """
+    entity = await schemas_collection.find_by_id(id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail=f"Schema {id} not found")
+
+    name, ext = os.path.splitext(file.filename)
+    key = await files_service.upload_stream(name, ext, file)
+
+    # The uploaded file is closed once the response starts streaming, so it is read upfront
+    await file.seek(0)
+    content = await file.read()
+
+    events = rag_pipeline_service.extract_stream(
+        key,
+        file.content_type,
+        content,
+        entity.json_schema,
+        schema_id=id,
+        user=user,
+        language=entity.language,
+        ocr_format=format or entity.ocr_format,
+        extraction_mode=entity.extraction_mode,
+        llm_backend=backend or entity.llm_backend,
+        refresh=refresh,
+    )
+    return StreamingResponse(
+        (event.model_dump_json(exclude_none=True) + "\n" async for event in events),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/extractions/{key}")
+async def list_extractions(
+    key: str, user: str = Depends(get_current_user)
+) -> list[ExtractionDto]:
+    """
+    List the stored extractions of a file run by the current user, newest first.
+    """
+    return [
+        ExtractionDto(
+            id=str(extraction.id),
+            file_key=extraction.file_key,
+            schema_id=extraction.schema_id,
+            schema_hash=extraction.schema_hash,
+            backend=extraction.backend,
+            model=extraction.model,
+            prompt_version=extraction.prompt_version,
+            ocr_format=extraction.ocr_format,
+            extraction_mode=extraction.extraction_mode,
+            language=extraction.language,
+            query=extraction.query,
+            result=extraction.result,
+            created_at=extraction.created_at,
+        )
+        for extraction in await extractions_collection.find_by_file_key(key, user)
+    ]
+
+
+def to_job_dto(job: JobEntity) -> JobDto:
+    return JobDto(
+        id=str(job.id),
+        status=job.status,
+        file_key=job.file_key,
+        schema_id=job.schema_id,
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    id: str = Query(
+        ..., description="The output schema's ID to be used in the pipeline."
+    ),
+    file: UploadFile = File(
+        ..., description="File to be processed through the RAG pipeline."
+    ),
+    format: Optional[OCROutputFormat] = Query(
+        None,
+        description="The format of the OCR output sent to the LLM, overrides the schema's format.",
+    ),
+    backend: Optional[LLMBackendType] = Query(
+        None,
+        description="The backend running the LLM, overrides the schema's backend.",
+    ),
+    user: str = Depends(get_current_user),
+) -> JobDto:
+    """
+    Queue the document to be processed through the RAG Pipeline, returning the job to poll for the result.
+    """
+    entity = await schemas_collection.find_by_id(id)
+    if entity is None:
+        raise HTTPException(status_code=404, detail=f"Schema {id} not found")
+
+    name, ext = os.path.splitext(file.filename)
+    key = await files_service.upload_stream(name, ext, file)
+
+    job = await jobs_service.enqueue(user, key, file.content_type, id, format, backend)
+    return to_job_dto(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(
+    job_id: str,
+    wait: float = Query(
+        0,
+        ge=0,
+        le=30,
+        description="Seconds to wait for the job to finish before returning its current state.",
+    ),
+    user: str = Depends(get_current_user),
+) -> JobDto:
+    """
+    Return the job state and, once succeeded, the extracted data.
+    """
+    job = None
+    if PydanticObjectId.is_valid(job_id):
+        job = await jobs_service.wait(job_id, wait)
+
+    if job is None or job.user != user:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    return to_job_dto(job)
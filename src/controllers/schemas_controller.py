@@ -11,7 +11,7 @@ from ..dtos.json_schema_dto import JsonSchemaDto
 from ..dtos.schema_dto import SchemaDto
 from ..entities.json_schema_entity import JsonSchemaEntity
 from ..entities.schema_entity import SchemaEntity
-from src import schemas_collection
+from src.container import schemas_collection, schema_cache_service
 from src.logger import logger
 
 router = APIRouter(
@@ -53,6 +53,9 @@ async def get_schemas(
                 name=schema.name,
                 language=schema.language,
                 json_schema=JsonSchemaDto(**schema.json_schema.model_dump()),
+                ocr_format=schema.ocr_format,
+                extraction_mode=schema.extraction_mode,
+                llm_backend=schema.llm_backend,
             ),
             await schemas_collection.get_all(current_user),
         )
@@ -95,6 +98,9 @@ async def get_schemas(
             name=schema.name,
             language=schema.language,
             json_schema=JsonSchemaDto(**schema.json_schema.model_dump()),
+            ocr_format=schema.ocr_format,
+            extraction_mode=schema.extraction_mode,
+            llm_backend=schema.llm_backend,
         )
     except Exception as ex:
         logger.log(logging.ERROR, ex)
@@ -123,12 +129,16 @@ async def create_or_update_schema(
             name=schema.name,
             language=schema.language,
             json_schema=json_schema_entity,
+            ocr_format=schema.ocr_format,
+            extraction_mode=schema.extraction_mode,
+            llm_backend=schema.llm_backend,
         )
 
         if schema.id == None:
             await schemas_collection.insert(schema_entity)
         else:
             await schemas_collection.replace(schema_entity)
+            schema_cache_service.invalidate(schema.id)
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         return JSONResponse(
@@ -150,6 +160,7 @@ async def get_schemas(
                 content={"message": f"Schema {id} is not owner by the current user"},
             )
         await schemas_collection.delete(schema)
+        schema_cache_service.invalidate(id)
     except Exception as ex:
         logger.log(logging.ERROR, ex)
         raise HTTPException(status_code=500, detail=f"{str(ex)}")
@@ -0,0 +1,35 @@
+from typing import Any, Optional
+from fastapi import UploadFile
+from pydantic import BaseModel, Field
+
+
+class BatchDocumentDto(BaseModel):
+    name: str
+    """
+    The uploaded filename or the file key, used to identify the document in the results.
+    """
+
+    key: Optional[str] = Field(None)
+    """
+    The key of an already uploaded file, when set the content is downloaded from S3 only if its OCR output is not
+    cached.
+    """
+
+    content_type: Optional[str] = Field(None)
+    file: Optional[UploadFile] = Field(None)
+    """
+    The uploaded file, read only when the document is processed.
+    """
+
+
+class BatchResultDto(BaseModel):
+    index: int
+    """
+    The document position in the request, results are streamed in completion order.
+    """
+
+    name: str
+    key: Optional[str] = Field(None)
+    status: int
+    result: Optional[dict[str, Any]] = Field(None)
+    error: Optional[str] = Field(None)
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+from ..enums.extraction_mode import ExtractionMode
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+
+
+class ExtractionDto(BaseModel):
+    id: str
+    file_key: str
+    schema_id: Optional[str] = Field(None)
+    schema_hash: str
+    backend: LLMBackendType
+    model: Optional[str] = Field(None)
+    prompt_version: str
+    ocr_format: OCROutputFormat
+    extraction_mode: ExtractionMode
+    language: Optional[str] = Field(None)
+    query: Optional[str] = Field(None)
+    result: dict[str, Any]
+    created_at: datetime
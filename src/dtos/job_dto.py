@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+from ..enums.job_status import JobStatus
+
+
+class JobDto(BaseModel):
+    id: str
+    status: JobStatus
+    file_key: str
+    schema_id: str
+    result: Optional[dict[str, Any]] = Field(None)
+    error: Optional[str] = Field(None)
+    created_at: datetime
+    started_at: Optional[datetime] = Field(None)
+    finished_at: Optional[datetime] = Field(None)
@@ -0,0 +1,28 @@
+from typing import Any, Optional
+from pydantic import BaseModel, Field
+
+from ..enums.pipeline_event import PipelineEvent
+
+
+class PipelineEventDto(BaseModel):
+    event: PipelineEvent
+
+    page: Optional[int] = Field(None)
+    """
+    The processed page number of `ocr_page` events, pages are reported in completion order.
+    """
+
+    pages: Optional[int] = Field(None)
+
+    cached: Optional[bool] = Field(None)
+    """
+    Whether the data of `result` events was reused from a stored extraction.
+    """
+
+    data: Optional[dict[str, Any]] = Field(None)
+    """
+    The fields extracted so far for `partial` events, or the validated extraction for `result` events.
+    """
+
+    status: Optional[int] = Field(None)
+    error: Optional[str] = Field(None)
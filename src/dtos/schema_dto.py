@@ -1,6 +1,9 @@
 from typing import Optional
 from pydantic import BaseModel, Field
 from .json_schema_dto import JsonSchemaDto
+from ..enums.extraction_mode import ExtractionMode
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
 
 
 class SchemaDto(BaseModel):
@@ -8,3 +11,6 @@ class SchemaDto(BaseModel):
     name: str
     language: str
     json_schema: JsonSchemaDto
+    ocr_format: Optional[OCROutputFormat] = Field(None)
+    extraction_mode: Optional[ExtractionMode] = Field(None)
+    llm_backend: Optional[LLMBackendType] = Field(None)
@@ -0,0 +1,77 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from ..enums.extraction_mode import ExtractionMode
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+
+
+class ExtractionEntity(Document):
+    """
+    Persisted result of a RAG extraction, identified by everything that changes the LLM output.
+    """
+
+    file_key: str
+    """
+    The S3 file key, a SHA-256 of the file content plus its extension.
+    """
+
+    schema_id: Optional[str] = Field(None)
+
+    schema_hash: str
+    """
+    The content hash of the JSON schema used, so editing a schema does not serve stale results.
+    """
+
+    user: Optional[str] = Field(None)
+    """
+    The user who ran the extraction, results are only served and listed to their owner as schemas are private.
+    """
+
+    backend: LLMBackendType = LLMBackendType.OLLAMA
+    routing: Optional[str] = Field(None)
+    """
+    The model router fingerprint of the backend models and routing settings, which decide the model used.
+    """
+
+    model: Optional[str] = Field(None)
+    """
+    The model that generated the result, the models of every group are listed in the `grouped` mode.
+    """
+
+    prompt_version: str
+    ocr_format: OCROutputFormat
+    extraction_mode: ExtractionMode = ExtractionMode.SINGLE
+    language: Optional[str] = Field(None)
+    query: Optional[str] = Field(None)
+    result: dict[str, Any]
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        indexes = [
+            IndexModel(
+                [
+                    ("file_key", ASCENDING),
+                    ("schema_hash", ASCENDING),
+                    ("user", ASCENDING),
+                    ("backend", ASCENDING),
+                    ("routing", ASCENDING),
+                    ("prompt_version", ASCENDING),
+                    ("ocr_format", ASCENDING),
+                    ("extraction_mode", ASCENDING),
+                    ("language", ASCENDING),
+                    ("query", ASCENDING),
+                ],
+                unique=True,
+            ),
+            IndexModel(
+                [
+                    ("user", ASCENDING),
+                    ("file_key", ASCENDING),
+                    ("created_at", DESCENDING),
+                ]
+            ),
+        ]
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 from beanie import Document, Indexed
@@ -5,5 +6,19 @@ from pydantic import Field
 
 
 class FileEntity(Document):
-    key: Indexed(str)  # type: ignore
+    key: Indexed(str, unique=True)  # type: ignore
     filename: str
+    uploaded: bool = True
+    """
+    Whether the S3 object is stored, `False` while an upload or a deletion holds the key.
+    """
+
+    owner: Optional[str] = Field(None)
+    """
+    The upload or deletion holding the key.
+    """
+
+    claimed_at: Optional[datetime] = Field(None)
+    """
+    When the key was claimed, an unfinished claim is taken over once it is too old.
+    """
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from typing import Any, Optional
+from beanie import Document, Indexed
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+from ..enums.job_status import JobStatus
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+
+
+class JobEntity(Document):
+    """
+    An asynchronous RAG extraction of an uploaded file with a schema.
+    """
+
+    user: Indexed(str)  # type: ignore
+    status: JobStatus = JobStatus.QUEUED
+    file_key: str
+    content_type: str
+    schema_id: str
+    ocr_format: Optional[OCROutputFormat] = Field(None)
+    llm_backend: Optional[LLMBackendType] = Field(None)
+    result: Optional[dict[str, Any]] = Field(None)
+    error: Optional[str] = Field(None)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = Field(None)
+    finished_at: Optional[datetime] = Field(None)
+    owner: Optional[str] = Field(None)
+    """
+    The replica running the job, set when it claims the job.
+    """
+
+    lease_expires_at: Optional[datetime] = Field(None)
+    """
+    When the running job is considered abandoned by its replica, it is renewed while the job runs.
+    """
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    class Settings:
+        indexes = [
+            IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)]),
+        ]
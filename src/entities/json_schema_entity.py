@@ -1,4 +1,5 @@
 from __future__ import annotations
+import hashlib
 from typing import Any, Literal, Optional
 from pydantic import BaseModel, Field, create_model
 from pydantic_core import PydanticUndefined
@@ -118,37 +119,101 @@ class JsonSchemaEntity(BaseModel):
 
         return self.properties == None and self.items == None
 
+    @property
+    def content_hash(self) -> str:
+        """
+        SHA-256 of the schema definition, identifying a schema version regardless of where it is stored.
+        """
+        return hashlib.sha256(self.model_dump_json().encode("utf-8")).hexdigest()
+
+    @property
+    def depth(self) -> int:
+        """
+        Nesting levels of `object` and `array` schemas, a flat object has depth 1 and a scalar depth 0.
+        """
+        if self.type == "object":
+            return 1 + max((prop.depth for prop in self.properties), default=0)
+        if self.type == "array":
+            return 1 + self.items.depth
+        return 0
+
+    @property
+    def field_count(self) -> int:
+        """
+        Amount of scalar fields, the fields of array items are counted once.
+        """
+        if self.type == "object":
+            return sum(prop.field_count for prop in self.properties)
+        if self.type == "array":
+            return self.items.field_count
+        return 1
+
+    @property
+    def field_groups(self) -> list[JsonSchemaEntity]:
+        """
+        The top-level properties of an `object` schema, any other schema is a single group.
+        """
+        return self.properties if self.type == "object" else [self]
+
+    def partition(self, group_size: int) -> list[JsonSchemaEntity]:
+        """
+        Split the top-level properties of an `object` schema into object schemas of up to `group_size` fields.
+
+        Nested `object` and `array` properties, the largest and most fragile outputs, get a group of their own. Any
+        other schema is a single group.
+        """
+        if self.type != "object":
+            return [self]
+
+        groups: list[list[JsonSchemaEntity]] = []
+        fields: list[JsonSchemaEntity] = []
+        for prop in self.properties:
+            if prop.type in ("object", "array"):
+                groups.append([prop])
+                continue
+
+            fields.append(prop)
+            if len(fields) == group_size:
+                groups.append(fields)
+                fields = []
+
+        if fields:
+            groups.append(fields)
+        return [self.model_copy(update={"properties": group}) for group in groups]
+
     # region Pydantic model class generator
 
-    def as_model(self) -> type[BaseModel]:
+    def as_model(self, partial: bool = False) -> type[BaseModel]:
         """
         Convert the JsonSchema into a Pydantic dynamic model class for field validation.
+
+        A `partial` model has every field optional, validating outputs that are still being generated.
         """
-        attrs = self.attributes_to_model_fields()
+        attrs = self.attributes_to_model_fields(partial)
         return create_model(self.name, **attrs)
 
-    def attributes_to_model_fields(self) -> Any:
+    def attributes_to_model_fields(self, partial: bool = False) -> Any:
         model_fields: dict[str, tuple[type, Any]] = {}
 
         if self.type == "object":
             for prop in self.properties:
-                model_fields[prop.name] = prop.create_model_tuple()
+                model_fields[prop.name] = prop.create_model_tuple(partial)
         else:
-            model_fields[self.name] = self.create_model_tuple()
+            model_fields[self.name] = self.create_model_tuple(partial)
 
         return model_fields
 
-    def create_model_tuple(self) -> tuple[type, Any]:
-        t = self.get_model_type()
+    def create_model_tuple(self, partial: bool = False) -> tuple[type, Any]:
+        t = self.get_model_type(partial)
         return (
-            t if self.required else Optional[t],
+            t if self.required and not partial else Optional[t],
             Field(
-                ...,
+                None if partial else ...,
                 description=self.description,
             ),
         )
 
-    def get_model_type(self) -> type:
+    def get_model_type(self, partial: bool = False) -> type:
         match self.type:
             case "datetime" | "string":
                 return str
@@ -157,9 +222,9 @@ class JsonSchemaEntity(BaseModel):
             case "bool":
                 return bool
             case "array":
-                return list[self.items.get_model_type()]
+                return list[self.items.get_model_type(partial)]
             case "object":
-                return self.as_model()
+                return self.as_model(partial)
             case _:
                 raise f"Type {self.type} conversion not found"
 
@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from beanie import Document
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+
+
+class OCRResultEntity(Document):
+    """
+    Persisted OCR output of a content-addressed file for a specific OCR configuration version.
+    """
+
+    key: str
+    """
+    The S3 file key, a SHA-256 of the file content plus its extension.
+    """
+
+    version: str
+    """
+    The OCR configuration version used to produce the markup.
+    """
+
+    markup: bytes
+    """
+    The zlib compressed OCR markup.
+    """
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        indexes = [
+            IndexModel([("key", ASCENDING), ("version", ASCENDING)], unique=True),
+        ]
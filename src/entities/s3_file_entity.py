@@ -1,19 +1,46 @@
 import hashlib
-from typing import Optional
-from pydantic import BaseModel
+import os
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import BinaryIO
 
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class S3FileEntity:
+    """
+    A file stored in S3 under its content-addressed key.
+
+    A plain dataclass instead of a pydantic model, so large contents are referenced as is instead of validated and copied.
+    """
 
-class S3FileEntity(BaseModel):
     ext: str
-    content: bytes
+    content: bytes = field(repr=False)
 
-    @property
+    @cached_property
     def name(self) -> str:
-        """Generate SHA-256 hash name of the file content."""
-        sha256_hash = hashlib.sha256()
-        sha256_hash.update(self.content)
-        return sha256_hash.hexdigest()
+        """Generate SHA-256 hash name of the file content, computed once."""
+        return hashlib.sha256(self.content).hexdigest()
 
     @property
     def key(self) -> str:
         return f"{self.name}{self.ext}"
+
+    @classmethod
+    def from_key(cls, key: str, content: bytes) -> "S3FileEntity":
+        """Wrap the content of a stored file, trusting its key instead of hashing the content again."""
+        name, ext = os.path.splitext(key)
+        file = cls(ext=ext, content=content)
+        file.__dict__["name"] = name
+        return file
+
+    @staticmethod
+    def key_from_file(file: BinaryIO, ext: str) -> str:
+        """Generate the same key as `key`, hashing the file chunk by chunk and rewinding it afterwards."""
+        sha256_hash = hashlib.sha256()
+        file.seek(0)
+        for chunk in iter(lambda: file.read(HASH_CHUNK_SIZE), b""):
+            sha256_hash.update(chunk)
+        file.seek(0)
+        return f"{sha256_hash.hexdigest()}{ext}"
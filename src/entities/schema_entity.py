@@ -1,6 +1,11 @@
 from __future__ import annotations
+from typing import Optional
 from beanie import Document, Indexed
+from pydantic import Field
 from .json_schema_entity import JsonSchemaEntity
+from ..enums.extraction_mode import ExtractionMode
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
 
 
 class SchemaEntity(Document):
@@ -8,3 +13,6 @@ class SchemaEntity(Document):
     name: Indexed(str)  # type: ignore
     language: str
     json_schema: JsonSchemaEntity
+    ocr_format: Optional[OCROutputFormat] = Field(None)
+    extraction_mode: Optional[ExtractionMode] = Field(None)
+    llm_backend: Optional[LLMBackendType] = Field(None)
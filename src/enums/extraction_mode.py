@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class ExtractionMode(str, Enum):
+    """
+    Represents how the schema data is requested from the LLM
+    """
+
+    SINGLE = "single"
+    """
+    The whole schema is filled in a single generation.
+    """
+
+    GROUPED = "grouped"
+    """
+    The top-level fields are split into groups, each filled in its own concurrent generation and merged.
+    """
@@ -0,0 +1,12 @@
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    """
+    Represents the lifecycle of an asynchronous extraction job
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
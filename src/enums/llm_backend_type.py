@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class LLMBackendType(str, Enum):
+    """
+    Represents the servers able to run the extraction LLM
+    """
+
+    OLLAMA = "ollama"
+    OPENAI = "openai"
+    STUB = "stub"
@@ -13,3 +13,5 @@ class OCRFileType(Enum):
     WEBP = 4
     DOCX = 5
     PDF = 6
+    TXT = 7
+    CSV = 8
@@ -0,0 +1,27 @@
+from enum import Enum
+
+
+class OCROutputFormat(str, Enum):
+    """
+    Represents the formats the OCR markup can be rendered to before being sent to the LLM
+    """
+
+    ALTO = "alto"
+    """
+    Full ALTO XML with the position and confidence of every word.
+    """
+
+    TEXT = "text"
+    """
+    Plain text in reading order.
+    """
+
+    LINES = "lines"
+    """
+    Text lines keeping a coarse horizontal layout, so table columns stay aligned.
+    """
+
+    TAGGED = "tagged"
+    """
+    Text lines wrapped in minimal page and block tags.
+    """
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class PipelineEvent(str, Enum):
+    """
+    Represents the progress events streamed while processing a document
+    """
+
+    OCR_PAGE = "ocr_page"
+    OCR = "ocr"
+    PARTIAL = "partial"
+    RESULT = "result"
+    ERROR = "error"
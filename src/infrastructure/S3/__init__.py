@@ -1,9 +1,12 @@
-import os
+from typing import Any, BinaryIO, Iterator
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
 from pydantic import BaseModel
 from src.entities.s3_file_entity import S3FileEntity
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
 
 class S3Config(BaseModel):
     url: str
@@ -11,6 +14,24 @@ class S3Config(BaseModel):
     secret_access_key: str
     region: str | None
     bucket: str
+    multipart_threshold: int = 8 * 1024 * 1024
+    """
+    Size in bytes from which streamed uploads are sent as multipart uploads.
+    """
+    multipart_chunksize: int = 8 * 1024 * 1024
+    multipart_concurrency: int = 4
+    """
+    Amount of parts uploaded in parallel.
+    """
+    max_pool_connections: int = 32
+    """
+    Size of the HTTP connection pool, should cover the concurrent calls times the parallel multipart parts.
+    """
+    max_attempts: int = 5
+    retry_mode: str = "standard"
+    """
+    botocore retry mode, `standard` retries throttling and transient errors with exponential backoff and jitter.
+    """
 
 
 class S3Client:
@@ -26,7 +47,19 @@ class S3Client:
         self._client = session.client(
             "s3",
             endpoint_url=config.url,
-            config=Config(signature_version="s3v4"),
+            config=Config(
+                signature_version="s3v4",
+                max_pool_connections=config.max_pool_connections,
+                retries={
+                    "max_attempts": config.max_attempts,
+                    "mode": config.retry_mode,
+                },
+            ),
+        )
+        self._transfer_config = TransferConfig(
+            multipart_threshold=config.multipart_threshold,
+            multipart_chunksize=config.multipart_chunksize,
+            max_concurrency=config.multipart_concurrency,
         )
 
     def create_butcket(self) -> None:
@@ -36,10 +69,55 @@ class S3Client:
         self._client.put_object(Bucket=self._bucket, Key=file.key, Body=file.content)
         return file.key
 
+    def upload_fileobj(self, key: str, file: BinaryIO) -> str:
+        """
+        Stream the file to S3, large files are sent as multipart uploads with parallel parts.
+        """
+        self._client.upload_fileobj(
+            _KeepOpenFile(file), self._bucket, key, Config=self._transfer_config
+        )
+        return key
+
     def download_file(self, key: str) -> S3FileEntity:
-        _, output_ext = os.path.splitext(key)
         s3_object = self._client.get_object(Bucket=self._bucket, Key=key)
-        return S3FileEntity(ext=output_ext, content=s3_object["Body"].read())
+        return S3FileEntity.from_key(key, s3_object["Body"].read())
+
+    def get_size(self, key: str) -> int:
+        return self._client.head_object(Bucket=self._bucket, Key=key)["ContentLength"]
+
+    def stream_file(
+        self, key: str, start: int | None = None, end: int | None = None
+    ) -> Iterator[bytes]:
+        """
+        Yield the file content in chunks, optionally only the bytes from `start` to `end` (inclusive).
+
+        The object is only requested on the first iteration, so iterating in a thread keeps every S3 call off the event loop.
+        """
+        params = {}
+        if start is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+
+        body = self._client.get_object(Bucket=self._bucket, Key=key, **params)["Body"]
+        try:
+            yield from body.iter_chunks(STREAM_CHUNK_SIZE)
+        finally:
+            body.close()
 
     def delete_file(self, key: str) -> None:
         self._client.delete_object(Bucket=self._bucket, Key=key)
+
+
+class _KeepOpenFile:
+    """
+    Proxy of the uploaded file ignoring `close`, boto3 closes the file object once uploaded while callers still
+    read it afterwards.
+    """
+
+    def __init__(self, file: BinaryIO) -> None:
+        self._file = file
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._file, name)
+
+    def close(self) -> None:
+        pass
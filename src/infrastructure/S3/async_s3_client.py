@@ -0,0 +1,62 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, BinaryIO, Callable, Iterator, TypeVar
+from src.entities.s3_file_entity import S3FileEntity
+
+from . import S3Client
+from .filesystem_client import FilesystemS3Client
+
+T = TypeVar("T")
+
+
+class AsyncS3Client:
+    """
+    Async counterpart of `S3Client`, running the blocking calls in a dedicated thread pool.
+
+    The pool size bounds the S3 calls in flight, so bursts queue up instead of exhausting the
+    connection pool or starving the default executor. Retries and backoff are done by botocore.
+    """
+
+    def __init__(
+        self, client: S3Client | FilesystemS3Client, *, max_concurrency: int
+    ) -> None:
+        self._client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="s3"
+        )
+
+    async def _run(self, fn: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(fn, *args))
+
+    async def create_butcket(self) -> None:
+        await self._run(self._client.create_butcket)
+
+    async def upload_file(self, file: S3FileEntity) -> str:
+        return await self._run(self._client.upload_file, file)
+
+    async def upload_fileobj(self, key: str, file: BinaryIO) -> str:
+        return await self._run(self._client.upload_fileobj, key, file)
+
+    async def download_file(self, key: str) -> S3FileEntity:
+        return await self._run(self._client.download_file, key)
+
+    async def get_size(self, key: str) -> int:
+        return await self._run(self._client.get_size, key)
+
+    async def stream_file(
+        self, key: str, start: int | None = None, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        chunks: Iterator[bytes] = self._client.stream_file(key, start, end)
+        try:
+            while (chunk := await self._run(next, chunks, None)) is not None:
+                yield chunk
+        finally:
+            await self._run(chunks.close)
+
+    async def delete_file(self, key: str) -> None:
+        await self._run(self._client.delete_file, key)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Iterator
+from src.entities.s3_file_entity import S3FileEntity
+
+
+class FilesystemS3Client:
+    """
+    Local stand-in of `S3Client` storing the objects as files under `root/bucket`.
+
+    Meant for development and offline benchmarks, not for production use.
+    """
+
+    def __init__(
+        self, root: str, bucket: str, *, chunk_size: int = 1024 * 1024
+    ) -> None:
+        self._directory = os.path.join(root, bucket)
+        self._chunk_size = chunk_size
+
+    def _path(self, key: str) -> str:
+        # Keys are content hashes, anything else must not escape the bucket directory
+        if os.path.basename(key) != key:
+            raise ValueError(f"Invalid key {key}")
+        return os.path.join(self._directory, key)
+
+    def create_butcket(self) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+
+    def upload_file(self, file: S3FileEntity) -> str:
+        with self._open_for_write(file.key) as output:
+            output.write(file.content)
+        return file.key
+
+    def upload_fileobj(self, key: str, file: BinaryIO) -> str:
+        with self._open_for_write(key) as output:
+            shutil.copyfileobj(file, output, self._chunk_size)
+        return key
+
+    def download_file(self, key: str) -> S3FileEntity:
+        with open(self._path(key), "rb") as file:
+            return S3FileEntity.from_key(key, file.read())
+
+    def get_size(self, key: str) -> int:
+        return os.path.getsize(self._path(key))
+
+    def stream_file(
+        self, key: str, start: int | None = None, end: int | None = None
+    ) -> Iterator[bytes]:
+        with open(self._path(key), "rb") as file:
+            remaining = None
+            if start is not None:
+                file.seek(start)
+                if end is not None:
+                    remaining = end - start + 1
+
+            while remaining is None or remaining > 0:
+                chunk = file.read(
+                    self._chunk_size
+                    if remaining is None
+                    else min(self._chunk_size, remaining)
+                )
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def delete_file(self, key: str) -> None:
+        os.remove(self._path(key))
+
+    def _open_for_write(self, key: str) -> "_AtomicFile":
+        return _AtomicFile(self._path(key))
+
+
+class _AtomicFile:
+    """
+    Write to a temporary file renamed over the target on success, so readers never see partial objects.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+
+    def __enter__(self) -> BinaryIO:
+        directory = os.path.dirname(self._path)
+        os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=directory, delete=False)
+        return self._file
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self._file.close()
+        if exc_type is None:
+            os.replace(self._file.name, self._path)
+        else:
+            os.remove(self._file.name)
@@ -0,0 +1,73 @@
+from beanie.operators import Set
+from pymongo.errors import DuplicateKeyError
+from src.entities.extraction_entity import ExtractionEntity
+from src.enums.extraction_mode import ExtractionMode
+from src.enums.llm_backend_type import LLMBackendType
+from src.enums.ocr_output_format import OCROutputFormat
+
+
+class ExtractionsCollection:
+    async def find(
+        self,
+        file_key: str,
+        schema_hash: str,
+        user: str | None,
+        backend: LLMBackendType,
+        routing: str,
+        prompt_version: str,
+        ocr_format: OCROutputFormat,
+        extraction_mode: ExtractionMode,
+        language: str | None,
+        query: str | None,
+    ) -> ExtractionEntity | None:
+        return await ExtractionEntity.find_one(
+            ExtractionEntity.file_key == file_key,
+            ExtractionEntity.schema_hash == schema_hash,
+            ExtractionEntity.user == user,
+            ExtractionEntity.backend == backend,
+            ExtractionEntity.routing == routing,
+            ExtractionEntity.prompt_version == prompt_version,
+            ExtractionEntity.ocr_format == ocr_format,
+            ExtractionEntity.extraction_mode == extraction_mode,
+            ExtractionEntity.language == language,
+            ExtractionEntity.query == query,
+        )
+
+    async def find_by_file_key(
+        self, file_key: str, user: str
+    ) -> list[ExtractionEntity]:
+        return (
+            await ExtractionEntity.find_many(
+                ExtractionEntity.user == user, ExtractionEntity.file_key == file_key
+            )
+            .sort(-ExtractionEntity.created_at)
+            .to_list()
+        )
+
+    async def upsert(self, extraction: ExtractionEntity) -> None:
+        try:
+            await ExtractionEntity.find_one(
+                ExtractionEntity.file_key == extraction.file_key,
+                ExtractionEntity.schema_hash == extraction.schema_hash,
+                ExtractionEntity.user == extraction.user,
+                ExtractionEntity.backend == extraction.backend,
+                ExtractionEntity.routing == extraction.routing,
+                ExtractionEntity.prompt_version == extraction.prompt_version,
+                ExtractionEntity.ocr_format == extraction.ocr_format,
+                ExtractionEntity.extraction_mode == extraction.extraction_mode,
+                ExtractionEntity.language == extraction.language,
+                ExtractionEntity.query == extraction.query,
+            ).upsert(
+                Set(
+                    {
+                        ExtractionEntity.schema_id: extraction.schema_id,
+                        ExtractionEntity.model: extraction.model,
+                        ExtractionEntity.result: extraction.result,
+                        ExtractionEntity.created_at: extraction.created_at,
+                    }
+                ),
+                on_insert=extraction,
+            )
+        except DuplicateKeyError:
+            # A concurrent identical extraction inserted its result first
+            pass
@@ -1,3 +1,6 @@
+from datetime import datetime
+from beanie.odm.queries.update import UpdateResponse
+from beanie.operators import Set, SetOnInsert
 from src.entities.file_entity import FileEntity
 
 
@@ -12,10 +15,96 @@ class FilesCollection:
         return await FileEntity.find_one(FileEntity.id == id)
 
     async def find_by_key(self, key: str) -> FileEntity:
-        return await FileEntity.find_one(FileEntity.key == key)
+        """
+        The uploaded file with the key, files still being uploaded or deleted are left out.
+        """
+        return await FileEntity.find_one(
+            FileEntity.key == key, FileEntity.uploaded != False
+        )
 
     async def has(self, key: str) -> bool:
-        return await FileEntity.find_one(FileEntity.key == key) != None
+        return await self.find_by_key(key) != None
+
+    async def claim(
+        self, key: str, filename: str, owner: str, now: datetime
+    ) -> FileEntity | None:
+        """
+        Atomically register the key as being uploaded by `owner` unless it exists, returning the existing file or
+        `None` when `owner` claimed it. Concurrent claims of a new key may raise `DuplicateKeyError`.
+        """
+        return await FileEntity.find_one(FileEntity.key == key).update(
+            SetOnInsert(
+                {
+                    FileEntity.filename: filename,
+                    FileEntity.uploaded: False,
+                    FileEntity.owner: owner,
+                    FileEntity.claimed_at: now,
+                }
+            ),
+            upsert=True,
+            response_type=UpdateResponse.OLD_DOCUMENT,
+        )
+
+    async def take_over(
+        self, key: str, owner: str, now: datetime, claimed_before: datetime
+    ) -> bool:
+        """
+        Claim the key for `owner` when its upload or deletion was claimed before `claimed_before` and never finished.
+        """
+        file = await FileEntity.find_one(
+            FileEntity.key == key,
+            FileEntity.uploaded == False,
+            FileEntity.claimed_at < claimed_before,
+        ).update(
+            Set({FileEntity.owner: owner, FileEntity.claimed_at: now}),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        return file is not None
+
+    async def claim_deletion(
+        self, key: str, owner: str, now: datetime
+    ) -> FileEntity | None:
+        """
+        Atomically mark the uploaded file as being deleted by `owner`, `None` when it does not exist or is claimed.
+        """
+        return await FileEntity.find_one(
+            FileEntity.key == key, FileEntity.uploaded != False
+        ).update(
+            Set(
+                {
+                    FileEntity.uploaded: False,
+                    FileEntity.owner: owner,
+                    FileEntity.claimed_at: now,
+                }
+            ),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+
+    async def complete(self, key: str, owner: str) -> None:
+        """
+        Mark the file claimed by `owner` as uploaded, its S3 object is stored.
+        """
+        await FileEntity.find_one(
+            FileEntity.key == key, FileEntity.owner == owner
+        ).update(
+            Set(
+                {
+                    FileEntity.uploaded: True,
+                    FileEntity.owner: None,
+                    FileEntity.claimed_at: None,
+                }
+            )
+        )
+
+    async def release(self, key: str, owner: str) -> None:
+        """
+        Drop the file claimed by `owner`, its S3 object is not stored.
+        """
+        await FileEntity.find_one(
+            FileEntity.key == key,
+            FileEntity.owner == owner,
+            FileEntity.uploaded == False,
+        ).delete()
 
     async def delete(self, key: str) -> None:
         file = await self.find_by_key(key)
@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Any
+from beanie import PydanticObjectId
+from beanie.odm.queries.update import UpdateResponse
+from beanie.operators import And, In, Or, Set
+from src.entities.job_entity import JobEntity
+from src.enums.job_status import JobStatus
+
+
+class JobsCollection:
+    async def insert(self, job: JobEntity) -> str:
+        return (await job.insert()).id
+
+    async def find_by_id(self, id: str) -> JobEntity:
+        return await JobEntity.find_one(JobEntity.id == PydanticObjectId(id))
+
+    async def find_claimable(self, now: datetime) -> list[JobEntity]:
+        """
+        Queued jobs and running jobs whose replica stopped renewing their lease.
+        """
+        return await JobEntity.find_many(self._claimable(now)).to_list()
+
+    async def claim(
+        self, id: str, owner: str, now: datetime, lease_expires_at: datetime
+    ) -> JobEntity | None:
+        """
+        Atomically mark the job as running by `owner`, `None` when it is finished or already claimed by a live replica.
+        """
+        return await JobEntity.find_one(
+            JobEntity.id == PydanticObjectId(id), self._claimable(now)
+        ).update(
+            Set(
+                {
+                    JobEntity.status: JobStatus.RUNNING,
+                    JobEntity.owner: owner,
+                    JobEntity.lease_expires_at: lease_expires_at,
+                    JobEntity.started_at: now,
+                }
+            ),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+
+    async def renew(self, id: str, owner: str, lease_expires_at: datetime) -> bool:
+        job = await JobEntity.find_one(
+            JobEntity.id == PydanticObjectId(id),
+            JobEntity.owner == owner,
+            JobEntity.status == JobStatus.RUNNING,
+        ).update(
+            Set({JobEntity.lease_expires_at: lease_expires_at}),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        return job is not None
+
+    async def release(self, id: str, owner: str, fields: dict[Any, Any]) -> bool:
+        """
+        Update the job claimed by `owner` and drop its lease, `False` when another replica took the job over.
+        """
+        job = await JobEntity.find_one(
+            JobEntity.id == PydanticObjectId(id),
+            JobEntity.owner == owner,
+            JobEntity.status == JobStatus.RUNNING,
+        ).update(
+            Set({**fields, JobEntity.owner: None, JobEntity.lease_expires_at: None}),
+            response_type=UpdateResponse.NEW_DOCUMENT,
+        )
+        return job is not None
+
+    def _claimable(self, now: datetime) -> Any:
+        return Or(
+            JobEntity.status == JobStatus.QUEUED,
+            And(
+                JobEntity.status == JobStatus.RUNNING,
+                Or(
+                    JobEntity.lease_expires_at == None,
+                    JobEntity.lease_expires_at < now,
+                ),
+            ),
+        )
@@ -0,0 +1,72 @@
+import logging
+from beanie import Document
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+
+from src.entities.extraction_entity import ExtractionEntity
+from src.entities.file_entity import FileEntity
+from src.logger import logger
+
+
+async def migrate(database: AsyncIOMotorDatabase) -> None:
+    """
+    Apply the index changes Beanie cannot, it creates missing indexes but never replaces existing ones. Every
+    migration is idempotent and runs before `init_beanie` builds the indexes.
+    """
+    await _unique_file_keys(database[FileEntity.__name__])
+    await _drop_stale_unique_indexes(database, ExtractionEntity)
+
+
+async def _unique_file_keys(collection: AsyncIOMotorCollection) -> None:
+    """
+    Replace the non-unique `key_1` index of the files with a unique one, removing duplicated rows first.
+    """
+    index = (await collection.index_information()).get("key_1")
+    if index is not None and index.get("unique"):
+        return
+
+    duplicates = collection.aggregate(
+        [
+            {"$sort": {"_id": 1}},
+            {"$group": {"_id": "$key", "ids": {"$push": "$_id"}}},
+            {"$match": {"ids.1": {"$exists": True}}},
+        ],
+        allowDiskUse=True,
+    )
+    removed = 0
+    async for duplicate in duplicates:
+        # Keys are content addressed, every row points at the same S3 object and the oldest one is kept
+        result = await collection.delete_many({"_id": {"$in": duplicate["ids"][1:]}})
+        removed += result.deleted_count
+
+    if index is not None:
+        await collection.drop_index("key_1")
+
+    logger.log(
+        logging.INFO,
+        f"Migrated files to a unique key index, removed {removed} duplicated rows",
+    )
+
+
+async def _drop_stale_unique_indexes(
+    database: AsyncIOMotorDatabase, document: type[Document]
+) -> None:
+    """
+    Drop the unique indexes of the collection that are no longer defined by the document, Beanie would build the
+    new index next to them and the old one would keep rejecting rows the new one allows.
+    """
+    collection = database[document.__name__]
+    defined = [
+        (index.document["name"], list(index.document["key"].items()))
+        for index in document.Settings.indexes
+        if index.document.get("unique")
+    ]
+
+    for name, index in (await collection.index_information()).items():
+        if not index.get("unique") or (name, list(index["key"])) in defined:
+            continue
+
+        await collection.drop_index(name)
+        logger.log(
+            logging.INFO,
+            f"Dropped the stale unique index {name} of {document.__name__}",
+        )
@@ -0,0 +1,24 @@
+from beanie.operators import NE, Set
+from src.entities.ocr_result_entity import OCRResultEntity
+
+
+class OCRResultsCollection:
+    async def find(self, key: str, version: str) -> OCRResultEntity | None:
+        return await OCRResultEntity.find_one(
+            OCRResultEntity.key == key, OCRResultEntity.version == version
+        )
+
+    async def upsert(self, result: OCRResultEntity) -> None:
+        await OCRResultEntity.find_one(
+            OCRResultEntity.key == result.key, OCRResultEntity.version == result.version
+        ).upsert(Set({OCRResultEntity.markup: result.markup}), on_insert=result)
+
+    async def delete_by_key(self, key: str) -> int:
+        result = await OCRResultEntity.find_many(OCRResultEntity.key == key).delete()
+        return result.deleted_count if result else 0
+
+    async def delete_stale(self, version: str) -> int:
+        result = await OCRResultEntity.find_many(
+            NE(OCRResultEntity.version, version)
+        ).delete()
+        return result.deleted_count if result else 0
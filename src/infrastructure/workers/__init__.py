@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import queue
+import time
+from contextlib import asynccontextmanager
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.thread import BrokenThreadPool
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from multiprocessing.managers import SyncManager
+from typing import Any, AsyncIterator, Awaitable, Callable, Literal, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+from .custom_exceptions import PoolSaturatedException, PoolUnavailableException
+
+__all__ = [
+    "WorkerPool",
+    "WorkerPoolConfig",
+    "WorkerPoolStats",
+    "PoolSaturatedException",
+    "PoolUnavailableException",
+]
+
+T = TypeVar("T")
+
+
+class WorkerPoolConfig(BaseModel):
+    name: str
+    kind: Literal["process", "thread", "async"]
+    """
+    Where tasks run, `async` tasks are coroutine functions awaited on the event loop and only bounded by the pool.
+    """
+    max_workers: int = Field(..., gt=0)
+    max_queue: int = Field(..., ge=0)
+    """
+    Maximum amount of tasks waiting for a free worker, tasks above this limit are rejected.
+    """
+    max_tasks_per_child: Optional[int] = Field(None)
+    """
+    Recycle process workers after the given amount of tasks, bounding leaked memory from native libraries.
+    """
+    retry_after: int = 5
+
+
+class WorkerPoolStats(BaseModel):
+    name: str
+    kind: str
+    max_workers: int
+    max_queue: int
+    running: int
+    queued: int
+    utilization: float
+    saturation: float
+    completed_total: int
+    failed_total: int
+    rejected_total: int
+    wait_seconds_total: float
+    run_seconds_total: float
+
+
+class WorkerPool:
+    """
+    Bounded executor with admission control, keeping blocking work off the event loop.
+
+    At most `max_workers` tasks run at once and at most `max_queue` tasks wait for a free worker,
+    any task above that is rejected with `PoolSaturatedException` instead of piling up.
+    """
+
+    def __init__(self, config: WorkerPoolConfig) -> None:
+        self._config = config
+        self._executor: Executor | None = None
+        self._manager: SyncManager | None = None
+        self._manager_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(config.max_workers)
+        self._running = 0
+        self._queued = 0
+        self._completed_total = 0
+        self._failed_total = 0
+        self._rejected_total = 0
+        self._wait_seconds_total = 0.0
+        self._run_seconds_total = 0.0
+
+    @property
+    def name(self) -> str:
+        return self._config.name
+
+    def _get_executor(self) -> Executor:
+        # Executors are created lazily so importing the module (e.g. from spawned workers) is cheap
+        if self._executor is None:
+            if self._config.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self._config.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    max_tasks_per_child=self._config.max_tasks_per_child,
+                )
+            elif self._config.kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._config.max_workers,
+                    thread_name_prefix=self._config.name,
+                )
+        return self._executor
+
+    async def start(self) -> None:
+        """
+        Start the manager process of `process` pools upfront, instead of on the first `create_queue`.
+        """
+        if self._config.kind == "process":
+            await self._get_manager()
+
+    async def create_queue(self) -> queue.Queue:
+        """
+        Queue for tasks to report progress back to the caller, shared through a manager process in `process` pools.
+        """
+        if self._config.kind == "process":
+            # Starting the manager and creating its queues are blocking calls to another process
+            manager = await self._get_manager()
+            return await asyncio.to_thread(manager.Queue)
+        return queue.Queue()
+
+    async def _get_manager(self) -> SyncManager:
+        async with self._manager_lock:
+            if self._manager is None:
+                self._manager = await asyncio.to_thread(
+                    multiprocessing.get_context("spawn").Manager
+                )
+        return self._manager
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Hold a worker for work that is not a single call, e.g. consuming a stream on the event loop.
+        """
+        capacity = self._config.max_workers + self._config.max_queue
+        if self._running + self._queued >= capacity:
+            self._rejected_total += 1
+            raise PoolSaturatedException(self.name, self._config.retry_after)
+
+        enqueued_at = time.perf_counter()
+        self._queued += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._queued -= 1
+
+        started_at = time.perf_counter()
+        self._wait_seconds_total += started_at - enqueued_at
+        self._running += 1
+        try:
+            yield
+            self._completed_total += 1
+        except Exception:
+            self._failed_total += 1
+            raise
+        finally:
+            self._running -= 1
+            self._run_seconds_total += time.perf_counter() - started_at
+            self._semaphore.release()
+
+    async def run(
+        self, fn: Callable[..., T | Awaitable[T]], *args: Any, **kwargs: Any
+    ) -> T:
+        """
+        Run `fn` in the pool, waiting for a free worker if the queue is not full.
+        """
+        async with self.acquire():
+            try:
+                if self._config.kind == "async":
+                    return await fn(*args, **kwargs)
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._get_executor(), partial(fn, *args, **kwargs)
+                )
+            except (BrokenProcessPool, BrokenThreadPool):
+                # A crashed worker (e.g. OOM killed) breaks the whole executor, replace it for the next tasks
+                self._shutdown_executor()
+                raise PoolUnavailableException(self.name, self._config.retry_after)
+
+    def stats(self) -> WorkerPoolStats:
+        capacity = self._config.max_workers + self._config.max_queue
+        return WorkerPoolStats(
+            name=self.name,
+            kind=self._config.kind,
+            max_workers=self._config.max_workers,
+            max_queue=self._config.max_queue,
+            running=self._running,
+            queued=self._queued,
+            utilization=self._running / self._config.max_workers,
+            saturation=(self._running + self._queued) / capacity,
+            completed_total=self._completed_total,
+            failed_total=self._failed_total,
+            rejected_total=self._rejected_total,
+            wait_seconds_total=self._wait_seconds_total,
+            run_seconds_total=self._run_seconds_total,
+        )
+
+    def shutdown(self) -> None:
+        self._shutdown_executor()
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
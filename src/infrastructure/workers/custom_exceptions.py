@@ -0,0 +1,19 @@
+from fastapi import HTTPException
+
+
+class PoolSaturatedException(HTTPException):
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(
+            status_code=429,
+            detail=f"The {pool} worker pool is saturated, retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class PoolUnavailableException(HTTPException):
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"The {pool} worker pool is unavailable, retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -0,0 +1,11 @@
+from fastapi import HTTPException
+
+
+class FileNotFoundException(HTTPException):
+    def __init__(self, key: str):
+        super().__init__(status_code=404, detail=f"File {key} not found")
+
+
+class FileStorageException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(status_code=500, detail=detail)
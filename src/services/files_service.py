@@ -1,47 +1,156 @@
+import asyncio
 import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Awaitable, Callable
+from uuid import uuid4
+from fastapi import HTTPException, UploadFile
+from pymongo.errors import DuplicateKeyError
 
 from src.logger import logger
 
-from ..infrastructure.S3 import S3Client
+from ..infrastructure.S3.async_s3_client import AsyncS3Client
 from ..entities.file_entity import FileEntity
 from ..entities.s3_file_entity import S3FileEntity
 from ..infrastructure.mongodb import FilesCollection
+from ..utils.hashing_upload import upload_key
+from .custom_exceptions import FileNotFoundException, FileStorageException
+
+FILE_CLAIM_TIMEOUT = float(os.getenv("FILE_CLAIM_TIMEOUT", "600"))
+"""
+Seconds after which an unfinished upload or deletion is considered abandoned and its key is claimed again.
+"""
+
+FILE_CLAIM_POLL_INTERVAL = float(os.getenv("FILE_CLAIM_POLL_INTERVAL", "0.2"))
+"""
+Seconds between checks of a key held by a concurrent upload or deletion.
+"""
 
 
 class FilesService:
-    def __init__(self, s3_client: S3Client, files_collection: FilesCollection) -> None:
+    def __init__(
+        self, s3_client: AsyncS3Client, files_collection: FilesCollection
+    ) -> None:
         self._s3_client = s3_client
         self._files_collection = files_collection
 
     async def download_file(self, key: str) -> tuple[str, bytes]:
         try:
             file = await self._files_collection.find_by_key(key)
-            s3_file = self._s3_client.download_file(file.key)
+            if file is None:
+                raise FileNotFoundException(key)
+
+            s3_file = await self._s3_client.download_file(file.key)
             return file.filename, s3_file.content
+        except HTTPException:
+            raise
         except Exception as ex:
             logger.log(logging.ERROR, ex)
-            raise f"Unable to download file {key}"
+            raise FileStorageException(f"Unable to download file {key}")
+
+    async def find_file(self, key: str) -> tuple[str, int] | None:
+        """
+        Return the filename and size of the file, or `None` when it does not exist.
+        """
+        file = await self._files_collection.find_by_key(key)
+        if file is None:
+            return None
+
+        size = await self._s3_client.get_size(file.key)
+        return file.filename, size
+
+    def stream_file(
+        self, key: str, start: int | None = None, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        return self._s3_client.stream_file(key, start, end)
 
     async def upload_file(self, name: str, ext: str, content: bytes) -> str:
         try:
             s3_file = S3FileEntity(ext=ext, content=content)
-
-            if not await self._files_collection.has(s3_file.key):
-                self._s3_client.upload_file(s3_file)
-                await self._files_collection.insert(
-                    FileEntity(key=s3_file.key, filename=f"{name}{ext}")
-                )
-
+            await self._upload_once(
+                s3_file.key,
+                f"{name}{ext}",
+                lambda: self._s3_client.upload_file(s3_file),
+            )
             return s3_file.key
         except Exception as ex:
             logger.log(logging.ERROR, ex)
-            raise f"Unable to save file {name}{ext}"
+            raise FileStorageException(f"Unable to save file {name}{ext}")
 
-    async def delete_file(self, key: str) -> bytes:
+    async def upload_stream(self, name: str, ext: str, file: UploadFile) -> str:
+        """
+        Upload the file without loading it into memory, sending it to S3 chunk by chunk. The file stays open and
+        can be read again afterwards.
+        """
         try:
-            file = await self._files_collection.find_by_key(key)
-            self._s3_client.delete_file(file.key)
-            await self._files_collection.delete(file)
+            key = await upload_key(file, ext)
+            await self._upload_once(
+                key,
+                f"{name}{ext}",
+                lambda: self._s3_client.upload_fileobj(key, file.file),
+            )
+            return key
+        except Exception as ex:
+            logger.log(logging.ERROR, ex)
+            raise FileStorageException(f"Unable to save file {name}{ext}")
+
+    async def _upload_once(
+        self, key: str, filename: str, upload: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """
+        Claim the key with a pending row and upload the object only when this call won the claim. Uploads of a key
+        held by a concurrent upload or deletion wait for it to finish, so the object is uploaded once and a
+        registered key always has an object behind it.
+        """
+        owner = uuid4().hex
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                file = await self._files_collection.claim(key, filename, owner, now)
+            except DuplicateKeyError:
+                # A concurrent upload inserted its claim first
+                continue
+
+            if file is None:
+                break
+            if file.uploaded:
+                return
+            if await self._files_collection.take_over(
+                key, owner, now, now - timedelta(seconds=FILE_CLAIM_TIMEOUT)
+            ):
+                logger.log(logging.WARNING, f"Took over the abandoned upload of {key}")
+                break
+            await asyncio.sleep(FILE_CLAIM_POLL_INTERVAL)
+
+        try:
+            await upload()
+        except BaseException:
+            await self._files_collection.release(key, owner)
+            raise
+        await self._files_collection.complete(key, owner)
+
+    async def delete_file(self, key: str) -> None:
+        """
+        Claim the file before deleting its object, a concurrent upload of the same key waits for the deletion and
+        uploads the object again.
+        """
+        owner = uuid4().hex
+        try:
+            file = await self._files_collection.claim_deletion(
+                key, owner, datetime.now(timezone.utc)
+            )
+            if file is None:
+                raise FileNotFoundException(key)
+
+            try:
+                await self._s3_client.delete_file(key)
+            except BaseException:
+                # The object is still stored
+                await self._files_collection.complete(key, owner)
+                raise
+            await self._files_collection.release(key, owner)
+        except HTTPException:
+            raise
         except Exception as ex:
             logger.log(logging.ERROR, ex)
-            raise f"Unable to delete file {key}"
+            raise FileStorageException(f"Unable to delete file {key}")
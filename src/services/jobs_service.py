@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from ..entities.job_entity import JobEntity
+from ..enums.job_status import JobStatus
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+from ..infrastructure.mongodb import JobsCollection, SchemasCollection
+from ..infrastructure.workers import PoolSaturatedException
+from ..logger import logger
+from .files_service import FilesService
+from .rag_pipeline_service import RAGPipelineService
+
+# Waiters re-read the job with this interval, covering jobs processed by other replicas
+JOB_POLL_INTERVAL = 1.0
+
+
+class JobsService:
+    """
+    Run RAG extractions in the background, persisting the job state and result.
+
+    Jobs are dispatched through an in-process queue to a fixed amount of workers. Replicas claim a job atomically
+    with a lease renewed while it runs, queued jobs and jobs whose lease expired are picked up on start and
+    periodically, so jobs interrupted by a restart or a crashed replica are not lost nor run twice.
+    """
+
+    def __init__(
+        self,
+        jobs_collection: JobsCollection,
+        schemas_collection: SchemasCollection,
+        files_service: FilesService,
+        rag_pipeline_service: RAGPipelineService,
+        *,
+        workers: int,
+        max_queue: int,
+        lease: float,
+        retry_after: int = 5,
+    ) -> None:
+        self._jobs_collection = jobs_collection
+        self._schemas_collection = schemas_collection
+        self._files_service = files_service
+        self._rag_pipeline_service = rag_pipeline_service
+        self._workers_count = workers
+        self._max_queue = max_queue
+        self._lease = timedelta(seconds=lease)
+        self._retry_after = retry_after
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._queued: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+        self._events: dict[str, asyncio.Event] = {}
+        self._waiters: Counter[str] = Counter()
+
+    async def start(self) -> None:
+        await self._recover()
+
+        self._workers = [
+            asyncio.create_task(self._work()) for _ in range(self._workers_count)
+        ]
+        self._workers.append(asyncio.create_task(self._recover_periodically()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def enqueue(
+        self,
+        user: str,
+        file_key: str,
+        content_type: str,
+        schema_id: str,
+        ocr_format: OCROutputFormat | None = None,
+        llm_backend: LLMBackendType | None = None,
+    ) -> JobEntity:
+        if self._queue.qsize() >= self._max_queue:
+            raise PoolSaturatedException("jobs", self._retry_after)
+
+        job = JobEntity(
+            user=user,
+            file_key=file_key,
+            content_type=content_type,
+            schema_id=schema_id,
+            ocr_format=ocr_format,
+            llm_backend=llm_backend,
+        )
+        await self._jobs_collection.insert(job)
+        self._put(str(job.id))
+        return job
+
+    async def find_by_id(self, id: str) -> JobEntity | None:
+        return await self._jobs_collection.find_by_id(id)
+
+    async def wait(self, id: str, timeout: float) -> JobEntity | None:
+        """
+        Long-poll the job until it finishes or the timeout expires.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self._waiters[id] += 1
+        try:
+            while True:
+                job = await self._jobs_collection.find_by_id(id)
+                remaining = deadline - loop.time()
+                if job is None or job.is_finished or remaining <= 0:
+                    return job
+
+                event = self._events.setdefault(id, asyncio.Event())
+                try:
+                    await asyncio.wait_for(
+                        event.wait(), timeout=min(remaining, JOB_POLL_INTERVAL)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            # Jobs finished by other replicas or still running never set the event, the last waiter drops it
+            self._waiters[id] -= 1
+            if not self._waiters[id]:
+                del self._waiters[id]
+                self._events.pop(id, None)
+
+    def _put(self, id: str) -> None:
+        if id not in self._queued:
+            self._queued.add(id)
+            self._queue.put_nowait(id)
+
+    async def _recover(self) -> None:
+        for job in await self._jobs_collection.find_claimable(
+            datetime.now(timezone.utc)
+        ):
+            self._put(str(job.id))
+
+    async def _recover_periodically(self) -> None:
+        # Picks up the jobs of replicas that stopped renewing their leases
+        while True:
+            await asyncio.sleep(self._lease.total_seconds())
+            try:
+                await self._recover()
+            except Exception as ex:
+                logger.log(logging.ERROR, f"Unable to recover jobs: {ex}")
+
+    async def _renew(self, id: str) -> None:
+        while True:
+            await asyncio.sleep(self._lease.total_seconds() / 3)
+            try:
+                renewed = await self._jobs_collection.renew(
+                    id, self._owner, datetime.now(timezone.utc) + self._lease
+                )
+            except Exception as ex:
+                logger.log(
+                    logging.WARNING, f"Unable to renew the lease of job {id}: {ex}"
+                )
+                continue
+
+            if not renewed:
+                logger.log(logging.WARNING, f"Lost the lease of job {id}")
+                return
+
+    async def _work(self) -> None:
+        while True:
+            id = await self._queue.get()
+            self._queued.discard(id)
+            try:
+                await self._run(id)
+            except Exception as ex:
+                logger.log(logging.ERROR, f"Unable to run job {id}: {ex}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, id: str) -> None:
+        now = datetime.now(timezone.utc)
+        job = await self._jobs_collection.claim(id, self._owner, now, now + self._lease)
+        if job is None:
+            # Finished, or running on a replica that still holds its lease
+            return
+
+        renewing = asyncio.create_task(self._renew(id))
+        try:
+            schema = await self._schemas_collection.find_by_id(job.schema_id)
+            _, content = await self._files_service.download_file(job.file_key)
+
+            result = await self._rag_pipeline_service.extract(
+                job.file_key,
+                job.content_type,
+                content,
+                schema.json_schema,
+                schema_id=job.schema_id,
+                user=job.user,
+                language=schema.language,
+                ocr_format=job.ocr_format or schema.ocr_format,
+                extraction_mode=schema.extraction_mode,
+                llm_backend=job.llm_backend or schema.llm_backend,
+            )
+
+            fields = {
+                JobEntity.status: JobStatus.SUCCEEDED,
+                JobEntity.result: result.model_dump(mode="json"),
+            }
+        except PoolSaturatedException:
+            # The OCR or LLM pools are full, back off and try the job again later
+            renewing.cancel()
+            await self._jobs_collection.release(
+                id, self._owner, {JobEntity.status: JobStatus.QUEUED}
+            )
+            await asyncio.sleep(self._retry_after)
+            self._put(id)
+            return
+        except Exception as ex:
+            logger.log(logging.ERROR, ex)
+            fields = {JobEntity.status: JobStatus.FAILED, JobEntity.error: str(ex)}
+        finally:
+            renewing.cancel()
+
+        fields[JobEntity.finished_at] = datetime.now(timezone.utc)
+        if not await self._jobs_collection.release(id, self._owner, fields):
+            logger.log(logging.WARNING, f"Job {id} was taken over by another replica")
+
+        event = self._events.pop(id, None)
+        if event is not None:
+            event.set()
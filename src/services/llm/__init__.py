@@ -2,66 +2,213 @@ import json
 import logging
 import os
 from time import time
+from typing import Any, AsyncIterator
 from pydantic import BaseModel
-from llama_index.llms.ollama import Ollama
-from llama_index.core.program import LLMTextCompletionProgram
-from llama_index.core.output_parsers import PydanticOutputParser
+from llama_index.core.constants import DEFAULT_CONTEXT_WINDOW
 
+from ...enums.llm_backend_type import LLMBackendType
+from ...enums.ocr_output_format import OCROutputFormat
 from ...logger import logger
+from .llm_backend import LLMBackend
 
 
-def interpret_text(
-    text: str,
-    model: str,
-    output_cls: type[BaseModel],
-    metadata: str,
-    *,
-    query: str = None,
-    prompt_json_schema=False,
-    language: str = "en",
-) -> BaseModel:
-    start_time = time()
+LLM_BACKEND = LLMBackendType(os.getenv("LLM_BACKEND", "ollama"))
+"""
+Backend used when neither the request nor the schema selects one.
+"""
+
+LLM_MODEL = os.getenv("LLM_MODEL", "mistral:7b")
+"""
+Model of the Ollama backend.
+"""
+
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL")
+"""
+Smaller model of the Ollama backend for small documents and simple schemas (e.g. `qwen2.5:3b`), unset to send
+everything to `LLM_MODEL`.
+"""
+
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+"""
+Model of the OpenAI-compatible backend, set `OPENAI_BASE_URL` to use a server other than OpenAI's.
+"""
+
+OPENAI_SMALL_MODEL = os.getenv("OPENAI_SMALL_MODEL")
+"""
+Smaller model of the OpenAI-compatible backend for small documents and simple schemas.
+"""
+
+LLM_STUB_LATENCY = float(os.getenv("LLM_STUB_LATENCY", "1.0"))
+"""
+Seconds the stub backend takes to answer every generation, standing in for the model latency in benchmarks.
+"""
+
+LLM_CONTEXT_WINDOW = int(os.getenv("LLM_CONTEXT_WINDOW", DEFAULT_CONTEXT_WINDOW))
+"""
+Largest context window (`num_ctx`) requested from Ollama, in tokens, shorter prompts are routed to smaller ones.
+"""
 
-    prog = LLMTextCompletionProgram.from_defaults(
-        output_parser=PydanticOutputParser(output_cls=output_cls),
-        prompt_template_str=(
-            """Você é responsável por extrair desse arquivo XML as informações solicitadas e retornar os resultados em JSON {json_schema}\
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() == "true"
+"""
+Constrain the generation to the output JSON schema (Ollama 0.5+ `format`, OpenAI `json_schema` response format),
+instead of describing the schema in the prompt and only constraining the output to JSON.
+"""
+
+PROMPT_VERSION = f"3-{'structured' if LLM_STRUCTURED_OUTPUT else 'parsed'}"
+"""
+Version of the extraction prompts, bump it whenever the prompt templates change so stored extractions are not reused.
+"""
+
+
+def get_prompt_template(language: str) -> str:
+    return (
+        """Você é responsável por extrair desse {document} as informações solicitadas e retornar os resultados em JSON {json_schema}\
         Informações necessárias: {query}\
-        Arquivo XML:\
+        {document_title}:\
         {xml}"""
-            if language == "pt"
-            else """You are responsible for extracting the required query from an XML file and output the results as a JSON {json_schema}\
+        if language == "pt"
+        else """You are responsible for extracting the required query from {document} and output the results as a JSON {json_schema}\
         Required information: {query}
-        XML file:
+        {document_title}:
         {xml}"""
-        ),
-        llm=Ollama(
-            model=model,
-            base_url=os.getenv("OLLAMA_HOST"),
-            temperature=0,
-            request_timeout=360.0,
-            json_mode=True,
-        ),
-        verbose=True,
     )
 
-    json_schema = ""
-    if prompt_json_schema:
-        json_schema = (
+
+def get_prompt(
+    text: str,
+    output_cls: type[BaseModel],
+    metadata: str,
+    *,
+    query: str = None,
+    prompt_json_schema=False,
+    json_schema: str = None,
+    language: str = "en",
+    document_format: OCROutputFormat = OCROutputFormat.ALTO,
+    structured_output: bool = LLM_STRUCTURED_OUTPUT,
+) -> str:
+    json_schema_prompt = ""
+    # The constrained generation already follows the schema, it is not repeated in the prompt
+    if prompt_json_schema and not structured_output:
+        json_schema = json_schema or json.dumps(
+            output_cls.model_json_schema(), indent=2
+        )
+        json_schema_prompt = (
             f"""de acordo com o modelo:\
-        {json.dumps(output_cls.model_json_schema(), indent=2)}
+        {json_schema}
         """
             if language == "pt"
             else f"""based on the following JSON schema:\
-        {json.dumps(output_cls.model_json_schema(), indent=2)}
+        {json_schema}
         """
         )
 
-    result = prog(xml=text, query=query if query else metadata, json_schema=json_schema)
+    is_xml = document_format in (OCROutputFormat.ALTO, OCROutputFormat.TAGGED)
+    if language == "pt":
+        document = "arquivo XML" if is_xml else "documento de texto"
+        document_title = "Arquivo XML" if is_xml else "Documento de texto"
+    else:
+        document = "an XML file" if is_xml else "a text document"
+        document_title = "XML file" if is_xml else "Text document"
+
+    return get_prompt_template(language).format(
+        xml=text,
+        query=query if query else metadata,
+        json_schema=json_schema_prompt,
+        document=document,
+        document_title=document_title,
+    )
+
+
+async def interpret_text(
+    backend: LLMBackend,
+    text: str,
+    output_cls: type[BaseModel],
+    metadata: str,
+    *,
+    model: str = None,
+    query: str = None,
+    prompt_json_schema=False,
+    json_schema: str = None,
+    output_schema: dict[str, Any] = None,
+    language: str = "en",
+    document_format: OCROutputFormat = OCROutputFormat.ALTO,
+    structured_output: bool = LLM_STRUCTURED_OUTPUT,
+    context_window: int = LLM_CONTEXT_WINDOW,
+) -> BaseModel:
+    start_time = time()
+
+    prompt = get_prompt(
+        text,
+        output_cls,
+        metadata,
+        query=query,
+        prompt_json_schema=prompt_json_schema,
+        json_schema=json_schema,
+        language=language,
+        document_format=document_format,
+        structured_output=structured_output,
+    )
+    output = await backend.generate(
+        prompt,
+        output_schema or output_cls.model_json_schema(),
+        model=model,
+        constrained=structured_output,
+        context_window=context_window,
+    )
+    result = output_cls.model_validate_json(output)
 
     end_time = time()
     logger.log(
-        logging.INFO, f"Elapsed time of {model} = {end_time - start_time} seconds"
+        logging.INFO,
+        f"Elapsed time of {model or backend.model} = {end_time - start_time} seconds",
     )
 
     return result
+
+
+async def stream_text(
+    backend: LLMBackend,
+    text: str,
+    output_cls: type[BaseModel],
+    metadata: str,
+    *,
+    model: str = None,
+    query: str = None,
+    prompt_json_schema=False,
+    json_schema: str = None,
+    output_schema: dict[str, Any] = None,
+    language: str = "en",
+    document_format: OCROutputFormat = OCROutputFormat.ALTO,
+    structured_output: bool = LLM_STRUCTURED_OUTPUT,
+    context_window: int = LLM_CONTEXT_WINDOW,
+) -> AsyncIterator[str]:
+    """
+    Generate the same output as `interpret_text`, yielding the raw JSON output as it is generated.
+    """
+    start_time = time()
+
+    prompt = get_prompt(
+        text,
+        output_cls,
+        metadata,
+        query=query,
+        prompt_json_schema=prompt_json_schema,
+        json_schema=json_schema,
+        language=language,
+        document_format=document_format,
+        structured_output=structured_output,
+    )
+    async for chunk in backend.stream(
+        prompt,
+        output_schema or output_cls.model_json_schema(),
+        model=model,
+        constrained=structured_output,
+        context_window=context_window,
+    ):
+        yield chunk
+
+    end_time = time()
+    logger.log(
+        logging.INFO,
+        f"Elapsed time of {model or backend.model} = {end_time - start_time} seconds",
+    )
@@ -0,0 +1,56 @@
+from typing import Any, AsyncIterator
+from ollama import AsyncClient
+
+from ..llm_backend import LLMBackend
+
+
+class OllamaBackend(LLMBackend):
+    def __init__(
+        self, base_url: str, model: str, small_model: str | None = None
+    ) -> None:
+        super().__init__(model, small_model)
+        # Long-lived client, reusing its pooled HTTP connections across requests
+        self._client = AsyncClient(host=base_url, timeout=360.0)
+
+    async def generate(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> str:
+        response = await self._client.generate(
+            model=model or self.model,
+            prompt=prompt,
+            format=self._get_format(output_schema, constrained),
+            options=self._get_options(context_window),
+        )
+        return response["response"]
+
+    async def stream(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> AsyncIterator[str]:
+        chunks = await self._client.generate(
+            model=model or self.model,
+            prompt=prompt,
+            format=self._get_format(output_schema, constrained),
+            options=self._get_options(context_window),
+            stream=True,
+        )
+        async for chunk in chunks:
+            yield chunk["response"]
+
+    def _get_format(self, output_schema: dict[str, Any], constrained: bool) -> Any:
+        # ollama-python types `format` as "json" only, the server (0.5+) also accepts a JSON schema
+        return output_schema if constrained else "json"
+
+    def _get_options(self, context_window: int) -> dict[str, Any]:
+        return {"temperature": 0, "num_ctx": context_window}
@@ -0,0 +1,80 @@
+from typing import Any, AsyncIterator
+
+from ..llm_backend import LLMBackend
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    OpenAI or any server implementing its chat completions API (vLLM, llama.cpp, LM Studio, ...).
+
+    The context window is configured on the server, it cannot be selected per request.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None,
+        api_key: str,
+        model: str,
+        small_model: str | None = None,
+    ) -> None:
+        super().__init__(model, small_model)
+        self._base_url = base_url
+        self._api_key = api_key
+        self._client: "AsyncOpenAI" = None
+
+    async def generate(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> str:
+        response = await self._get_client().chat.completions.create(
+            model=model or self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=self._get_response_format(output_schema, constrained),
+            temperature=0,
+        )
+        return response.choices[0].message.content
+
+    async def stream(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> AsyncIterator[str]:
+        chunks = await self._get_client().chat.completions.create(
+            model=model or self.model,
+            messages=[{"role": "user", "content": prompt}],
+            response_format=self._get_response_format(output_schema, constrained),
+            temperature=0,
+            stream=True,
+        )
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def _get_client(self) -> "AsyncOpenAI":
+        # Imported on first use, deployments only running Ollama do not need the package loaded
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                base_url=self._base_url, api_key=self._api_key, timeout=360.0
+            )
+        return self._client
+
+    def _get_response_format(
+        self, output_schema: dict[str, Any], constrained: bool
+    ) -> dict[str, Any]:
+        if not constrained:
+            return {"type": "json_object"}
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "extraction", "schema": output_schema},
+        }
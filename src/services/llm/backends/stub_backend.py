@@ -0,0 +1,95 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator
+
+from ..llm_backend import LLMBackend
+
+STUB_CHUNK_SIZE = 8
+"""
+Amount of characters of every streamed chunk, roughly a couple of tokens.
+"""
+
+
+class StubBackend(LLMBackend):
+    """
+    Local backend answering every prompt with a placeholder output of the schema after a fixed latency.
+
+    The output only depends on the schema, so benchmarks and load tests of everything but the model run offline
+    and reproducibly.
+    """
+
+    def __init__(
+        self, latency: float, model: str = "stub", small_model: str | None = None
+    ) -> None:
+        super().__init__(model, small_model)
+        self._latency = latency
+
+    async def generate(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> str:
+        await asyncio.sleep(self._latency)
+        return self._get_output(output_schema)
+
+    async def stream(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> AsyncIterator[str]:
+        output = self._get_output(output_schema)
+        chunks = [
+            output[start : start + STUB_CHUNK_SIZE]
+            for start in range(0, len(output), STUB_CHUNK_SIZE)
+        ]
+        # The latency is spread across the chunks, as a model generating at a steady rate
+        for chunk in chunks:
+            await asyncio.sleep(self._latency / len(chunks))
+            yield chunk
+
+    def _get_output(self, output_schema: dict[str, Any]) -> str:
+        return json.dumps(self._sample(output_schema, output_schema.get("$defs", {})))
+
+    def _sample(self, schema: dict[str, Any], definitions: dict[str, Any]) -> Any:
+        """
+        Placeholder value of a JSON schema generated from a Pydantic model: strings are filled with the field
+        title, numbers with zero and arrays with a single item.
+        """
+        if "$ref" in schema:
+            return self._sample(definitions[schema["$ref"].split("/")[-1]], definitions)
+
+        if "anyOf" in schema:
+            # Optional fields are rendered as their non-null type
+            options = [
+                option for option in schema["anyOf"] if option.get("type") != "null"
+            ]
+            if not options:
+                return None
+            return self._sample(
+                {"title": schema.get("title"), **options[0]}, definitions
+            )
+
+        match schema.get("type"):
+            case "object":
+                return {
+                    name: self._sample(prop, definitions)
+                    for name, prop in schema.get("properties", {}).items()
+                }
+            case "array":
+                return [self._sample(schema.get("items", {}), definitions)]
+            case "string":
+                return schema.get("title") or ""
+            case "number" | "integer":
+                return 0
+            case "boolean":
+                return False
+            case _:
+                return None
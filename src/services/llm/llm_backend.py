@@ -0,0 +1,50 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator
+
+
+class LLMBackend(ABC):
+    """
+    Server generating the JSON output of an extraction prompt.
+    """
+
+    def __init__(self, model: str, small_model: str | None = None) -> None:
+        self.model = model
+        """
+        The model used when a generation does not select one.
+        """
+
+        self.small_model = small_model
+        """
+        A smaller and faster model for small documents and simple schemas, see `ModelRouterService`.
+        """
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> str:
+        """
+        Return the JSON output, constrained to `output_schema` when `constrained` is set, otherwise to any JSON
+        object.
+        """
+        pass
+
+    @abstractmethod
+    def stream(
+        self,
+        prompt: str,
+        output_schema: dict[str, Any],
+        *,
+        model: str = None,
+        constrained: bool,
+        context_window: int,
+    ) -> AsyncIterator[str]:
+        """
+        Generate the same output as `generate`, yielding it as it is generated.
+        """
+        pass
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator
+from pydantic import BaseModel
+
+from ..entities.json_schema_entity import JsonSchemaEntity
+from ..logger import logger
+from .llm import LLM_CONTEXT_WINDOW
+from .llm.llm_backend import LLMBackend
+
+ROUTER_SMALL_MAX_TOKENS = int(os.getenv("ROUTER_SMALL_MAX_TOKENS", "1500"))
+"""
+Maximum amount of document tokens sent to the small model of the backend.
+"""
+
+ROUTER_SMALL_MAX_FIELDS = int(os.getenv("ROUTER_SMALL_MAX_FIELDS", "8"))
+"""
+Maximum amount of schema fields extracted by the small model of the backend.
+"""
+
+ROUTER_SMALL_MAX_DEPTH = int(os.getenv("ROUTER_SMALL_MAX_DEPTH", "1"))
+"""
+Maximum schema nesting extracted by the small model of the backend, a flat object has depth 1.
+"""
+
+ROUTER_MIN_CONTEXT_WINDOW = int(os.getenv("ROUTER_MIN_CONTEXT_WINDOW", "2048"))
+"""
+Smallest context window requested, context windows are doubled from it up to `LLM_CONTEXT_WINDOW`.
+"""
+
+ROUTER_PROMPT_TOKENS = int(os.getenv("ROUTER_PROMPT_TOKENS", "256"))
+"""
+Tokens of the prompt template and schema description added to the document tokens.
+"""
+
+ROUTER_TOKENS_PER_FIELD = int(os.getenv("ROUTER_TOKENS_PER_FIELD", "48"))
+"""
+Output tokens reserved per schema field, array items are counted once.
+"""
+
+ROUTER_TOKEN_HEADROOM = float(os.getenv("ROUTER_TOKEN_HEADROOM", "1.3"))
+"""
+Factor applied to the estimated prompt tokens when sizing the context window. Model tokenizers split ALTO XML, digits
+and Portuguese text into more tokens than the estimate, and Ollama silently drops the start of prompts that overflow it.
+"""
+
+ROUTER_TOKEN_ENCODING = os.getenv("ROUTER_TOKEN_ENCODING", "cl100k_base")
+"""
+tiktoken encoding used to approximate the model tokenizers.
+"""
+
+
+def load_encoding(name: str) -> "tiktoken.Encoding | None":
+    """
+    Load the tiktoken encoding, `None` when it cannot be loaded. tiktoken downloads it on first use unless it is
+    found in `TIKTOKEN_CACHE_DIR`, so it is blocking and loaded once on startup.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as ex:
+        logger.log(
+            logging.WARNING,
+            f"Unable to load the {name} encoding, estimating token counts: {ex}",
+        )
+        return None
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    name: str
+    """
+    `small` for documents and schemas within the small model thresholds, `default` otherwise.
+    """
+
+    model: str
+    context_window: int
+    tokens: int
+    """
+    The measured document tokens.
+    """
+
+    fields: int
+    depth: int
+
+
+class ModelRouteStats(BaseModel):
+    name: str
+    model: str
+    context_window: int
+    requests_total: int = 0
+    failed_total: int = 0
+    latency_seconds_total: float = 0.0
+    latency_seconds_max: float = 0.0
+    tokens_total: int = 0
+    fields_total: int = 0
+
+
+class ModelRouterService:
+    """
+    Choose the model and context window of every generation from the document size and the schema complexity.
+
+    Small documents with simple schemas go to the backend's small model when it has one. Context windows are only
+    as large as the prompt needs, in powers of two so Ollama only keeps a few runner configurations loaded.
+    The latency of every route is recorded to tune the thresholds.
+    """
+
+    def __init__(self) -> None:
+        self._stats: dict[tuple[str, str, int], ModelRouteStats] = {}
+        self._encoding: "tiktoken.Encoding | None" = None
+
+    async def start(self) -> None:
+        self._encoding = await asyncio.to_thread(load_encoding, ROUTER_TOKEN_ENCODING)
+
+    def fingerprint(self, backend: LLMBackend) -> str:
+        """
+        SHA-256 of the backend models and routing settings, a document and schema are always routed to the same
+        model and context window under the same fingerprint.
+        """
+        settings = [
+            backend.model,
+            backend.small_model,
+            ROUTER_SMALL_MAX_TOKENS,
+            ROUTER_SMALL_MAX_FIELDS,
+            ROUTER_SMALL_MAX_DEPTH,
+            ROUTER_MIN_CONTEXT_WINDOW,
+            ROUTER_PROMPT_TOKENS,
+            ROUTER_TOKENS_PER_FIELD,
+            ROUTER_TOKEN_HEADROOM,
+            ROUTER_TOKEN_ENCODING if self._encoding is not None else None,
+            LLM_CONTEXT_WINDOW,
+        ]
+        return hashlib.sha256(json.dumps(settings).encode("utf-8")).hexdigest()
+
+    def route(
+        self, backend: LLMBackend, text: str, schema: JsonSchemaEntity
+    ) -> ModelRoute:
+        tokens = self._count_tokens(text)
+        fields = schema.field_count
+        depth = schema.depth
+
+        is_small = (
+            backend.small_model is not None
+            and tokens <= ROUTER_SMALL_MAX_TOKENS
+            and fields <= ROUTER_SMALL_MAX_FIELDS
+            and depth <= ROUTER_SMALL_MAX_DEPTH
+        )
+
+        return ModelRoute(
+            name="small" if is_small else "default",
+            model=backend.small_model if is_small else backend.model,
+            context_window=self._get_context_window(
+                math.ceil(
+                    (tokens + ROUTER_PROMPT_TOKENS + fields * ROUTER_TOKENS_PER_FIELD)
+                    * ROUTER_TOKEN_HEADROOM
+                )
+            ),
+            tokens=tokens,
+            fields=fields,
+            depth=depth,
+        )
+
+    @contextmanager
+    def measure(self, route: ModelRoute) -> Iterator[None]:
+        """
+        Record the latency of a generation through the route.
+        """
+        key = (route.name, route.model, route.context_window)
+        stats = self._stats.setdefault(
+            key,
+            ModelRouteStats(
+                name=route.name,
+                model=route.model,
+                context_window=route.context_window,
+            ),
+        )
+
+        started_at = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            stats.failed_total += 1
+            raise
+        finally:
+            latency = time.perf_counter() - started_at
+            stats.requests_total += 1
+            stats.latency_seconds_total += latency
+            stats.latency_seconds_max = max(stats.latency_seconds_max, latency)
+            stats.tokens_total += route.tokens
+            stats.fields_total += route.fields
+
+    def stats(self) -> list[ModelRouteStats]:
+        return list(self._stats.values())
+
+    def _count_tokens(self, text: str) -> int:
+        if self._encoding is None:
+            # Roughly 4 characters per token for English and Portuguese text
+            return len(text) // 4
+        return len(self._encoding.encode_ordinary(text))
+
+    def _get_context_window(self, tokens: int) -> int:
+        context_window = ROUTER_MIN_CONTEXT_WINDOW
+        while context_window < tokens and context_window < LLM_CONTEXT_WINDOW:
+            context_window *= 2
+        return min(context_window, LLM_CONTEXT_WINDOW)
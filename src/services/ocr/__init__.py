@@ -1,15 +1,27 @@
+import os
 from ...enums.ocr_file_type import OCRFileType
 from ...dtos.ocr_file_dto import OCRFileDto
 from .strategies.image_strategy import ImageStrategy
 from .strategies.pdf_strategy import PDFStrategy
 from .strategies.docx_strategy import DOCXStrategy
+from .strategies.txt_strategy import TXTStrategy
 from .ocr_file_handler_context import OCRFileHandlerContext
+from .ocr_file_handler_strategy import OCR_POOL_WORKERS, ProgressCallback
 
 
 context = OCRFileHandlerContext()
 
+OCR_CONFIG_VERSION = os.getenv("OCR_CONFIG_VERSION", "4")
+"""
+Version of the preprocessing and Tesseract settings, bump it whenever they change so cached OCR outputs are not reused.
+"""
 
-def extract_markup(content_type: str, content: bytes) -> bytes:
+
+def extract_markup(
+    content_type: str, content: bytes, progress: ProgressCallback = None
+) -> bytes:
+    # Drop parameters like `text/plain; charset=utf-8`
+    content_type = content_type.split(";")[0].strip().lower()
     content_subtype = content_type.split("/")[-1]
     type: OCRFileType = None
 
@@ -17,6 +29,10 @@ def extract_markup(content_type: str, content: bytes) -> bytes:
         type = OCRFileType[content_subtype.upper()]
         context.strategy = ImageStrategy()
 
+    if content_type.startswith("text"):
+        type = OCRFileType.TXT
+        context.strategy = TXTStrategy()
+
     match content_subtype:
         case "pdf":
             type = OCRFileType.PDF
@@ -24,5 +40,14 @@ def extract_markup(content_type: str, content: bytes) -> bytes:
         case "vnd.openxmlformats-officedocument.wordprocessingml.document":
             type = OCRFileType.DOCX
             context.strategy = DOCXStrategy()
+        case "csv":
+            type = OCRFileType.CSV
+            context.strategy = TXTStrategy(delimiter=",")
+        case "tab-separated-values":
+            type = OCRFileType.CSV
+            context.strategy = TXTStrategy(delimiter="\t")
+
+    if type is None:
+        raise ValueError(f"Unsupported content type {content_type}")
 
-    return context.extract_data(OCRFileDto(content=content, type=type))
+    return context.extract_data(OCRFileDto(content=content, type=type), progress)
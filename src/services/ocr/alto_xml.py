@@ -0,0 +1,159 @@
+from typing import NamedTuple
+from xml.etree import ElementTree as ET
+
+ALTO_NAMESPACE = "http://www.loc.gov/standards/alto/ns-v3#"
+
+
+class AltoString(NamedTuple):
+    """
+    A positioned word, coordinates are in pixels from the top left corner of the page.
+    """
+
+    content: str
+    hpos: float
+    vpos: float
+    width: float
+    height: float
+
+
+# Virtual monospace grid used to lay out text without physical positions
+CHAR_WIDTH = 10
+LINE_HEIGHT = 20
+CELL_GAP = 4
+
+AltoLine = list[AltoString]
+AltoBlock = list[AltoLine]
+
+
+def to_alto_xml(
+    width: float, height: float, blocks: list[AltoBlock], *, source: str
+) -> bytes:
+    """
+    Build an ALTO document for a single page with the same layout used by Tesseract's ALTO renderer.
+    """
+    alto = ET.Element("alto", {"xmlns": ALTO_NAMESPACE})
+
+    description = ET.SubElement(alto, "Description")
+    ET.SubElement(description, "MeasurementUnit").text = "pixel"
+    processing = ET.SubElement(description, "OCRProcessing", {"ID": "OCR_0"})
+    step = ET.SubElement(processing, "ocrProcessingStep")
+    software = ET.SubElement(step, "processingSoftware")
+    ET.SubElement(software, "softwareName").text = source
+
+    layout = ET.SubElement(alto, "Layout")
+    page = ET.SubElement(
+        layout,
+        "Page",
+        {
+            "WIDTH": _coord(width),
+            "HEIGHT": _coord(height),
+            "PHYSICAL_IMG_NR": "0",
+            "ID": "page_0",
+        },
+    )
+    print_space = ET.SubElement(
+        page,
+        "PrintSpace",
+        {"HPOS": "0", "VPOS": "0", "WIDTH": _coord(width), "HEIGHT": _coord(height)},
+    )
+
+    line_index = 0
+    for block_index, lines in enumerate(block for block in blocks if block):
+        block = ET.SubElement(
+            print_space,
+            "TextBlock",
+            {"ID": f"block_{block_index}", **_box(_bounds(sum(lines, [])))},
+        )
+        for words in lines:
+            line = ET.SubElement(
+                block, "TextLine", {"ID": f"line_{line_index}", **_box(_bounds(words))}
+            )
+            for word_index, word in enumerate(words):
+                if word_index > 0:
+                    ET.SubElement(line, "SP")
+                ET.SubElement(
+                    line,
+                    "String",
+                    {
+                        "ID": f"string_{line_index}_{word_index}",
+                        **_box(word),
+                        "WC": "1.00",
+                        "CONTENT": word.content,
+                    },
+                )
+            line_index += 1
+
+    return ET.tostring(alto, encoding="UTF-8", xml_declaration=True)
+
+
+def layout_text(
+    blocks: list[list[list[str]]],
+) -> tuple[float, float, list[AltoBlock]]:
+    """
+    Lay out text without physical positions (e.g. DOCX, plain text) on a virtual monospace grid.
+
+    Each block is a list of lines and each line a list of cells (e.g. table columns), cells are aligned in columns
+    and blocks are separated by an empty line, so line grouping and reading order survive the conversion.
+    Returns the page width, height and the positioned blocks.
+    """
+    positioned: list[AltoBlock] = []
+    width = 0
+    row = 0
+    for block in blocks:
+        # Align the cells of every line in the block to the widest cell of their column
+        column_widths: list[int] = []
+        for cells in block:
+            for index, cell in enumerate(cells):
+                cell_width = len(" ".join(cell.split()))
+                if index < len(column_widths):
+                    column_widths[index] = max(column_widths[index], cell_width)
+                else:
+                    column_widths.append(cell_width)
+
+        lines: AltoBlock = []
+        for cells in block:
+            words: AltoLine = []
+            column = 0
+            for index, cell in enumerate(cells):
+                column = sum(column_widths[:index]) + index * CELL_GAP
+                for word in cell.split():
+                    words.append(
+                        AltoString(
+                            content=word,
+                            hpos=column * CHAR_WIDTH,
+                            vpos=row * LINE_HEIGHT,
+                            width=len(word) * CHAR_WIDTH,
+                            height=LINE_HEIGHT,
+                        )
+                    )
+                    column += len(word) + 1
+            if words:
+                lines.append(words)
+                width = max(width, column * CHAR_WIDTH)
+                row += 1
+        if lines:
+            positioned.append(lines)
+            row += 1
+
+    return width, row * LINE_HEIGHT, positioned
+
+
+def _bounds(words: list[AltoString]) -> AltoString:
+    hpos = min(word.hpos for word in words)
+    vpos = min(word.vpos for word in words)
+    right = max(word.hpos + word.width for word in words)
+    bottom = max(word.vpos + word.height for word in words)
+    return AltoString("", hpos, vpos, right - hpos, bottom - vpos)
+
+
+def _box(word: AltoString) -> dict[str, str]:
+    return {
+        "HPOS": _coord(word.hpos),
+        "VPOS": _coord(word.vpos),
+        "WIDTH": _coord(word.width),
+        "HEIGHT": _coord(word.height),
+    }
+
+
+def _coord(value: float) -> str:
+    return str(max(0, round(value)))
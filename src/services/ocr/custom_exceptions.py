@@ -0,0 +1,12 @@
+from fastapi import HTTPException
+
+
+class OCRFailedException(HTTPException):
+    """
+    Raised instead of returning a partial OCR output, which would otherwise be cached.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(
+            status_code=422, detail=f"Unable to extract the file content: {reason}"
+        )
@@ -0,0 +1,116 @@
+import math
+import os
+from pypdf import PageObject
+
+from .alto_xml import AltoString, to_alto_xml
+
+PDF_TEXT_LAYER_MIN_CHARS = int(os.getenv("PDF_TEXT_LAYER_MIN_CHARS", "32"))
+"""
+Pages with fewer visible characters in their text layer are considered scanned and go through OCR.
+"""
+
+PDF_TEXT_LAYER_MIN_PRINTABLE_RATIO = 0.9
+"""
+Text layers with broken font encodings decode into unprintable characters, those pages go through OCR as well.
+"""
+
+# Average glyph width relative to the font size, used to estimate word boxes
+GLYPH_WIDTH_RATIO = 0.5
+# Distance between the baseline and the top of the glyphs relative to the font size
+ASCENT_RATIO = 0.8
+LINE_SPACING_RATIO = 1.2
+
+
+def extract_text_layer(page: PageObject, dpi: int) -> bytes | None:
+    """
+    Extract the positioned words of a born-digital PDF page as ALTO XML, using the same pixel scale the page would be rasterized with.
+
+    Returns `None` when the page has no usable text layer and must be OCR'd instead.
+    """
+    if page.rotation % 360 != 0:
+        return None
+
+    scale = dpi / 72
+    box = page.cropbox
+    left, top = float(box.left), float(box.top)
+    words: list[AltoString] = []
+
+    def visitor(
+        text: str, cm: list[float], tm: list[float], font: dict, font_size: float
+    ):
+        if not text.strip():
+            return
+
+        matrix = _multiply(tm, cm)
+        size = font_size * (math.hypot(matrix[2], matrix[3]) or 1)
+        x, baseline = matrix[4], matrix[5]
+
+        for line_index, line in enumerate(text.split("\n")):
+            line_top = (
+                baseline + size * ASCENT_RATIO - line_index * size * LINE_SPACING_RATIO
+            )
+            hpos = x
+            for chunk in line.split(" "):
+                width = len(chunk) * size * GLYPH_WIDTH_RATIO
+                if chunk:
+                    words.append(
+                        AltoString(
+                            content=chunk,
+                            hpos=(hpos - left) * scale,
+                            vpos=(top - line_top) * scale,
+                            width=width * scale,
+                            height=size * scale,
+                        )
+                    )
+                hpos += width + size * GLYPH_WIDTH_RATIO
+
+    page.extract_text(visitor_text=visitor)
+
+    characters = "".join(word.content for word in words)
+    if len(characters) < PDF_TEXT_LAYER_MIN_CHARS:
+        return None
+
+    printable = sum(
+        character.isprintable() and character != "�" for character in characters
+    )
+    if printable / len(characters) < PDF_TEXT_LAYER_MIN_PRINTABLE_RATIO:
+        return None
+
+    return to_alto_xml(
+        float(box.width) * scale,
+        float(box.height) * scale,
+        [_group_lines(words)],
+        source="pypdf text layer",
+    )
+
+
+def _multiply(m: list[float], n: list[float]) -> list[float]:
+    """
+    Multiply two PDF affine matrices in `[a b c d e f]` form.
+    """
+    return [
+        m[0] * n[0] + m[1] * n[2],
+        m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2],
+        m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4],
+        m[4] * n[1] + m[5] * n[3] + n[5],
+    ]
+
+
+def _group_lines(words: list[AltoString]) -> list[list[AltoString]]:
+    """
+    Group words sharing the same vertical position into lines in reading order.
+    """
+    lines: list[list[AltoString]] = []
+    for word in sorted(words, key=lambda word: (word.vpos, word.hpos)):
+        line = lines[-1] if lines else None
+        if (
+            line
+            and abs(word.vpos - line[0].vpos) <= min(word.height, line[0].height) / 2
+        ):
+            line.append(word)
+        else:
+            lines.append([word])
+
+    return [sorted(line, key=lambda word: word.hpos) for line in lines]
@@ -0,0 +1,138 @@
+import os
+import re
+from typing import NamedTuple
+from xml.etree import ElementTree as ET
+
+from ...enums.ocr_output_format import OCROutputFormat
+
+OCR_OUTPUT_FORMAT = OCROutputFormat(os.getenv("OCR_OUTPUT_FORMAT", "alto"))
+"""
+Format sent to the LLM when neither the request nor the schema define one.
+"""
+
+LAYOUT_COLUMNS = int(os.getenv("OCR_LAYOUT_COLUMNS", "120"))
+"""
+Maximum amount of character columns a page is mapped to by the `lines` format.
+"""
+
+# Extracted markups are ALTO documents, one per page, joined by new lines
+XML_DECLARATION = re.compile(rb"(?=<\?xml )")
+
+
+class Word(NamedTuple):
+    content: str
+    hpos: float
+    width: float
+
+
+class Page(NamedTuple):
+    columns_per_pixel: float
+    blocks: list[list[list[Word]]]
+
+
+def format_markup(markup: bytes, format: OCROutputFormat) -> str:
+    """
+    Render the extracted ALTO markup in the given format.
+    """
+    if format == OCROutputFormat.ALTO:
+        return markup.decode("utf-8")
+
+    pages = _parse_pages(markup)
+    match format:
+        case OCROutputFormat.TEXT:
+            return "\n\n".join(
+                "\n\n".join(
+                    "\n".join(" ".join(word.content for word in line) for line in block)
+                    for block in page.blocks
+                )
+                for page in pages
+            )
+        case OCROutputFormat.LINES:
+            return "\n\n".join(
+                "\n".join(
+                    _layout_line(line, page.columns_per_pixel)
+                    for block in page.blocks
+                    for line in block
+                )
+                for page in pages
+            )
+        case OCROutputFormat.TAGGED:
+            return "\n".join(
+                f'<page n="{number}">\n'
+                + "".join(
+                    "<block>\n"
+                    + "".join(
+                        " ".join(word.content for word in line) + "\n" for line in block
+                    )
+                    + "</block>\n"
+                    for block in page.blocks
+                )
+                + "</page>"
+                for number, page in enumerate(pages, 1)
+            )
+
+    raise ValueError(f"Unsupported OCR output format {format}")
+
+
+def _parse_pages(markup: bytes) -> list[Page]:
+    pages: list[Page] = []
+    for document in XML_DECLARATION.split(markup):
+        if not document.strip():
+            continue
+
+        root = ET.fromstring(document)
+        for page in root.iterfind(".//{*}Page"):
+            blocks = [
+                [
+                    [
+                        Word(
+                            string.get("CONTENT", ""),
+                            float(string.get("HPOS", 0)),
+                            float(string.get("WIDTH", 0)),
+                        )
+                        for string in line.iterfind("{*}String")
+                    ]
+                    for line in block.iterfind("{*}TextLine")
+                ]
+                for block in page.iterfind(".//{*}TextBlock")
+            ]
+            blocks = [
+                [line for line in block if line] for block in blocks if any(block)
+            ]
+            pages.append(
+                Page(
+                    columns_per_pixel=_columns_per_pixel(
+                        blocks, float(page.get("WIDTH", 0))
+                    ),
+                    blocks=blocks,
+                )
+            )
+    return pages
+
+
+def _columns_per_pixel(blocks: list[list[list[Word]]], width: float) -> float:
+    """
+    Map pixels to columns using the median character width of the page, narrowed to fit `LAYOUT_COLUMNS` columns.
+    """
+    character_widths = sorted(
+        word.width / len(word.content)
+        for block in blocks
+        for line in block
+        for word in line
+        if word.content and word.width
+    )
+    if not character_widths:
+        return 0
+    character_width = character_widths[len(character_widths) // 2]
+    return 1 / max(character_width, width / LAYOUT_COLUMNS)
+
+
+def _layout_line(words: list[Word], columns_per_pixel: float) -> str:
+    """
+    Place every word at its column, keeping at least one space between words.
+    """
+    line = ""
+    for word in words:
+        column = round(word.hpos * columns_per_pixel)
+        line += " " * max(column - len(line), 1 if line else 0) + word.content
+    return line
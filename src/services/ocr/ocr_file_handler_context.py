@@ -1,5 +1,5 @@
 from ...dtos.ocr_file_dto import OCRFileDto
-from .ocr_file_handler_strategy import OCRFileHandlerStrategy
+from .ocr_file_handler_strategy import OCRFileHandlerStrategy, ProgressCallback
 
 
 class OCRFileHandlerContext:
@@ -14,5 +14,5 @@ class OCRFileHandlerContext:
     def strategy(self, strategy: OCRFileHandlerStrategy) -> None:
         self._strategy = strategy
 
-    def extract_data(self, file: OCRFileDto) -> None:
-        return self._strategy.execute(file)
+    def extract_data(self, file: OCRFileDto, progress: ProgressCallback = None) -> None:
+        return self._strategy.execute(file, progress)
@@ -1,9 +1,27 @@
+import os
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from ...dtos.ocr_file_dto import OCRFileDto
 
+ProgressCallback = Callable[[tuple[int, int]], None]
+"""
+Receives the `(page number, page count)` of every processed page, it may be called from other threads.
+"""
+
+OCR_POOL_WORKERS = int(os.getenv("OCR_POOL_WORKERS", os.cpu_count() or 1))
+"""
+Amount of OCR worker processes.
+"""
+
+OCR_THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // OCR_POOL_WORKERS)
+"""
+Pages or images each OCR worker processes at once, every one of them runs a Tesseract process, so all workers
+together run about one per CPU.
+"""
+
 
 class OCRFileHandlerStrategy(ABC):
     @abstractmethod
-    def execute(self, file: OCRFileDto) -> bytes:
+    def execute(self, file: OCRFileDto, progress: ProgressCallback = None) -> bytes:
         pass
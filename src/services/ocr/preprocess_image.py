@@ -1,5 +1,8 @@
 import cv2
 import numpy as np
+from PIL import Image
+
+ImageSource = str | bytes | Image.Image | np.ndarray
 
 
 def deskew(image: cv2.typing.MatLike) -> cv2.typing.MatLike:
@@ -23,7 +26,30 @@ def deskew(image: cv2.typing.MatLike) -> cv2.typing.MatLike:
     return rotated
 
 
-def preprocess_image(image_path: str) -> cv2.typing.MatLike:
+def load_grayscale(image: ImageSource) -> cv2.typing.MatLike:
+    """
+    Load the image as a grayscale matrix from a file path, encoded bytes, a PIL image or a NumPy array without any filesystem round-trip for in-memory sources.
+    """
+    if isinstance(image, str):
+        img = cv2.imread(image, cv2.IMREAD_GRAYSCALE)
+    elif isinstance(image, (bytes, bytearray, memoryview)):
+        img = cv2.imdecode(np.frombuffer(image, np.uint8), cv2.IMREAD_GRAYSCALE)
+    elif isinstance(image, Image.Image):
+        img = np.asarray(image if image.mode == "L" else image.convert("L"))
+    elif image.ndim == 3:
+        img = cv2.cvtColor(
+            image,
+            cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY,
+        )
+    else:
+        img = image
+
+    if img is None:
+        raise ValueError("Unable to decode the image")
+    return img
+
+
+def preprocess_image(image: ImageSource) -> cv2.typing.MatLike:
 
     # Step by step image preprocessor:
     # 1. Load the image
@@ -31,7 +57,7 @@ def preprocess_image(image_path: str) -> cv2.typing.MatLike:
     # 3. Apply Denoising
     # 4. ApplyThresholding
 
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    img = load_grayscale(image)
     deskewed_img = img  # deskew(img)
     resized_img = cv2.resize(
         deskewed_img, None, fx=1.5, fy=1.5, interpolation=cv2.INTER_CUBIC
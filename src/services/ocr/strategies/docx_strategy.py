@@ -1,57 +1,93 @@
 import logging
 import os
-import tempfile
-from spire.doc import Document, Stream, ImageType
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from docx import Document
+from docx.document import Document as DocumentObject
+from docx.table import Table
+from docx.text.paragraph import Paragraph
 
 from ....dtos.ocr_file_dto import OCRFileDto
 from ....logger import logger
-from ..ocr_file_handler_strategy import OCRFileHandlerStrategy
+from ..alto_xml import layout_text, to_alto_xml
+from ..custom_exceptions import OCRFailedException
+from ..ocr_file_handler_strategy import (
+    OCR_THREADS_PER_WORKER,
+    OCRFileHandlerStrategy,
+    ProgressCallback,
+)
 from ..preprocess_image import preprocess_image
 from ..extract_text_with_tesseract import extract_text_with_tesseract
 
+DOCX_MAX_INFLIGHT_IMAGES = int(
+    os.getenv("DOCX_MAX_INFLIGHT_IMAGES", OCR_THREADS_PER_WORKER)
+)
+"""
+Maximum amount of embedded images OCR'd at once.
+"""
+
 
 class DOCXStrategy(OCRFileHandlerStrategy):
-    def execute(self, file: OCRFileDto) -> bytes:
-        document = Document(Stream(file.content))
-
-        results = []
-        for i in range(document.GetPageCount()):
-            page_stream = document.SaveImageToStreams(i, ImageType.Bitmap)
-
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_img:
-                try:
-                    temp_img.write(page_stream.ToArray())
-                    temp_img.flush()
-
-                    preprocessed_image = preprocess_image(temp_img.name)
-                    results.append(extract_text_with_tesseract(preprocessed_image))
-                except Exception as ex:
-                    logger.log(logging.ERROR, str(ex))
-                os.remove(temp_img.name)
-
-        return b"\n".join(results)
-
-    # def execute(self, file: OCRFileDto) -> bytes | None:
-    #     # Process DOCX files to extract text directly
-    #     doc = Document(BytesIO(file.content))
-    #     alto_xml_root = docx_to_alto_xml_text(doc)
-
-    #     # Convert embedded images for OCR
-    #     ocr_results = []
-    #     for rel in doc.part.rels.values():
-    #         if "image" in rel.target_ref or "media" in rel.target_ref:
-    #             with tempfile.NamedTemporaryFile(
-    #                 suffix=f".{rel.target_ref.split(".")[-1]}", delete=False
-    #             ) as temp_img:
-    #                 try:
-    #                     temp_img.write(rel.target_part.blob)
-    #                     temp_img.flush()
-
-    #                     preprocessed_image = preprocess_image(temp_img.name)
-    #                     ocr_results.append(extract_text_with_tesseract(preprocessed_image))
-    #                 except Exception as ex:
-    #                     logger.log(logging.ERROR, str(ex))
-    #                 os.remove(temp_img.name)
-
-    #     # Combine text and image OCR results
-    #     return b"\n".join([ET.tostring(alto_xml_root, encoding="utf-8"), *ocr_results])
+    def execute(self, file: OCRFileDto, progress: ProgressCallback = None) -> bytes:
+        # Process DOCX files to extract text directly
+        document = Document(BytesIO(file.content))
+        width, height, blocks = layout_text(self._extract_blocks(document))
+        text_result = to_alto_xml(width, height, blocks, source="python-docx")
+
+        # Only the embedded images need OCR, Tesseract runs as a subprocess so threads run them in parallel
+        images = [
+            rel.target_part.blob
+            for rel in document.part.rels.values()
+            if not rel.is_external and "image" in rel.reltype
+        ]
+        with ThreadPoolExecutor(max_workers=DOCX_MAX_INFLIGHT_IMAGES) as executor:
+            ocr_results = list(executor.map(self._extract_image, images))
+
+        # Combine text and image OCR results
+        return b"\n".join(
+            [text_result, *(result for result in ocr_results if result is not None)]
+        )
+
+    def _extract_blocks(self, document: DocumentObject) -> list[list[list[str]]]:
+        """
+        Extract headers, body and footers in reading order, each paragraph and table as a block of lines of cells.
+        """
+        headers, footers = [], []
+        for section in document.sections:
+            if not section.header.is_linked_to_previous:
+                headers.extend(section.header.iter_inner_content())
+            if not section.footer.is_linked_to_previous:
+                footers.extend(section.footer.iter_inner_content())
+
+        return [
+            self._to_block(content)
+            for content in [*headers, *document.iter_inner_content(), *footers]
+        ]
+
+    def _to_block(self, content: Paragraph | Table) -> list[list[str]]:
+        if isinstance(content, Paragraph):
+            return [[line] for line in content.text.splitlines()]
+
+        rows = []
+        for row in content.rows:
+            cells = []
+            for cell in row.cells:
+                # Merged cells are repeated for every grid column they span
+                if not cells or cell._tc is not cells[-1]._tc:
+                    cells.append(cell)
+            rows.append([" ".join(cell.text.split()) for cell in cells])
+        return rows
+
+    def _extract_image(self, image: bytes) -> bytes | None:
+        try:
+            preprocessed_image = preprocess_image(image)
+        except Exception as ex:
+            # Vector formats like EMF/WMF cannot be decoded by OpenCV, they never have an OCR output
+            logger.log(logging.WARNING, str(ex))
+            return None
+
+        try:
+            return extract_text_with_tesseract(preprocessed_image)
+        except Exception as ex:
+            logger.log(logging.ERROR, str(ex))
+            raise OCRFailedException(f"embedded image: {ex}")
@@ -1,28 +1,135 @@
 import logging
 import os
-import tempfile
-from pdf2image import convert_from_bytes
+from io import BytesIO
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import BoundedSemaphore
+from PIL.Image import Image
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
+from pypdf import PdfReader
 
 from ....logger import logger
 from ....dtos.ocr_file_dto import OCRFileDto
 from ..preprocess_image import preprocess_image
 from ..extract_text_with_tesseract import extract_text_with_tesseract
-from ..ocr_file_handler_strategy import OCRFileHandlerStrategy
+from ..extract_text_layer import extract_text_layer
+from ..custom_exceptions import OCRFailedException
+from ..ocr_file_handler_strategy import (
+    OCR_THREADS_PER_WORKER,
+    OCRFileHandlerStrategy,
+    ProgressCallback,
+)
+
+PDF_DPI = int(os.getenv("PDF_DPI", "200"))
+"""
+Rasterization resolution, changing it changes the OCR output so `OCR_CONFIG_VERSION` must be bumped as well.
+"""
+
+PDF_PAGE_BATCH_SIZE = int(os.getenv("PDF_PAGE_BATCH_SIZE", "4"))
+"""
+Amount of pages rasterized at once by pdftoppm.
+"""
+
+PDF_RASTER_THREADS = int(os.getenv("PDF_RASTER_THREADS", "1"))
+"""
+Amount of pdftoppm processes used to rasterize each batch.
+"""
+
+PDF_MAX_INFLIGHT_PAGES = int(
+    os.getenv("PDF_MAX_INFLIGHT_PAGES", OCR_THREADS_PER_WORKER)
+)
+"""
+Maximum amount of rasterized pages waiting for or under OCR, bounding the memory used by large documents.
+"""
 
 
 class PDFStrategy(OCRFileHandlerStrategy):
-    def execute(self, file: OCRFileDto) -> bytes:
-        images = convert_from_bytes(file.content)
-        ocr_results = []
+    def execute(self, file: OCRFileDto, progress: ProgressCallback = None) -> bytes:
+        # Born-digital pages already carry their text, only the remaining ones are rasterized and OCR'd
+        pages: list[bytes | Future[bytes | None] | None] = self._extract_text_layers(
+            file.content
+        )
+        ocr_page_numbers = [
+            number for number, page in enumerate(pages, 1) if page is None
+        ]
+
+        if progress is not None:
+            for number, page in enumerate(pages, 1):
+                if page is not None:
+                    progress((number, len(pages)))
+
+        if ocr_page_numbers:
+            # Tesseract runs as a subprocess and OpenCV releases the GIL, so threads OCR the pages in parallel
+            inflight_pages = BoundedSemaphore(PDF_MAX_INFLIGHT_PAGES)
+            with ThreadPoolExecutor(max_workers=PDF_MAX_INFLIGHT_PAGES) as executor:
+                for first_page, last_page in self._page_ranges(ocr_page_numbers):
+                    images = convert_from_bytes(
+                        file.content,
+                        dpi=PDF_DPI,
+                        first_page=first_page,
+                        last_page=last_page,
+                        thread_count=PDF_RASTER_THREADS,
+                    )
 
-        for _, image in enumerate(images):
-            # Save image to temp file to read in OpenCV
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_img:
+                    for page_number, image in enumerate(images, first_page):
+                        # Wait for a page to finish before handing over the next one
+                        inflight_pages.acquire()
+                        page = executor.submit(self._extract_page, image, page_number)
+                        page.add_done_callback(lambda _: inflight_pages.release())
+                        if progress is not None:
+                            page.add_done_callback(
+                                lambda _, number=page_number: progress(
+                                    (number, len(pages))
+                                )
+                            )
+                        pages[page_number - 1] = page
+
+                    del images
+
+        # Results are kept by page number, so the output is reassembled in the document order, a failed page
+        # raises instead of leaving a gap in the output
+        results = [
+            page.result() if isinstance(page, Future) else page for page in pages
+        ]
+        return b"\n".join(result for result in results if result is not None)
+
+    def _extract_text_layers(self, content: bytes) -> list[bytes | None]:
+        try:
+            reader = PdfReader(BytesIO(content))
+            layers = []
+            for page in reader.pages:
                 try:
-                    image.save(temp_img.name, format="PNG")
-                    preprocessed_image = preprocess_image(temp_img.name)
-                    ocr_results.append(extract_text_with_tesseract(preprocessed_image))
+                    layers.append(extract_text_layer(page, PDF_DPI))
                 except Exception as ex:
-                    logger.log(logging.ERROR, str(ex))
-                os.remove(temp_img.name)
-        return b"\n".join(ocr_results)
+                    logger.log(logging.WARNING, f"Unable to read PDF text layer: {ex}")
+                    layers.append(None)
+            return layers
+        except Exception as ex:
+            # Encrypted or malformed documents can still be rasterized by poppler
+            logger.log(logging.WARNING, f"Unable to read PDF text layers: {ex}")
+            return [None] * pdfinfo_from_bytes(content)["Pages"]
+
+    def _page_ranges(self, page_numbers: list[int]) -> list[tuple[int, int]]:
+        """
+        Split the page numbers into contiguous ranges of at most `PDF_PAGE_BATCH_SIZE` pages.
+        """
+        ranges: list[tuple[int, int]] = []
+        for number in page_numbers:
+            if (
+                ranges
+                and ranges[-1][1] == number - 1
+                and number - ranges[-1][0] < PDF_PAGE_BATCH_SIZE
+            ):
+                ranges[-1] = (ranges[-1][0], number)
+            else:
+                ranges.append((number, number))
+        return ranges
+
+    def _extract_page(self, image: Image, page_number: int) -> bytes:
+        try:
+            preprocessed_image = preprocess_image(image)
+            return extract_text_with_tesseract(preprocessed_image)
+        except Exception as ex:
+            logger.log(logging.ERROR, str(ex))
+            raise OCRFailedException(f"page {page_number}: {ex}")
+        finally:
+            image.close()
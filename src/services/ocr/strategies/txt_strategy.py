@@ -1,57 +1,136 @@
-import logging
+import codecs
+import csv
+import io
 import os
-import tempfile
-from PIL import Image, ImageDraw, ImageFont
+from typing import Iterable, Iterator
+from charset_normalizer import from_bytes
 
-from ....logger import logger
 from ....dtos.ocr_file_dto import OCRFileDto
-from ..preprocess_image import preprocess_image
-from ..extract_text_with_tesseract import extract_text_with_tesseract
-from ..ocr_file_handler_strategy import OCRFileHandlerStrategy
+from ..alto_xml import layout_text, to_alto_xml
+from ..ocr_file_handler_strategy import OCRFileHandlerStrategy, ProgressCallback
+
+TXT_LINES_PER_PAGE = int(os.getenv("TXT_LINES_PER_PAGE", "100"))
+"""
+Amount of lines per emitted ALTO page, keeping the markup of large files built one page at a time.
+"""
+
+ENCODING_SAMPLE_SIZE = 64 * 1024
+DECODE_CHUNK_SIZE = 1024 * 1024
 
 
 class TXTStrategy(OCRFileHandlerStrategy):
-    def execute(self, file: OCRFileDto) -> bytes:
-        content = file.content.decode("utf-8")
-
-        # Define image size and background color
-        width, height = 800, 800
-        background_color = "white"
-        text_color = "black"
-        font_size = 15
-
-        # Create a new blank image with white background
-        image = Image.new("RGB", (width, height), color=background_color)
-        draw = ImageDraw.Draw(image)
-
-        # Load a default font
-        try:
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except IOError:
-            font = ImageFont.load_default()
-
-        # Set text position and line spacing
-        padding = 10
-        x, y = padding, padding
-        line_spacing = font.getsize("A")[1] + 5
-
-        # Draw the text onto the image line by line
-        for line in content.splitlines():
-            if y + line_spacing > height:
-                break  # Stop if text exceeds image height
-            draw.text((x, y), line, fill=text_color, font=font)
-            y += line_spacing
-
-        result = None
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as temp_img:
-            try:
-                image.save(temp_img.name, format="PNG")
-                temp_img.flush()
-
-                preprocessed_image = preprocess_image(temp_img.name)
-                result = extract_text_with_tesseract(preprocessed_image)
-            except Exception as ex:
-                logger.log(logging.ERROR, str(ex))
-            os.remove(temp_img.name)
-
-        return result
+    """
+    Wrap plain text into the pipeline markup without any OCR.
+
+    When a `delimiter` is given (e.g. CSV) each record is laid out as a table row.
+    """
+
+    def __init__(self, delimiter: str | None = None) -> None:
+        self._delimiter = delimiter
+
+    def execute(self, file: OCRFileDto, progress: ProgressCallback = None) -> bytes:
+        encoding = self._detect_encoding(file.content)
+
+        rows: Iterable[list[str]] = (
+            # The reader handles the line endings itself, keeping the line breaks of quoted multi-line fields
+            csv.reader(
+                io.TextIOWrapper(
+                    io.BytesIO(file.content),
+                    encoding=encoding,
+                    errors="replace",
+                    newline="",
+                ),
+                delimiter=self._delimiter,
+            )
+            if self._delimiter
+            else ([line] for line in self._iter_lines(file.content, encoding))
+        )
+
+        return b"\n".join(
+            to_alto_xml(*layout_text(page), source="text")
+            for page in self._paginate(rows)
+        )
+
+    def _detect_encoding(self, content: bytes) -> str:
+        match = from_bytes(self._sample(content)).best()
+        if match is None:
+            return "utf-8"
+        # Drop the byte order mark instead of emitting it as text
+        return (
+            "utf_8_sig" if match.encoding == "utf_8" and match.bom else match.encoding
+        )
+
+    def _sample(self, content: bytes) -> bytes:
+        """
+        The start of the content, cut at a character boundary so the last character is not taken as invalid.
+        """
+        if len(content) <= ENCODING_SAMPLE_SIZE:
+            return content
+
+        sample = content[:ENCODING_SAMPLE_SIZE]
+        end = sample.rfind(b"\n")
+        if end > 0:
+            # A line break ends a character in ASCII compatible encodings, UTF-16 LE follows it with a NUL byte
+            return content[: end + (2 if content[end + 1 : end + 2] == b"\x00" else 1)]
+
+        # Without line breaks, drop a trailing incomplete UTF-8 sequence
+        for length in range(1, min(4, len(sample)) + 1):
+            byte = sample[-length]
+            if byte < 0x80:
+                break
+            if byte >= 0xC0:
+                expected = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+                if expected > length:
+                    return sample[:-length]
+                break
+        return sample
+
+    def _iter_lines(self, content: bytes, encoding: str) -> Iterator[str]:
+        """
+        Decode the content incrementally, yielding one line at a time.
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        view = memoryview(content)
+        pending = ""
+        for start in range(0, len(view), DECODE_CHUNK_SIZE):
+            chunk = view[start : start + DECODE_CHUNK_SIZE]
+            pending += decoder.decode(
+                chunk, final=start + DECODE_CHUNK_SIZE >= len(view)
+            )
+            lines = pending.splitlines(keepends=True)
+            # The last line may continue in the next chunk, including a `\r\n` split in half
+            last = lines[-1] if lines else ""
+            pending = (
+                lines.pop()
+                if last and (last.splitlines()[0] == last or last.endswith("\r"))
+                else ""
+            )
+            for line in lines:
+                yield line.splitlines()[0]
+        if pending:
+            yield pending.splitlines()[0]
+
+    def _paginate(self, rows: Iterable[list[str]]) -> Iterator[list[list[list[str]]]]:
+        """
+        Group rows into pages of blocks, blank rows split the blocks (e.g. paragraphs).
+        """
+        page: list[list[list[str]]] = []
+        block: list[list[str]] = []
+        line_count = 0
+        for row in rows:
+            if not any(cell.strip() for cell in row):
+                if block:
+                    page.append(block)
+                    block = []
+                continue
+
+            block.append(row)
+            line_count += 1
+            if line_count >= TXT_LINES_PER_PAGE:
+                yield [*page, block]
+                page, block, line_count = [], [], 0
+
+        if block:
+            page.append(block)
+        if page:
+            yield page
@@ -0,0 +1,95 @@
+import logging
+import zlib
+from collections import OrderedDict
+from pymongo.errors import DuplicateKeyError
+
+from ..entities.ocr_result_entity import OCRResultEntity
+from ..infrastructure.mongodb import OCRResultsCollection
+from ..logger import logger
+
+# Mongo documents are limited to 16MB, larger results are only kept in memory
+MAX_PERSISTED_MARKUP_SIZE = 15 * 1024 * 1024
+
+
+class OCRCacheService:
+    """
+    Two tier cache of OCR outputs keyed by the content-addressed file key and the OCR configuration version.
+
+    The in-process LRU tier avoids a database round-trip for hot documents while the Mongo tier is shared
+    across replicas and restarts. Bumping the version makes every previous entry a miss.
+    """
+
+    def __init__(
+        self,
+        ocr_results_collection: OCRResultsCollection,
+        *,
+        version: str,
+        max_entries: int,
+    ) -> None:
+        self._ocr_results_collection = ocr_results_collection
+        self._version = version
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    async def get(self, key: str) -> bytes | None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        try:
+            result = await self._ocr_results_collection.find(key, self._version)
+        except Exception as ex:
+            logger.log(logging.ERROR, f"Unable to read OCR cache of {key}: {ex}")
+            return None
+
+        if result is None:
+            return None
+
+        markup = zlib.decompress(result.markup)
+        self._remember(key, markup)
+        return markup
+
+    async def set(self, key: str, markup: bytes) -> None:
+        if not markup:
+            # An empty output is more likely a failed extraction than an empty document, it is extracted again
+            return
+
+        self._remember(key, markup)
+
+        compressed = zlib.compress(markup)
+        if len(compressed) > MAX_PERSISTED_MARKUP_SIZE:
+            logger.log(logging.WARNING, f"OCR output of {key} is too large to persist")
+            return
+
+        try:
+            await self._ocr_results_collection.upsert(
+                OCRResultEntity(key=key, version=self._version, markup=compressed)
+            )
+        except DuplicateKeyError:
+            # A concurrent request already stored the same result
+            pass
+        except Exception as ex:
+            logger.log(logging.ERROR, f"Unable to write OCR cache of {key}: {ex}")
+
+    async def invalidate(self, key: str | None = None) -> int:
+        """
+        Drop the cached OCR output of `key`, or every entry from a previous configuration version when no key is given.
+
+        Returns the amount of persisted entries removed. The in-process tier is only cleared on the current replica.
+        """
+        if key is None:
+            self._entries.clear()
+            return await self._ocr_results_collection.delete_stale(self._version)
+
+        self._entries.pop(key, None)
+        return await self._ocr_results_collection.delete_by_key(key)
+
+    def _remember(self, key: str, markup: bytes) -> None:
+        self._entries[key] = markup
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
@@ -1,72 +1,825 @@
+import asyncio
+import mimetypes
 import os
 import logging
-from fastapi import UploadFile
+from typing import Any, AsyncIterator, Awaitable, Callable
+from fastapi import HTTPException, UploadFile
 from pydantic import BaseModel
+from pydantic_core import from_json
 
+from ..dtos.batch_document_dto import BatchDocumentDto, BatchResultDto
+from ..dtos.pipeline_event_dto import PipelineEventDto
+from ..entities.extraction_entity import ExtractionEntity
 from ..entities.json_schema_entity import JsonSchemaEntity
+from ..enums.extraction_mode import ExtractionMode
+from ..enums.llm_backend_type import LLMBackendType
+from ..enums.ocr_output_format import OCROutputFormat
+from ..enums.pipeline_event import PipelineEvent
 
 from ..logger import logger
 
-from ..infrastructure.S3 import S3Client
+from ..infrastructure.S3.async_s3_client import AsyncS3Client
+from ..infrastructure.mongodb import ExtractionsCollection
+from ..infrastructure.workers import (
+    PoolSaturatedException,
+    PoolUnavailableException,
+    WorkerPool,
+)
 
 from .files_service import FilesService
-from .llm import interpret_text
+from .ocr_cache_service import OCRCacheService
+from .schema_cache_service import CompiledSchema, SchemaCacheService
+from .retrieval_service import RetrievalService
+from .model_router_service import ModelRoute, ModelRouterService
+from .llm import LLM_BACKEND, PROMPT_VERSION, interpret_text, stream_text
+from .llm.llm_backend import LLMBackend
 from .ocr import extract_markup
+from .ocr.ocr_file_handler_strategy import ProgressCallback
+from .ocr.format_markup import OCR_OUTPUT_FORMAT, format_markup
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+"""
+Maximum amount of documents of a batch processed at once, the OCR and LLM pools still bound each stage.
+"""
+
+BATCH_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+"""
+Times a batch document is retried when the OCR or LLM pools are saturated.
+"""
+
+EXTRACTION_MODE = ExtractionMode(os.getenv("EXTRACTION_MODE", "single"))
+"""
+Extraction mode used when the schema does not define one.
+"""
+
+EXTRACTION_GROUP_SIZE = int(os.getenv("EXTRACTION_GROUP_SIZE", "4"))
+"""
+Maximum amount of top-level scalar fields per group in the `grouped` mode.
+"""
+
+EXTRACTION_GROUP_CONCURRENCY = int(os.getenv("EXTRACTION_GROUP_CONCURRENCY", "2"))
+"""
+Maximum amount of groups of an extraction generated at once, keeping large schemas from saturating the LLM pool.
+"""
+
+EXTRACTION_GROUP_MAX_RETRIES = int(os.getenv("EXTRACTION_GROUP_MAX_RETRIES", "2"))
+"""
+Times a failed group is extracted again before failing the extraction.
+"""
+
+FIELD_DELIMITERS = ('"', ",", "]", "}")
+"""
+Characters ending a JSON value, the streamed output is only parsed again after generating one of them.
+"""
+
+Content = bytes | Callable[[], Awaitable[bytes]]
+"""
+The file content, or a callable reading it only when the OCR output is not cached.
+"""
 
 
 class RAGPipelineService:
-    def __init__(self, files_service: FilesService, s3_client: S3Client) -> None:
+    def __init__(
+        self,
+        files_service: FilesService,
+        s3_client: AsyncS3Client,
+        ocr_cache_service: OCRCacheService,
+        schema_cache_service: SchemaCacheService,
+        extractions_collection: ExtractionsCollection,
+        retrieval_service: RetrievalService,
+        model_router_service: ModelRouterService,
+        *,
+        ocr_pool: WorkerPool,
+        llm_pool: WorkerPool,
+        llm_backends: dict[LLMBackendType, LLMBackend],
+    ) -> None:
         self._files_service = files_service
         self._s3_client = s3_client
+        self._ocr_cache_service = ocr_cache_service
+        self._schema_cache_service = schema_cache_service
+        self._extractions_collection = extractions_collection
+        self._retrieval_service = retrieval_service
+        self._model_router_service = model_router_service
+        self._ocr_pool = ocr_pool
+        self._llm_pool = llm_pool
+        self._llm_backends = llm_backends
+
+    async def extract_markup(
+        self,
+        key: str,
+        content_type: str,
+        content: Content,
+        progress: ProgressCallback = None,
+    ) -> bytes:
+        """
+        Extract the file markup through OCR, reusing the cached output of previously processed files.
+
+        `progress` is called on the event loop with the `(page number, page count)` of every processed page.
+        """
+        markup = await self._ocr_cache_service.get(key)
+        if markup is not None:
+            logger.log(logging.INFO, f"Reusing cached OCR output of file {key}")
+            return markup
+
+        if callable(content):
+            content = await content()
+
+        if progress is None:
+            markup = await self._ocr_pool.run(extract_markup, content_type, content)
+        else:
+            markup = await self._extract_markup_with_progress(
+                content_type, content, progress
+            )
+        await self._ocr_cache_service.set(key, markup)
+        return markup
+
+    async def _extract_markup_with_progress(
+        self, content_type: str, content: bytes, progress: ProgressCallback
+    ) -> bytes:
+        # Pages are reported from the OCR workers through a queue, forwarded to the event loop by a thread
+        pages = await self._ocr_pool.create_queue()
+        loop = asyncio.get_running_loop()
+
+        def forward() -> None:
+            try:
+                while (page := pages.get()) is not None:
+                    loop.call_soon_threadsafe(progress, page)
+            except Exception as ex:
+                logger.log(logging.WARNING, f"Unable to report OCR progress: {ex}")
+
+        forwarder = asyncio.create_task(asyncio.to_thread(forward))
+        try:
+            return await self._ocr_pool.run(
+                extract_markup, content_type, content, pages.put
+            )
+        finally:
+            # Manager queues are proxies to another process, putting into them blocks
+            await asyncio.to_thread(pages.put, None)
+            await forwarder
 
     async def process(
         self,
         file: UploadFile,
         schema: JsonSchemaEntity,
         *,
+        schema_id: str = None,
+        user: str = None,
         query: str = None,
         language: str = None,
+        ocr_format: OCROutputFormat | None = None,
+        extraction_mode: ExtractionMode | None = None,
+        llm_backend: LLMBackendType | None = None,
+        refresh: bool = False,
     ) -> BaseModel:
         try:
-            file_content = await file.read()
             name, ext = os.path.splitext(file.filename)
 
             # Upload file to S3 an register
-            key = await self._files_service.upload_file(name, ext, file_content)
+            key = await self._files_service.upload_stream(name, ext, file)
+
+            return await self.extract(
+                key,
+                file.content_type,
+                self._read_upload(file),
+                schema,
+                schema_id=schema_id,
+                user=user,
+                query=query,
+                language=language,
+                ocr_format=ocr_format,
+                extraction_mode=extraction_mode,
+                llm_backend=llm_backend,
+                refresh=refresh,
+            )
+        except HTTPException:
+            raise
+        except Exception as ex:
+            logger.log(logging.ERROR, ex)
+            raise f"Unable to process the pipeline"
+
+    async def extract(
+        self,
+        key: str,
+        content_type: str,
+        content: Content,
+        schema: JsonSchemaEntity,
+        *,
+        schema_id: str = None,
+        user: str = None,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat | None = None,
+        extraction_mode: ExtractionMode | None = None,
+        llm_backend: LLMBackendType | None = None,
+        refresh: bool = False,
+    ) -> BaseModel:
+        """
+        Extract the schema data from an already uploaded file.
 
-            # Extract file markup data
-            extracted_content = extract_markup(file.content_type, file_content)
+        Results are stored per file, schema version, model, prompt version and options, so identical extractions
+        are served from the store unless `refresh` is set.
+        """
+        ocr_format = ocr_format or OCR_OUTPUT_FORMAT
+        extraction_mode = extraction_mode or EXTRACTION_MODE
+        llm_backend = llm_backend or LLM_BACKEND
+        compiled_schema = self._schema_cache_service.get(schema_id, schema)
+        extraction = self._create_extraction(
+            key,
+            schema,
+            schema_id=schema_id,
+            user=user,
+            query=query,
+            language=language,
+            ocr_format=ocr_format,
+            extraction_mode=extraction_mode,
+            llm_backend=llm_backend,
+        )
 
-            # Process extracted markup data
-            extracted_text = extracted_content.decode("utf-8")
+        if not refresh:
+            stored = await self._find_extraction(extraction)
+            if stored is not None:
+                return compiled_schema.model.model_validate(stored.result)
 
-            # Log OCR output
-            logger.log(
-                logging.INFO,
-                f"Extracted from file {key} the OCR output\n{extracted_text}",
+        # Extract file markup data
+        extracted_content = await self.extract_markup(key, content_type, content)
+        extracted_text, ocr_format = self._format_markup(
+            key, extracted_content, ocr_format
+        )
+
+        groups = self._partition(schema, extraction_mode, query)
+        if len(groups) == 1:
+            # Long documents only send the chunks relevant to the schema fields
+            [context] = await self._retrieval_service.retrieve(
+                extracted_text,
+                [group.as_prompt_metadata() for group in schema.field_groups],
+                merge=True,
+            )
+            route = self._route(llm_backend, context, schema)
+            result = await self._interpret(
+                context,
+                route,
+                compiled_schema,
+                query=query,
+                language=language,
+                ocr_format=ocr_format,
+                llm_backend=llm_backend,
+            )
+            routes = [route]
+        else:
+            result, routes = await self._interpret_groups(
+                extracted_text,
+                groups,
+                compiled_schema,
+                schema_id=schema_id,
+                language=language,
+                ocr_format=ocr_format,
+                llm_backend=llm_backend,
             )
 
-            output_cls = schema.as_model()
-            metadata = schema.as_prompt_metadata()
+        # Log LLM output
+        logger.log(logging.INFO, f"Extracted LLM output {result}")
 
-            # interpreted_text = interpret_text(
-            #     extracted_text, query_text, "llama3.1:8b", output_cls, request_id, prompt_json_schema=True
-            # )
+        extraction.model = self._describe_models(routes)
+        extraction.result = result.model_dump(mode="json")
+        await self._store_extraction(extraction)
 
-            result = interpret_text(
-                extracted_text,
-                "mistral:7b",
-                output_cls,
-                metadata,
+        return result
+
+    async def extract_stream(
+        self,
+        key: str,
+        content_type: str,
+        content: Content,
+        schema: JsonSchemaEntity,
+        *,
+        schema_id: str = None,
+        user: str = None,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat | None = None,
+        extraction_mode: ExtractionMode | None = None,
+        llm_backend: LLMBackendType | None = None,
+        refresh: bool = False,
+    ) -> AsyncIterator[PipelineEventDto]:
+        """
+        Extract the schema data like `extract`, yielding the OCR progress of every page and the fields extracted
+        so far before the validated result.
+
+        Failures are yielded as an `error` event, the response status is already sent once the stream starts.
+        """
+        try:
+            ocr_format = ocr_format or OCR_OUTPUT_FORMAT
+            extraction_mode = extraction_mode or EXTRACTION_MODE
+            llm_backend = llm_backend or LLM_BACKEND
+            compiled_schema = self._schema_cache_service.get(schema_id, schema)
+            extraction = self._create_extraction(
+                key,
+                schema,
+                schema_id=schema_id,
+                user=user,
                 query=query,
-                prompt_json_schema=True,
                 language=language,
+                ocr_format=ocr_format,
+                extraction_mode=extraction_mode,
+                llm_backend=llm_backend,
+            )
+
+            if not refresh:
+                stored = await self._find_extraction(extraction)
+                if stored is not None:
+                    result = compiled_schema.model.model_validate(stored.result)
+                    yield PipelineEventDto(
+                        event=PipelineEvent.RESULT,
+                        cached=True,
+                        data=result.model_dump(mode="json"),
+                    )
+                    return
+
+            events: asyncio.Queue[PipelineEventDto] = asyncio.Queue()
+            extracting = asyncio.create_task(
+                self.extract_markup(
+                    key,
+                    content_type,
+                    content,
+                    lambda page: events.put_nowait(
+                        PipelineEventDto(
+                            event=PipelineEvent.OCR_PAGE, page=page[0], pages=page[1]
+                        )
+                    ),
+                )
+            )
+            async for event in self._drain(extracting, events):
+                yield event
+
+            extracted_text, ocr_format = self._format_markup(
+                key, extracting.result(), ocr_format
             )
+            yield PipelineEventDto(event=PipelineEvent.OCR)
+
+            groups = self._partition(schema, extraction_mode, query)
+            if len(groups) == 1:
+                [context] = await self._retrieval_service.retrieve(
+                    extracted_text,
+                    [group.as_prompt_metadata() for group in schema.field_groups],
+                    merge=True,
+                )
+                route = self._route(llm_backend, context, schema)
+                routes = [route]
+                fields: dict[str, Any] = {}
+                async for output in self._interpret_stream(
+                    context,
+                    route,
+                    compiled_schema,
+                    query=query,
+                    language=language,
+                    ocr_format=ocr_format,
+                    llm_backend=llm_backend,
+                ):
+                    try:
+                        # Incomplete trailing strings are left out of the partially parsed output, the fields are
+                        # validated against the schema with every field optional
+                        partial = compiled_schema.partial_model.model_validate(
+                            from_json(output, allow_partial=True)
+                        ).model_dump(mode="json", exclude_unset=True)
+                    except ValueError:
+                        continue
+                    if partial and partial != fields:
+                        fields = partial
+                        yield PipelineEventDto(event=PipelineEvent.PARTIAL, data=fields)
+                result = compiled_schema.model.model_validate_json(output)
+            else:
+                # Every group is complete on its own, the merged fields are sent as each group finishes
+                merged: dict[str, Any] = {}
+
+                def add_fields(fields: dict[str, Any]) -> None:
+                    merged.update(fields)
+                    events.put_nowait(
+                        PipelineEventDto(event=PipelineEvent.PARTIAL, data=dict(merged))
+                    )
+
+                interpreting = asyncio.create_task(
+                    self._interpret_groups(
+                        extracted_text,
+                        groups,
+                        compiled_schema,
+                        schema_id=schema_id,
+                        language=language,
+                        ocr_format=ocr_format,
+                        llm_backend=llm_backend,
+                        on_group=add_fields,
+                    )
+                )
+                async for event in self._drain(interpreting, events):
+                    yield event
+                result, routes = interpreting.result()
 
             # Log LLM output
             logger.log(logging.INFO, f"Extracted LLM output {result}")
 
-            return result
+            extraction.model = self._describe_models(routes)
+            extraction.result = result.model_dump(mode="json")
+            await self._store_extraction(extraction)
+
+            yield PipelineEventDto(event=PipelineEvent.RESULT, data=extraction.result)
+        except HTTPException as ex:
+            yield PipelineEventDto(
+                event=PipelineEvent.ERROR, status=ex.status_code, error=str(ex.detail)
+            )
         except Exception as ex:
             logger.log(logging.ERROR, ex)
-            raise f"Unable to process the pipeline"
+            yield PipelineEventDto(event=PipelineEvent.ERROR, status=500, error=str(ex))
+
+    async def _drain(
+        self, task: asyncio.Task, events: asyncio.Queue
+    ) -> AsyncIterator[PipelineEventDto]:
+        """
+        Yield the events queued while the task runs, the task is cancelled if the stream is closed before it ends.
+        """
+        try:
+            while not task.done() or not events.empty():
+                if not events.empty():
+                    yield events.get_nowait()
+                    continue
+
+                next_event = asyncio.ensure_future(events.get())
+                await asyncio.wait(
+                    {task, next_event}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if next_event.done():
+                    yield next_event.result()
+                else:
+                    next_event.cancel()
+        finally:
+            task.cancel()
+
+    def _read_upload(self, file: UploadFile) -> Content:
+        async def read() -> bytes:
+            await file.seek(0)
+            return await file.read()
+
+        return read
+
+    def _download(self, key: str) -> Content:
+        async def download() -> bytes:
+            _, content = await self._files_service.download_file(key)
+            return content
+
+        return download
+
+    def _partition(
+        self, schema: JsonSchemaEntity, extraction_mode: ExtractionMode, query: str
+    ) -> list[JsonSchemaEntity]:
+        # A query applies to the whole schema, so it is always sent in a single generation
+        if extraction_mode == ExtractionMode.GROUPED and not query:
+            return schema.partition(EXTRACTION_GROUP_SIZE)
+        return [schema]
+
+    def _create_extraction(
+        self,
+        key: str,
+        schema: JsonSchemaEntity,
+        *,
+        schema_id: str = None,
+        user: str = None,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat,
+        extraction_mode: ExtractionMode,
+        llm_backend: LLMBackendType,
+    ) -> ExtractionEntity:
+        return ExtractionEntity(
+            file_key=key,
+            schema_id=schema_id,
+            schema_hash=schema.content_hash,
+            user=user,
+            backend=llm_backend,
+            routing=self._model_router_service.fingerprint(
+                self._llm_backends[llm_backend]
+            ),
+            prompt_version=PROMPT_VERSION,
+            ocr_format=ocr_format,
+            extraction_mode=extraction_mode,
+            language=language,
+            query=query,
+            result={},
+        )
+
+    async def _find_extraction(
+        self, extraction: ExtractionEntity
+    ) -> ExtractionEntity | None:
+        """
+        Return the stored result of an identical extraction, a failing store only costs the extraction running again.
+        """
+        try:
+            stored = await self._extractions_collection.find(
+                extraction.file_key,
+                extraction.schema_hash,
+                extraction.user,
+                extraction.backend,
+                extraction.routing,
+                extraction.prompt_version,
+                extraction.ocr_format,
+                extraction.extraction_mode,
+                extraction.language,
+                extraction.query,
+            )
+        except Exception as ex:
+            logger.log(
+                logging.ERROR,
+                f"Unable to read stored extractions of {extraction.file_key}: {ex}",
+            )
+            return None
+
+        if stored is not None:
+            logger.log(
+                logging.INFO, f"Reusing stored extraction of file {extraction.file_key}"
+            )
+        return stored
+
+    async def _store_extraction(self, extraction: ExtractionEntity) -> None:
+        # The result is already extracted, failing to store it must not fail the request
+        try:
+            await self._extractions_collection.upsert(extraction)
+        except Exception as ex:
+            logger.log(
+                logging.ERROR,
+                f"Unable to store the extraction of {extraction.file_key}: {ex}",
+            )
+
+    def _format_markup(
+        self, key: str, markup: bytes, ocr_format: OCROutputFormat
+    ) -> tuple[str, OCROutputFormat]:
+        """
+        Render the extracted markup in the compact format sent to the LLM, returning the format actually used.
+        """
+        text = format_markup(markup, ocr_format)
+
+        # XML markup cannot be cut into chunks, long documents use the text layout instead
+        if (
+            self._retrieval_service.needs_retrieval(text)
+            and ocr_format == OCROutputFormat.ALTO
+        ):
+            ocr_format = OCROutputFormat.LINES
+            text = format_markup(markup, ocr_format)
+
+        # Log OCR output
+        logger.log(logging.INFO, f"Extracted from file {key} the OCR output\n{text}")
+        return text, ocr_format
+
+    async def _interpret(
+        self,
+        text: str,
+        route: ModelRoute,
+        compiled_schema: CompiledSchema,
+        *,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat,
+        llm_backend: LLMBackendType,
+    ) -> BaseModel:
+        backend = self._llm_backends[llm_backend]
+
+        # Measured once a worker is held, so queueing does not skew the route latency
+        async with self._llm_pool.acquire():
+            with self._model_router_service.measure(route):
+                return await interpret_text(
+                    backend,
+                    text,
+                    compiled_schema.model,
+                    compiled_schema.metadata,
+                    model=route.model,
+                    query=query,
+                    prompt_json_schema=True,
+                    json_schema=compiled_schema.json_schema,
+                    output_schema=compiled_schema.output_schema,
+                    language=language,
+                    document_format=ocr_format,
+                    context_window=route.context_window,
+                )
+
+    async def _interpret_stream(
+        self,
+        text: str,
+        route: ModelRoute,
+        compiled_schema: CompiledSchema,
+        *,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat,
+        llm_backend: LLMBackendType,
+    ) -> AsyncIterator[str]:
+        """
+        Yield the output generated up to its last complete value whenever it completes another one, the last output
+        is the whole generation. An LLM worker is held until the generation ends.
+        """
+        backend = self._llm_backends[llm_backend]
+
+        output = ""
+        async with self._llm_pool.acquire():
+            with self._model_router_service.measure(route):
+                async for chunk in stream_text(
+                    backend,
+                    text,
+                    compiled_schema.model,
+                    compiled_schema.metadata,
+                    model=route.model,
+                    query=query,
+                    prompt_json_schema=True,
+                    json_schema=compiled_schema.json_schema,
+                    output_schema=compiled_schema.output_schema,
+                    language=language,
+                    document_format=ocr_format,
+                    context_window=route.context_window,
+                ):
+                    output += chunk
+                    if any(char in chunk for char in FIELD_DELIMITERS):
+                        # Trailing numbers may still be generating more digits, so they are left out
+                        yield output[
+                            : max(output.rfind(char) for char in FIELD_DELIMITERS) + 1
+                        ]
+        yield output
+
+    def _route(
+        self, llm_backend: LLMBackendType, text: str, schema: JsonSchemaEntity
+    ) -> ModelRoute:
+        route = self._model_router_service.route(
+            self._llm_backends[llm_backend], text, schema
+        )
+        logger.log(
+            logging.INFO,
+            f"Routing {route.tokens} tokens and {route.fields} fields to the {route.name} model {route.model} "
+            f"with a context window of {route.context_window} tokens",
+        )
+        return route
+
+    def _describe_models(self, routes: list[ModelRoute]) -> str:
+        # Groups of the grouped mode may be routed to different models
+        return ", ".join(sorted({route.model for route in routes}))
+
+    async def _interpret_groups(
+        self,
+        text: str,
+        groups: list[JsonSchemaEntity],
+        compiled_schema: CompiledSchema,
+        *,
+        schema_id: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat,
+        llm_backend: LLMBackendType,
+        on_group: Callable[[dict[str, Any]], None] = None,
+    ) -> tuple[BaseModel, list[ModelRoute]]:
+        """
+        Extract every field group in its own concurrent generation, retrying only the failed groups, and validate
+        the merged result against the full schema model. Returns the result and the route of every group.
+        """
+        contexts = await self._retrieval_service.retrieve(
+            text, [group.as_prompt_metadata() for group in groups]
+        )
+        semaphore = asyncio.Semaphore(EXTRACTION_GROUP_CONCURRENCY)
+
+        routes = [
+            self._route(llm_backend, context, group)
+            for group, context in zip(groups, contexts)
+        ]
+
+        async def run(
+            group: JsonSchemaEntity, context: str, route: ModelRoute
+        ) -> dict[str, Any]:
+            compiled_group = self._schema_cache_service.get(schema_id, group)
+            for attempt in range(EXTRACTION_GROUP_MAX_RETRIES + 1):
+                try:
+                    async with semaphore:
+                        result = await self._interpret(
+                            context,
+                            route,
+                            compiled_group,
+                            language=language,
+                            ocr_format=ocr_format,
+                            llm_backend=llm_backend,
+                        )
+                    fields = result.model_dump()
+                    if on_group is not None:
+                        on_group(fields)
+                    return fields
+                except PoolUnavailableException:
+                    raise
+                except Exception as ex:
+                    if attempt == EXTRACTION_GROUP_MAX_RETRIES:
+                        raise
+                    if isinstance(ex, PoolSaturatedException):
+                        await asyncio.sleep(int(ex.headers["Retry-After"]))
+                    fields = ", ".join(prop.name for prop in group.properties)
+                    logger.log(
+                        logging.WARNING,
+                        f"Retrying extraction of the fields {fields}: {ex}",
+                    )
+
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                tasks = [
+                    task_group.create_task(run(group, context, route))
+                    for group, context, route in zip(groups, contexts, routes)
+                ]
+        except ExceptionGroup as ex:
+            # Remaining groups are cancelled once any of them runs out of retries
+            raise ex.exceptions[0]
+
+        merged = {
+            name: value for task in tasks for name, value in task.result().items()
+        }
+        return compiled_schema.model.model_validate(merged), routes
+
+    async def extract_batch(
+        self,
+        documents: list[BatchDocumentDto],
+        schema: JsonSchemaEntity,
+        *,
+        schema_id: str = None,
+        user: str = None,
+        query: str = None,
+        language: str = None,
+        ocr_format: OCROutputFormat | None = None,
+        extraction_mode: ExtractionMode | None = None,
+        llm_backend: LLMBackendType | None = None,
+    ) -> AsyncIterator[BatchResultDto]:
+        """
+        Extract the schema data from many documents, yielding each result as soon as it completes.
+
+        A failed document is yielded with its error instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def run(index: int, document: BatchDocumentDto) -> BatchResultDto:
+            async with semaphore:
+                key = document.key
+                try:
+                    # Files are only read once their turn comes, the content of stored files only on OCR cache misses
+                    if key is None:
+                        name, ext = os.path.splitext(document.name)
+                        key = await self._files_service.upload_stream(
+                            name, ext, document.file
+                        )
+                        content_type = document.content_type
+                        content = self._read_upload(document.file)
+                    else:
+                        # Keys keep the extension of the uploaded filename
+                        content_type, _ = mimetypes.guess_type(key)
+                        content = self._download(key)
+
+                    for attempt in range(BATCH_MAX_RETRIES + 1):
+                        try:
+                            result = await self.extract(
+                                key,
+                                content_type,
+                                content,
+                                schema,
+                                schema_id=schema_id,
+                                user=user,
+                                query=query,
+                                language=language,
+                                ocr_format=ocr_format,
+                                extraction_mode=extraction_mode,
+                                llm_backend=llm_backend,
+                            )
+                            break
+                        except PoolSaturatedException as ex:
+                            if attempt == BATCH_MAX_RETRIES:
+                                raise
+                            await asyncio.sleep(int(ex.headers["Retry-After"]))
+
+                    return BatchResultDto(
+                        index=index,
+                        name=document.name,
+                        key=key,
+                        status=200,
+                        result=result.model_dump(mode="json"),
+                    )
+                except HTTPException as ex:
+                    return BatchResultDto(
+                        index=index,
+                        name=document.name,
+                        key=key,
+                        status=ex.status_code,
+                        error=str(ex.detail),
+                    )
+                except Exception as ex:
+                    logger.log(logging.ERROR, ex)
+                    return BatchResultDto(
+                        index=index,
+                        name=document.name,
+                        key=key,
+                        status=500,
+                        error=str(ex),
+                    )
+
+        tasks = [
+            asyncio.create_task(run(index, document))
+            for index, document in enumerate(documents)
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            # The client disconnected, stop the remaining documents
+            for task in tasks:
+                task.cancel()
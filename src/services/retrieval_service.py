@@ -0,0 +1,193 @@
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
+
+from ..infrastructure.workers import WorkerPool
+
+RAG_CONTEXT_MAX_CHARS = int(os.getenv("RAG_CONTEXT_MAX_CHARS", "12000"))
+"""
+Documents up to this length are sent whole to the LLM, longer ones only send the chunks retrieved for the schema.
+"""
+
+RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1500"))
+"""
+Maximum amount of characters per chunk, chunks are cut at line boundaries.
+"""
+
+RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))
+"""
+Amount of trailing characters of a chunk repeated at the start of the next one, keeping lines split across chunks.
+"""
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+"""
+Amount of chunks retrieved per schema field group.
+"""
+
+EMBEDDING_MODEL = os.getenv(
+    "EMBEDDING_MODEL", "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+)
+"""
+Local HuggingFace embedding model, multilingual since documents and prompts are either in English or Portuguese.
+"""
+
+CHUNK_SEPARATOR = "\n[...]\n"
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model(model_name: str) -> "HuggingFaceEmbedding":
+    """
+    Embedding model loaded once per process and reused across documents.
+    """
+    # Imported on first use, importing torch in every OCR worker process would only slow their start
+    from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+    return HuggingFaceEmbedding(model_name=model_name, normalize=True)
+
+
+def embed_texts(model_name: str, texts: list[str]) -> np.ndarray:
+    return np.asarray(
+        get_embedding_model(model_name).get_text_embedding_batch(texts),
+        dtype=np.float32,
+    )
+
+
+def embed_queries(model_name: str, queries: list[str]) -> np.ndarray:
+    model = get_embedding_model(model_name)
+    return np.asarray(
+        [model.get_query_embedding(query) for query in queries], dtype=np.float32
+    )
+
+
+def chunk_text(text: str, size: int, overlap: int) -> list[str]:
+    """
+    Pack whole lines into chunks of up to `size` characters, lines longer than a chunk are split.
+    """
+    lines: list[str] = []
+    for line in text.splitlines():
+        lines.extend(line[start : start + size] for start in range(0, len(line), size))
+        if not line:
+            lines.append("")
+
+    chunks: list[str] = []
+    current: list[str] = []
+    length = 0
+    for line in lines:
+        if current and length + len(line) + 1 > size:
+            chunks.append("\n".join(current))
+            # Start the next chunk with the trailing lines that fit in the overlap
+            tail: list[str] = []
+            tail_length = 0
+            for previous in reversed(current):
+                if tail_length + len(previous) + 1 > overlap:
+                    break
+                tail.insert(0, previous)
+                tail_length += len(previous) + 1
+            if tail_length + len(line) + 1 > size:
+                tail, tail_length = [], 0
+            current, length = tail, tail_length
+        current.append(line)
+        length += len(line) + 1
+
+    if any(line.strip() for line in current):
+        chunks.append("\n".join(current))
+    return [chunk for chunk in chunks if chunk.strip()]
+
+
+@dataclass(frozen=True)
+class DocumentIndex:
+    chunks: list[str]
+    embeddings: np.ndarray
+    """
+    The normalized chunk embeddings, one row per chunk.
+    """
+
+    def search(self, query_embedding: np.ndarray, top_k: int) -> list[int]:
+        """
+        Return the ids of the `top_k` chunks most similar to the query.
+        """
+        scores = self.embeddings @ query_embedding
+        return np.argsort(-scores)[:top_k].tolist()
+
+
+class RetrievalService:
+    """
+    Select the parts of long documents relevant to each schema field group.
+
+    Documents are chunked and embedded locally, the vector index of the most recent documents is kept in memory so
+    retries and other schemas over the same document do not embed it again.
+    """
+
+    def __init__(self, embedding_pool: WorkerPool, *, max_documents: int) -> None:
+        self._embedding_pool = embedding_pool
+        self._max_documents = max_documents
+        self._indexes: OrderedDict[str, DocumentIndex] = OrderedDict()
+
+    def needs_retrieval(self, text: str) -> bool:
+        return len(text) > RAG_CONTEXT_MAX_CHARS
+
+    async def retrieve(
+        self, text: str, queries: list[str], *, merge: bool = False
+    ) -> list[str]:
+        """
+        Return the context of each query, made of its top-k chunks in document order.
+
+        Short documents are returned whole for every query. When `merge` is set the chunks of every query are
+        combined into a single context.
+        """
+        if not self.needs_retrieval(text):
+            return [text] if merge else [text for _ in queries]
+
+        index = await self._get_index(text)
+        query_embeddings = await self._embedding_pool.run(
+            embed_queries, EMBEDDING_MODEL, queries
+        )
+        chunk_ids = [
+            index.search(query_embedding, RAG_TOP_K)
+            for query_embedding in query_embeddings
+        ]
+
+        if merge:
+            chunk_ids = [self._merge(index, chunk_ids)]
+
+        return [
+            CHUNK_SEPARATOR.join(index.chunks[id] for id in sorted(set(ids)))
+            for ids in chunk_ids
+        ]
+
+    def _merge(self, index: DocumentIndex, chunk_ids: list[list[int]]) -> list[int]:
+        """
+        Combine the chunks of every query best ranked first, within the context size of a whole document.
+        """
+        merged: list[int] = []
+        length = 0
+        for rank in range(RAG_TOP_K):
+            for ids in chunk_ids:
+                if rank >= len(ids) or ids[rank] in merged:
+                    continue
+                chunk_length = len(index.chunks[ids[rank]]) + len(CHUNK_SEPARATOR)
+                if merged and length + chunk_length > RAG_CONTEXT_MAX_CHARS:
+                    return merged
+                merged.append(ids[rank])
+                length += chunk_length
+        return merged
+
+    async def _get_index(self, text: str) -> DocumentIndex:
+        key = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if key in self._indexes:
+            self._indexes.move_to_end(key)
+            return self._indexes[key]
+
+        chunks = chunk_text(text, RAG_CHUNK_SIZE, RAG_CHUNK_OVERLAP)
+        embeddings = await self._embedding_pool.run(
+            embed_texts, EMBEDDING_MODEL, chunks
+        )
+        index = DocumentIndex(chunks=chunks, embeddings=embeddings)
+
+        self._indexes[key] = index
+        while len(self._indexes) > self._max_documents:
+            self._indexes.popitem(last=False)
+        return index
@@ -0,0 +1,73 @@
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from pydantic import BaseModel
+
+from ..entities.json_schema_entity import JsonSchemaEntity
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    model: type[BaseModel]
+    """
+    The Pydantic model class generated from the schema.
+    """
+
+    json_schema: str
+    """
+    The model JSON schema rendered for the prompt.
+    """
+
+    output_schema: dict[str, Any]
+    """
+    The model JSON schema used to constrain the generation.
+    """
+
+    partial_model: type[BaseModel]
+    """
+    The model with every field optional, validating the fields of outputs still being generated.
+    """
+
+    metadata: str
+    """
+    The schema fields description rendered for the prompt.
+    """
+
+
+class SchemaCacheService:
+    """
+    LRU cache of compiled schemas keyed by schema id and content hash, so the Pydantic model class and the prompt
+    fragments are only generated once per schema version.
+    """
+
+    def __init__(self, *, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[str | None, str], CompiledSchema] = (
+            OrderedDict()
+        )
+
+    def get(self, schema_id: str | None, schema: JsonSchemaEntity) -> CompiledSchema:
+        key = (schema_id, schema.content_hash)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        model = schema.as_model()
+        output_schema = model.model_json_schema()
+        compiled = CompiledSchema(
+            model=model,
+            json_schema=json.dumps(output_schema, indent=2),
+            output_schema=output_schema,
+            partial_model=schema.as_model(partial=True),
+            metadata=schema.as_prompt_metadata(),
+        )
+
+        self._entries[key] = compiled
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return compiled
+
+    def invalidate(self, schema_id: str) -> None:
+        for key in [key for key in self._entries if key[0] == schema_id]:
+            del self._entries[key]
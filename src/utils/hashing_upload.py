@@ -0,0 +1,121 @@
+import hashlib
+from typing import Any, Callable, Coroutine
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from starlette.background import BackgroundTask
+from starlette.datastructures import FormData
+from starlette.formparsers import (
+    MultiPartException,
+    MultiPartParser,
+    parse_options_header,
+)
+
+from src.entities.s3_file_entity import S3FileEntity
+
+
+class HashingUploadFile(UploadFile):
+    """
+    Uploaded file hashing its content chunk by chunk while the request body is spooled.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._sha256 = hashlib.sha256()
+
+    async def write(self, data: bytes) -> None:
+        self._sha256.update(data)
+        await super().write(data)
+
+    def key(self, ext: str) -> str:
+        """Generate the same key as `S3FileEntity.key` from the spooled content."""
+        return f"{self._sha256.hexdigest()}{ext}"
+
+
+class HashingMultiPartParser(MultiPartParser):
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        file = self._current_part.file
+        if file is not None:
+            self._current_part.file = HashingUploadFile(
+                file=file.file, size=0, filename=file.filename, headers=file.headers
+            )
+
+
+class _DeferredCloseFormData(FormData):
+    """
+    Form data ignoring the `close` FastAPI calls once the endpoint returns, the uploaded files are closed by
+    `close_files` after the response is sent instead.
+    """
+
+    async def close(self) -> None:
+        pass
+
+    async def close_files(self) -> None:
+        await super().close()
+
+
+class HashingRequest(Request):
+    async def _get_form(
+        self, *, max_files: int | float = 1000, max_fields: int | float = 1000
+    ) -> FormData:
+        content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+        if self._form is None and content_type == b"multipart/form-data":
+            try:
+                form = await HashingMultiPartParser(
+                    self.headers,
+                    self.stream(),
+                    max_files=max_files,
+                    max_fields=max_fields,
+                ).parse()
+            except MultiPartException as ex:
+                raise HTTPException(status_code=400, detail=ex.message)
+            self._form = _DeferredCloseFormData(form.multi_items())
+        return await super()._get_form(max_files=max_files, max_fields=max_fields)
+
+    async def close_files(self) -> None:
+        if isinstance(self._form, _DeferredCloseFormData):
+            await self._form.close_files()
+
+
+class HashingRoute(APIRoute):
+    """
+    Route parsing multipart bodies into `HashingUploadFile`s, so uploads are not read again to compute their key.
+
+    The uploaded files are closed once the response is sent, streamed responses can read them while streaming.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def hashing_handler(request: Request) -> Response:
+            request = HashingRequest(request.scope, request.receive)
+            try:
+                response = await handler(request)
+            except BaseException:
+                await request.close_files()
+                raise
+
+            background = response.background
+
+            async def close_files() -> None:
+                try:
+                    if background is not None:
+                        await background()
+                finally:
+                    await request.close_files()
+
+            response.background = BackgroundTask(close_files)
+            return response
+
+        return hashing_handler
+
+
+async def upload_key(file: UploadFile, ext: str) -> str:
+    """
+    The content-addressed key of the uploaded file, hashing it in a separate pass when it was not spooled by a
+    `HashingRoute`.
+    """
+    if isinstance(file, HashingUploadFile):
+        return file.key(ext)
+    return await run_in_threadpool(S3FileEntity.key_from_file, file.file, ext)
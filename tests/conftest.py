@@ -0,0 +1,64 @@
+import os
+from typing import AsyncIterator, Iterator
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+from moto import mock_aws
+
+from src.entities.extraction_entity import ExtractionEntity
+from src.entities.file_entity import FileEntity
+from src.entities.job_entity import JobEntity
+from src.entities.ocr_result_entity import OCRResultEntity
+from src.entities.schema_entity import SchemaEntity
+from src.infrastructure.S3 import S3Client, S3Config
+from src.infrastructure.S3.async_s3_client import AsyncS3Client
+
+# Controllers import the application wiring, which must not need an S3 endpoint
+os.environ.setdefault("S3_BACKEND", "filesystem")
+
+
+@pytest.fixture
+async def database() -> AsyncIterator[None]:
+    """
+    In-memory MongoDB with every document initialized.
+    """
+    client = AsyncMongoMockClient()
+    await init_beanie(
+        database=client.test,
+        document_models=[
+            SchemaEntity,
+            FileEntity,
+            OCRResultEntity,
+            JobEntity,
+            ExtractionEntity,
+        ],
+    )
+    yield
+
+
+@pytest.fixture
+def s3_backend() -> Iterator[S3Client]:
+    """
+    `S3Client` against an in-memory S3 bucket, with a low multipart threshold so multipart uploads are covered.
+    """
+    with mock_aws():
+        client = S3Client(
+            S3Config(
+                url="https://s3.amazonaws.com",
+                access_key="test",
+                secret_access_key="test",
+                region="us-east-1",
+                bucket="docuxtract",
+                multipart_threshold=5 * 1024 * 1024,
+                multipart_chunksize=5 * 1024 * 1024,
+            )
+        )
+        client.create_butcket()
+        yield client
+
+
+@pytest.fixture
+def s3_client(s3_backend: S3Client) -> Iterator[AsyncS3Client]:
+    client = AsyncS3Client(s3_backend, max_concurrency=4)
+    yield client
+    client.shutdown()
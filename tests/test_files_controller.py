@@ -0,0 +1,111 @@
+import os
+from typing import AsyncIterator
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.controllers import files_controller
+from src.entities.s3_file_entity import S3FileEntity
+from src.infrastructure.mongodb import FilesCollection
+from src.infrastructure.S3.async_s3_client import AsyncS3Client
+from src.services.files_service import FilesService
+
+CONTENT = os.urandom(1000)
+KEY = S3FileEntity(ext=".pdf", content=CONTENT).key
+
+
+@pytest.fixture
+async def client(
+    database: None, s3_client: AsyncS3Client, monkeypatch: pytest.MonkeyPatch
+) -> AsyncIterator[AsyncClient]:
+    monkeypatch.setattr(
+        files_controller, "files_service", FilesService(s3_client, FilesCollection())
+    )
+    app = FastAPI()
+    app.include_router(files_controller.router)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post(
+            "/files", files={"file": ("scan.pdf", CONTENT, "application/pdf")}
+        )
+        assert response.status_code == 204
+        yield client
+
+
+async def test_download_whole_file(client: AsyncClient) -> None:
+    response = await client.get(f"/files/{KEY}")
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["ETag"] == f'"{KEY}"'
+    assert response.headers["Content-Length"] == str(len(CONTENT))
+    assert response.headers["Accept-Ranges"] == "bytes"
+
+
+@pytest.mark.parametrize(
+    "range, start, end",
+    [
+        ("bytes=0-99", 0, 99),
+        ("bytes=900-", 900, 999),
+        ("bytes=-100", 900, 999),
+        ("bytes=950-2000", 950, 999),
+        ("bytes=-5000", 0, 999),
+    ],
+)
+async def test_download_range(
+    client: AsyncClient, range: str, start: int, end: int
+) -> None:
+    response = await client.get(f"/files/{KEY}", headers={"Range": range})
+
+    assert response.status_code == 206
+    assert response.content == CONTENT[start : end + 1]
+    assert response.headers["Content-Range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert response.headers["Content-Length"] == str(end - start + 1)
+
+
+@pytest.mark.parametrize("range", ["bytes=0-9,20-29", "items=0-9", "bytes=a-b"])
+async def test_unsupported_range_serves_the_whole_file(
+    client: AsyncClient, range: str
+) -> None:
+    response = await client.get(f"/files/{KEY}", headers={"Range": range})
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+@pytest.mark.parametrize("range", ["bytes=1000-", "bytes=500-400"])
+async def test_unsatisfiable_range(client: AsyncClient, range: str) -> None:
+    response = await client.get(f"/files/{KEY}", headers={"Range": range})
+
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+
+async def test_range_ignored_when_if_range_does_not_match(client: AsyncClient) -> None:
+    response = await client.get(
+        f"/files/{KEY}", headers={"Range": "bytes=0-9", "If-Range": '"other.pdf"'}
+    )
+
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+
+@pytest.mark.parametrize("if_none_match", [f'"{KEY}"', f'W/"{KEY}"', "*"])
+async def test_matching_etag_is_not_modified(
+    client: AsyncClient, if_none_match: str
+) -> None:
+    response = await client.get(
+        f"/files/{KEY}", headers={"If-None-Match": if_none_match}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == f'"{KEY}"'
+
+
+async def test_matching_etag_of_deleted_file_is_not_found(client: AsyncClient) -> None:
+    assert (await client.delete(f"/files/{KEY}")).status_code == 204
+
+    response = await client.get(f"/files/{KEY}", headers={"If-None-Match": f'"{KEY}"'})
+
+    assert response.status_code == 404
@@ -0,0 +1,203 @@
+import asyncio
+import io
+import os
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator
+import pytest
+from fastapi import APIRouter, FastAPI, UploadFile
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.entities.file_entity import FileEntity
+from src.entities.s3_file_entity import S3FileEntity
+from src.infrastructure.mongodb import FilesCollection
+from src.infrastructure.S3.async_s3_client import AsyncS3Client
+from src.services import files_service as files_service_module
+from src.services.custom_exceptions import FileNotFoundException, FileStorageException
+from src.services.files_service import FilesService
+from src.utils.hashing_upload import HashingRoute, HashingUploadFile, upload_key
+
+CONTENT = os.urandom(64 * 1024)
+
+
+# Single PUT and, above the threshold of the S3 fixture, multipart uploads
+@pytest.mark.parametrize("size", [64 * 1024, 6 * 1024 * 1024])
+async def test_upload_stream_keeps_the_file_open(
+    database: None, s3_client: AsyncS3Client, size: int
+) -> None:
+    files_service = FilesService(s3_client, FilesCollection())
+    content = os.urandom(size)
+    file = UploadFile(io.BytesIO(content), filename="scan.pdf")
+
+    key = await files_service.upload_stream("scan", ".pdf", file)
+
+    await file.seek(0)
+    assert await file.read() == content
+    assert key == S3FileEntity(ext=".pdf", content=content).key
+
+    filename, downloaded = await files_service.download_file(key)
+    assert filename == "scan.pdf"
+    assert downloaded == content
+
+
+async def test_upload_file_keeps_the_stream_key(
+    database: None, s3_client: AsyncS3Client
+) -> None:
+    files_service = FilesService(s3_client, FilesCollection())
+
+    key = await files_service.upload_file("scan", ".pdf", CONTENT)
+    streamed_key = await files_service.upload_stream(
+        "scan", ".pdf", UploadFile(io.BytesIO(CONTENT), filename="scan.pdf")
+    )
+
+    assert key == streamed_key
+    assert await files_service.find_file(key) == ("scan.pdf", len(CONTENT))
+
+
+def test_hashing_route_hashes_while_spooling() -> None:
+    router = APIRouter(route_class=HashingRoute)
+
+    @router.post("/upload")
+    async def upload(file: UploadFile) -> dict[str, str]:
+        assert isinstance(file, HashingUploadFile)
+        return {
+            "key": await upload_key(file, ".pdf"),
+            "content": str(len(await file.read())),
+        }
+
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/upload", files={"file": ("scan.pdf", CONTENT, "application/pdf")}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "key": S3FileEntity(ext=".pdf", content=CONTENT).key,
+        "content": str(len(CONTENT)),
+    }
+
+
+def test_hashing_route_closes_files_after_streaming() -> None:
+    router = APIRouter(route_class=HashingRoute)
+    uploads: list[UploadFile] = []
+
+    @router.post("/stream")
+    async def stream(files: list[UploadFile]) -> StreamingResponse:
+        uploads.extend(files)
+
+        async def read() -> AsyncIterator[bytes]:
+            for file in files:
+                yield str(len(await file.read())).encode() + b"\n"
+
+        return StreamingResponse(read())
+
+    app = FastAPI()
+    app.include_router(router)
+
+    response = TestClient(app).post(
+        "/stream",
+        files=[("files", ("a.pdf", CONTENT)), ("files", ("b.pdf", CONTENT[:10]))],
+    )
+
+    assert response.status_code == 200
+    assert response.text == f"{len(CONTENT)}\n10\n"
+    assert all(file.file.closed for file in uploads)
+
+
+@pytest.fixture
+def files_service(
+    database: None, s3_client: AsyncS3Client, monkeypatch: pytest.MonkeyPatch
+) -> FilesService:
+    monkeypatch.setattr(files_service_module, "FILE_CLAIM_POLL_INTERVAL", 0.01)
+    return FilesService(s3_client, FilesCollection())
+
+
+async def test_concurrent_uploads_put_the_object_once(
+    files_service: FilesService,
+    s3_client: AsyncS3Client,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    uploads = []
+    upload_file = s3_client.upload_file
+
+    async def count_uploads(file: S3FileEntity) -> str:
+        uploads.append(file.key)
+        return await upload_file(file)
+
+    monkeypatch.setattr(s3_client, "upload_file", count_uploads)
+
+    keys = await asyncio.gather(
+        *(files_service.upload_file("scan", ".pdf", CONTENT) for _ in range(5))
+    )
+
+    assert len(set(keys)) == 1
+    assert uploads == keys[:1]
+    assert await FileEntity.find_many(FileEntity.key == keys[0]).count() == 1
+    assert await files_service.find_file(keys[0]) == ("scan.pdf", len(CONTENT))
+
+
+async def test_failed_upload_releases_the_key(
+    files_service: FilesService,
+    s3_client: AsyncS3Client,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fail(file: S3FileEntity) -> str:
+        raise ConnectionError("S3 is unreachable")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(s3_client, "upload_file", fail)
+        with pytest.raises(FileStorageException):
+            await files_service.upload_file("scan", ".pdf", CONTENT)
+
+    key = await files_service.upload_file("scan", ".pdf", CONTENT)
+    assert await files_service.find_file(key) == ("scan.pdf", len(CONTENT))
+
+
+async def test_abandoned_upload_is_taken_over(files_service: FilesService) -> None:
+    key = S3FileEntity(ext=".pdf", content=CONTENT).key
+    await FileEntity(
+        key=key,
+        filename="scan.pdf",
+        uploaded=False,
+        owner="crashed",
+        claimed_at=datetime.now(timezone.utc)
+        - timedelta(seconds=files_service_module.FILE_CLAIM_TIMEOUT + 1),
+    ).insert()
+
+    assert await files_service.upload_file("scan", ".pdf", CONTENT) == key
+    assert await files_service.find_file(key) == ("scan.pdf", len(CONTENT))
+
+
+async def test_upload_during_deletion_stores_the_object_again(
+    files_service: FilesService,
+    s3_client: AsyncS3Client,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    key = await files_service.upload_file("scan", ".pdf", CONTENT)
+    deleting, deleted = asyncio.Event(), asyncio.Event()
+    delete_file = s3_client.delete_file
+
+    async def slow_delete(key: str) -> None:
+        deleting.set()
+        await deleted.wait()
+        await delete_file(key)
+
+    monkeypatch.setattr(s3_client, "delete_file", slow_delete)
+
+    deletion = asyncio.create_task(files_service.delete_file(key))
+    await deleting.wait()
+    upload = asyncio.create_task(files_service.upload_file("scan", ".pdf", CONTENT))
+    await asyncio.sleep(0.05)
+    assert not upload.done()
+
+    deleted.set()
+    await deletion
+    assert await upload == key
+    assert await files_service.find_file(key) == ("scan.pdf", len(CONTENT))
+
+
+async def test_delete_unknown_file(files_service: FilesService) -> None:
+    with pytest.raises(FileNotFoundException):
+        await files_service.delete_file("unknown.pdf")
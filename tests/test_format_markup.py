@@ -0,0 +1,84 @@
+import pytest
+
+from src.enums.ocr_output_format import OCROutputFormat
+from src.services.ocr import format_markup as format_markup_module
+from src.services.ocr.alto_xml import AltoString, to_alto_xml
+from src.services.ocr.format_markup import format_markup
+
+
+def word(content: str, hpos: float) -> AltoString:
+    return AltoString(content, hpos=hpos, vpos=0, width=len(content) * 10, height=20)
+
+
+# Two pages, as extracted from a PDF, with 10 pixel characters on a 1200 pixel page (120 columns)
+MARKUP = b"\n".join(
+    [
+        to_alto_xml(
+            1200,
+            1600,
+            [
+                [
+                    [word("Invoice", 0), word("9028", 600)],
+                    [word("Date", 0), word("2024-09-27", 600)],
+                ],
+                [],
+                [[word("Total", 100), word("120.50", 600)]],
+            ],
+            source="test",
+        ),
+        to_alto_xml(1200, 1600, [[[word("Thank", 0), word("you", 60)]]], source="test"),
+    ]
+)
+
+
+@pytest.fixture(autouse=True)
+def layout_columns(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(format_markup_module, "LAYOUT_COLUMNS", 120)
+
+
+def test_alto_is_sent_as_extracted() -> None:
+    assert format_markup(MARKUP, OCROutputFormat.ALTO) == MARKUP.decode("utf-8")
+
+
+def test_text_keeps_the_reading_order() -> None:
+    assert format_markup(MARKUP, OCROutputFormat.TEXT) == (
+        "Invoice 9028\nDate 2024-09-27\n\nTotal 120.50\n\nThank you"
+    )
+
+
+def test_lines_keep_the_columns_aligned() -> None:
+    first_page = [
+        "Invoice" + " " * 53 + "9028",
+        "Date" + " " * 56 + "2024-09-27",
+        " " * 10 + "Total" + " " * 45 + "120.50",
+    ]
+
+    assert format_markup(MARKUP, OCROutputFormat.LINES) == (
+        "\n".join(first_page) + "\n\nThank you"
+    )
+
+
+def test_lines_of_wide_pages_fit_the_layout_columns() -> None:
+    markup = to_alto_xml(2400, 1600, [[[word("a", 0), word("b", 2380)]]], source="test")
+
+    assert format_markup(markup, OCROutputFormat.LINES) == "a" + " " * 118 + "b"
+
+
+def test_lines_keep_a_space_between_overlapping_words() -> None:
+    markup = to_alto_xml(
+        1200, 1600, [[[word("Invoice", 0), word("9028", 30)]]], source="test"
+    )
+
+    assert format_markup(markup, OCROutputFormat.LINES) == "Invoice 9028"
+
+
+def test_tagged_wraps_pages_and_blocks() -> None:
+    assert format_markup(MARKUP, OCROutputFormat.TAGGED) == (
+        '<page n="1">\n'
+        "<block>\nInvoice 9028\nDate 2024-09-27\n</block>\n"
+        "<block>\nTotal 120.50\n</block>\n"
+        "</page>\n"
+        '<page n="2">\n'
+        "<block>\nThank you\n</block>\n"
+        "</page>"
+    )
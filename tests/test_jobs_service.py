@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+
+from src.entities.job_entity import JobEntity
+from src.enums.job_status import JobStatus
+from src.infrastructure.mongodb import JobsCollection
+from src.services.jobs_service import JobsService
+
+LEASE = timedelta(seconds=60)
+
+
+@pytest.fixture
+async def job(database: None) -> JobEntity:
+    job = JobEntity(
+        user="user",
+        file_key="scan.pdf",
+        content_type="application/pdf",
+        schema_id="schema",
+    )
+    await JobsCollection().insert(job)
+    return job
+
+
+async def test_claim_holds_the_job_until_the_lease_expires(job: JobEntity) -> None:
+    jobs_collection = JobsCollection()
+    id = str(job.id)
+    now = datetime.now(timezone.utc)
+
+    claimed = await jobs_collection.claim(id, "replica-1", now, now + LEASE)
+    assert claimed.status == JobStatus.RUNNING
+    assert claimed.owner == "replica-1"
+
+    assert await jobs_collection.claim(id, "replica-2", now, now + LEASE) is None
+    assert [str(job.id) for job in await jobs_collection.find_claimable(now)] == []
+
+    expired = now + LEASE + timedelta(seconds=1)
+    assert [str(job.id) for job in await jobs_collection.find_claimable(expired)] == [
+        id
+    ]
+    claimed = await jobs_collection.claim(id, "replica-2", expired, expired + LEASE)
+    assert claimed.owner == "replica-2"
+
+    # The first replica lost the job and can no longer renew or finish it
+    assert not await jobs_collection.renew(id, "replica-1", expired + LEASE)
+    assert not await jobs_collection.release(
+        id, "replica-1", {JobEntity.status: JobStatus.SUCCEEDED}
+    )
+
+
+async def test_renew_extends_the_lease(job: JobEntity) -> None:
+    jobs_collection = JobsCollection()
+    id = str(job.id)
+    now = datetime.now(timezone.utc)
+    await jobs_collection.claim(id, "replica-1", now, now + LEASE)
+
+    assert await jobs_collection.renew(id, "replica-1", now + 2 * LEASE)
+
+    later = now + LEASE + timedelta(seconds=1)
+    assert await jobs_collection.claim(id, "replica-2", later, later + LEASE) is None
+
+
+async def test_release_finishes_the_job(job: JobEntity) -> None:
+    jobs_collection = JobsCollection()
+    id = str(job.id)
+    now = datetime.now(timezone.utc)
+    await jobs_collection.claim(id, "replica-1", now, now + LEASE)
+
+    assert await jobs_collection.release(
+        id, "replica-1", {JobEntity.status: JobStatus.SUCCEEDED}
+    )
+
+    released = await jobs_collection.find_by_id(id)
+    assert released.status == JobStatus.SUCCEEDED
+    assert released.owner is None
+    assert await jobs_collection.claim(id, "replica-2", now, now + LEASE) is None
+
+
+async def test_wait_drops_the_event_of_unfinished_jobs(job: JobEntity) -> None:
+    jobs_service = JobsService(
+        JobsCollection(), None, None, None, workers=1, max_queue=1, lease=60
+    )
+
+    waited = await asyncio.gather(
+        jobs_service.wait(str(job.id), 0.05), jobs_service.wait(str(job.id), 0.1)
+    )
+
+    assert [job.status for job in waited] == [JobStatus.QUEUED, JobStatus.QUEUED]
+    assert jobs_service._events == {}
+    assert not jobs_service._waiters
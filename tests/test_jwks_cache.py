@@ -0,0 +1,164 @@
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.auth import json_web_token
+from src.auth.json_web_token import JwksCache
+
+JWKS_URI = "https://tenant.auth0.com/.well-known/jwks.json"
+
+
+def create_jwk(kid: str) -> dict[str, Any]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return {
+        **jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key(), as_dict=True),
+        "kid": kid,
+        "use": "sig",
+        "alg": "RS256",
+    }
+
+
+KEYS = {kid: create_jwk(kid) for kid in ["first", "second"]}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class JwksEndpoint:
+    """
+    Fake JWKS endpoint serving `kids`, counting the fetches.
+    """
+
+    def __init__(self) -> None:
+        self.kids = ["first"]
+        self.fetches = 0
+        self.available = True
+        self.delay = 0.0
+
+    def fetch_data(self) -> Any:
+        self.fetches += 1
+        time.sleep(self.delay)
+        if not self.available:
+            raise jwt.exceptions.PyJWKClientError("Fail to fetch data from the url")
+        return {"keys": [KEYS[kid] for kid in self.kids]}
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(
+        json_web_token, "time", SimpleNamespace(monotonic=clock.monotonic)
+    )
+    monkeypatch.setattr(json_web_token, "JWKS_CACHE_TTL", 3600)
+    monkeypatch.setattr(json_web_token, "JWKS_MIN_REFRESH_INTERVAL", 30)
+    return clock
+
+
+@pytest.fixture
+def endpoint(monkeypatch: pytest.MonkeyPatch) -> JwksEndpoint:
+    endpoint = JwksEndpoint()
+    # Bound to the endpoint, so every `PyJWKClient` fetches from it
+    monkeypatch.setattr(jwt.PyJWKClient, "fetch_data", endpoint.fetch_data)
+    return endpoint
+
+
+def test_keys_are_fetched_once_within_the_ttl(
+    clock: Clock, endpoint: JwksEndpoint
+) -> None:
+    cache = JwksCache(JWKS_URI)
+
+    key = cache.get_signing_key("first")
+    clock.now += 3600
+
+    assert cache.get_signing_key("first") is key
+    assert endpoint.fetches == 1
+
+
+def test_keys_are_refreshed_after_the_ttl(clock: Clock, endpoint: JwksEndpoint) -> None:
+    cache = JwksCache(JWKS_URI)
+    key = cache.get_signing_key("first")
+
+    clock.now += 3601
+
+    assert cache.get_signing_key("first") is not key
+    assert endpoint.fetches == 2
+
+
+def test_known_keys_are_served_while_the_endpoint_is_unreachable(
+    clock: Clock, endpoint: JwksEndpoint
+) -> None:
+    cache = JwksCache(JWKS_URI)
+    key = cache.get_signing_key("first")
+
+    endpoint.available = False
+    clock.now += 3601
+
+    assert cache.get_signing_key("first") is key
+    with pytest.raises(jwt.exceptions.PyJWKClientError):
+        cache.get_signing_key("second")
+
+
+def test_unknown_kid_refreshes_the_keys(clock: Clock, endpoint: JwksEndpoint) -> None:
+    cache = JwksCache(JWKS_URI)
+    cache.get_signing_key("first")
+
+    # Key rotation
+    endpoint.kids = ["first", "second"]
+    clock.now += 31
+
+    assert cache.get_signing_key("second").key_id == "second"
+    assert endpoint.fetches == 2
+
+
+def test_unknown_kids_refresh_at_most_once_per_interval(
+    clock: Clock, endpoint: JwksEndpoint
+) -> None:
+    cache = JwksCache(JWKS_URI)
+    cache.get_signing_key("first")
+
+    for _ in range(3):
+        with pytest.raises(jwt.exceptions.PyJWKClientError):
+            cache.get_signing_key("forged")
+    assert endpoint.fetches == 1
+
+    clock.now += 31
+    with pytest.raises(jwt.exceptions.PyJWKClientError):
+        cache.get_signing_key("forged")
+    assert endpoint.fetches == 2
+
+
+def test_concurrent_refreshes_are_single_flight(
+    clock: Clock, endpoint: JwksEndpoint
+) -> None:
+    cache = JwksCache(JWKS_URI)
+    endpoint.delay = 0.1
+    keys: list[jwt.PyJWK] = []
+
+    threads = [
+        threading.Thread(target=lambda: keys.append(cache.get_signing_key("first")))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(keys) == 8
+    assert len({id(key) for key in keys}) == 1
+    assert endpoint.fetches == 1
+
+
+def test_caches_are_shared_per_jwks_uri() -> None:
+    cache = json_web_token.get_jwks_cache(JWKS_URI)
+
+    assert json_web_token.get_jwks_cache(JWKS_URI) is cache
+    assert json_web_token.get_jwks_cache(JWKS_URI + "?other") is not cache
@@ -0,0 +1,146 @@
+import math
+from types import SimpleNamespace
+import pytest
+
+from src.entities.json_schema_entity import JsonSchemaEntity
+from src.services import model_router_service as router_module
+from src.services.model_router_service import ModelRouterService
+
+BACKEND = SimpleNamespace(model="large", small_model="small")
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    for name, value in {
+        "ROUTER_SMALL_MAX_TOKENS": 1000,
+        "ROUTER_SMALL_MAX_FIELDS": 3,
+        "ROUTER_SMALL_MAX_DEPTH": 1,
+        "ROUTER_MIN_CONTEXT_WINDOW": 2048,
+        "ROUTER_PROMPT_TOKENS": 256,
+        "ROUTER_TOKENS_PER_FIELD": 48,
+        "ROUTER_TOKEN_HEADROOM": 1.3,
+        "LLM_CONTEXT_WINDOW": 16384,
+    }.items():
+        monkeypatch.setattr(router_module, name, value)
+
+
+def create_schema(fields: int, nested: bool = False) -> JsonSchemaEntity:
+    properties = [
+        {"name": f"field_{i}", "type": "string", "required": True, "description": ""}
+        for i in range(fields)
+    ]
+    if nested:
+        properties = [
+            {
+                "name": "items",
+                "type": "array",
+                "required": True,
+                "description": "",
+                "items": {
+                    "name": "item",
+                    "type": "object",
+                    "required": True,
+                    "description": "",
+                    "properties": properties,
+                },
+            }
+        ]
+    return JsonSchemaEntity.model_validate(
+        {
+            "name": "document",
+            "type": "object",
+            "required": True,
+            "description": "",
+            "properties": properties,
+        }
+    )
+
+
+def text(tokens: int) -> str:
+    # Without an encoding, tokens are estimated as 4 characters each
+    return "a" * tokens * 4
+
+
+def test_small_documents_and_schemas_use_the_small_model() -> None:
+    route = ModelRouterService().route(BACKEND, text(1000), create_schema(3))
+
+    assert (route.name, route.model) == ("small", "small")
+    assert (route.tokens, route.fields, route.depth) == (1000, 3, 1)
+
+
+@pytest.mark.parametrize(
+    "tokens, schema",
+    [
+        (1001, create_schema(3)),
+        (10, create_schema(4)),
+        (10, create_schema(2, nested=True)),
+    ],
+)
+def test_large_documents_or_schemas_use_the_default_model(
+    tokens: int, schema: JsonSchemaEntity
+) -> None:
+    route = ModelRouterService().route(BACKEND, text(tokens), schema)
+
+    assert (route.name, route.model) == ("default", "large")
+
+
+def test_backends_without_small_model_use_the_default_model() -> None:
+    backend = SimpleNamespace(model="large", small_model=None)
+
+    route = ModelRouterService().route(backend, text(10), create_schema(1))
+
+    assert (route.name, route.model) == ("default", "large")
+
+
+@pytest.mark.parametrize(
+    "tokens, context_window",
+    [
+        (10, 2048),
+        # (1200 + 256 + 48) * 1.3 = 1955.2
+        (1200, 2048),
+        # (1300 + 256 + 48) * 1.3 = 2085.2
+        (1300, 4096),
+        (5000, 8192),
+        (50000, 16384),
+    ],
+)
+def test_context_window_is_the_next_power_of_two_with_headroom(
+    tokens: int, context_window: int
+) -> None:
+    route = ModelRouterService().route(BACKEND, text(tokens), create_schema(1))
+
+    assert route.context_window == context_window
+    if context_window < router_module.LLM_CONTEXT_WINDOW:
+        assert math.ceil((tokens + 256 + 48) * 1.3) <= context_window
+
+
+def test_fingerprint_changes_with_the_models_and_settings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    router = ModelRouterService()
+    fingerprint = router.fingerprint(BACKEND)
+
+    assert router.fingerprint(SimpleNamespace(**vars(BACKEND))) == fingerprint
+    assert (
+        router.fingerprint(SimpleNamespace(model="large", small_model="other"))
+        != fingerprint
+    )
+
+    monkeypatch.setattr(router_module, "ROUTER_SMALL_MAX_TOKENS", 2000)
+    assert router.fingerprint(BACKEND) != fingerprint
+
+
+def test_measure_records_the_route_stats() -> None:
+    router = ModelRouterService()
+    route = router.route(BACKEND, text(10), create_schema(2))
+
+    with router.measure(route):
+        pass
+    with pytest.raises(ValueError):
+        with router.measure(route):
+            raise ValueError()
+
+    [stats] = router.stats()
+    assert (stats.name, stats.model, stats.context_window) == ("small", "small", 2048)
+    assert (stats.requests_total, stats.failed_total) == (2, 1)
+    assert (stats.tokens_total, stats.fields_total) == (20, 4)
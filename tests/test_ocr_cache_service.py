@@ -0,0 +1,77 @@
+import zlib
+import pytest
+
+from src.entities.ocr_result_entity import OCRResultEntity
+from src.infrastructure.mongodb import OCRResultsCollection
+from src.services.ocr_cache_service import OCRCacheService
+
+
+def create_cache(version: str = "1", max_entries: int = 2) -> OCRCacheService:
+    return OCRCacheService(
+        OCRResultsCollection(), version=version, max_entries=max_entries
+    )
+
+
+async def test_persisted_outputs_are_shared_across_replicas(database: None) -> None:
+    await create_cache().set("a.pdf", b"<alto>a</alto>")
+
+    stored = await OCRResultEntity.find_one(OCRResultEntity.key == "a.pdf")
+    assert zlib.decompress(stored.markup) == b"<alto>a</alto>"
+    assert await create_cache().get("a.pdf") == b"<alto>a</alto>"
+
+
+async def test_least_recently_used_outputs_leave_the_memory_tier(
+    database: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = create_cache(max_entries=2)
+    await cache.set("a.pdf", b"a")
+    await cache.set("b.pdf", b"b")
+    assert await cache.get("a.pdf") == b"a"
+    await cache.set("c.pdf", b"c")
+
+    reads = []
+    find = OCRResultsCollection.find
+
+    async def count_reads(self, key: str, version: str) -> OCRResultEntity | None:
+        reads.append(key)
+        return await find(self, key, version)
+
+    monkeypatch.setattr(OCRResultsCollection, "find", count_reads)
+
+    assert await cache.get("a.pdf") == b"a"
+    assert await cache.get("c.pdf") == b"c"
+    assert reads == []
+
+    # Evicted from memory, read back from Mongo
+    assert await cache.get("b.pdf") == b"b"
+    assert reads == ["b.pdf"]
+
+
+async def test_outputs_of_other_versions_are_misses(database: None) -> None:
+    await create_cache(version="1").set("a.pdf", b"a")
+
+    cache = create_cache(version="2")
+    assert await cache.get("a.pdf") is None
+
+    await cache.set("a.pdf", b"a2")
+    assert await cache.invalidate() == 1
+    assert await create_cache(version="1").get("a.pdf") is None
+    assert await create_cache(version="2").get("a.pdf") == b"a2"
+
+
+async def test_invalidate_key(database: None) -> None:
+    cache = create_cache()
+    await cache.set("a.pdf", b"a")
+    await cache.set("b.pdf", b"b")
+
+    assert await cache.invalidate("a.pdf") == 1
+    assert await cache.get("a.pdf") is None
+    assert await cache.get("b.pdf") == b"b"
+
+
+async def test_empty_outputs_are_not_cached(database: None) -> None:
+    cache = create_cache()
+    await cache.set("a.pdf", b"")
+
+    assert await cache.get("a.pdf") is None
+    assert await OCRResultEntity.find_all().count() == 0
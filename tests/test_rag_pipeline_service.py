@@ -0,0 +1,259 @@
+import io
+from typing import Any, AsyncIterator, Callable, Iterator
+import pytest
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+from src.dtos.batch_document_dto import BatchDocumentDto
+from src.dtos.pipeline_event_dto import PipelineEventDto
+from src.entities.json_schema_entity import JsonSchemaEntity
+from src.entities.s3_file_entity import S3FileEntity
+from src.enums.llm_backend_type import LLMBackendType
+from src.enums.pipeline_event import PipelineEvent
+from src.infrastructure.mongodb import (
+    ExtractionsCollection,
+    FilesCollection,
+    OCRResultsCollection,
+)
+from src.infrastructure.S3.async_s3_client import AsyncS3Client
+from src.infrastructure.workers import WorkerPool, WorkerPoolConfig
+from src.services.files_service import FilesService
+from src.services.llm.llm_backend import LLMBackend
+from src.services.model_router_service import ModelRouterService
+from src.services.ocr_cache_service import OCRCacheService
+from src.services.rag_pipeline_service import Content, RAGPipelineService
+from src.services.retrieval_service import RetrievalService
+from src.services.schema_cache_service import SchemaCacheService
+
+CONTENT = b"Invoice 9028\nDue date 2024-09-27\n"
+
+
+class Markup(BaseModel):
+    markup: str
+
+
+@pytest.fixture
+def files_service(database: None, s3_client: AsyncS3Client) -> FilesService:
+    return FilesService(s3_client, FilesCollection())
+
+
+@pytest.fixture
+def rag_pipeline_service(
+    files_service: FilesService,
+    s3_client: AsyncS3Client,
+    monkeypatch: pytest.MonkeyPatch,
+) -> RAGPipelineService:
+    ocr_pool = WorkerPool(
+        WorkerPoolConfig(name="ocr", kind="thread", max_workers=2, max_queue=8)
+    )
+    service = RAGPipelineService(
+        files_service,
+        s3_client,
+        OCRCacheService(OCRResultsCollection(), version="test", max_entries=8),
+        None,
+        None,
+        None,
+        None,
+        ocr_pool=ocr_pool,
+        llm_pool=None,
+        llm_backends={},
+    )
+
+    # Only the document handling of the batch is covered, the extraction returns the OCR output
+    async def extract(
+        key: str, content_type: str, content: Content, *args: Any, **kwargs: Any
+    ) -> BaseModel:
+        markup = await service.extract_markup(key, content_type, content)
+        return Markup(markup=markup.decode())
+
+    monkeypatch.setattr(service, "extract", extract)
+    yield service
+    ocr_pool.shutdown()
+
+
+async def extract_batch(
+    service: RAGPipelineService, documents: list[BatchDocumentDto]
+) -> dict[str, Any]:
+    results = [result async for result in service.extract_batch(documents, None)]
+    return {result.name: result for result in sorted(results, key=lambda r: r.index)}
+
+
+async def test_batch_uploads_files_when_processed(
+    rag_pipeline_service: RAGPipelineService, files_service: FilesService
+) -> None:
+    file = UploadFile(io.BytesIO(CONTENT), filename="invoice.txt")
+
+    results = await extract_batch(
+        rag_pipeline_service,
+        [BatchDocumentDto(name="invoice.txt", content_type="text/plain", file=file)],
+    )
+
+    result = results["invoice.txt"]
+    assert result.status == 200
+    assert result.key == S3FileEntity(ext=".txt", content=CONTENT).key
+    assert "9028" in result.result["markup"]
+    assert await files_service.download_file(result.key) == ("invoice.txt", CONTENT)
+
+
+async def test_batch_downloads_stored_files_on_cache_misses_only(
+    rag_pipeline_service: RAGPipelineService,
+    files_service: FilesService,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    key = await files_service.upload_file("invoice", ".txt", CONTENT)
+    downloads = []
+    download_file = files_service.download_file
+
+    async def count_downloads(key: str) -> tuple[str, bytes]:
+        downloads.append(key)
+        return await download_file(key)
+
+    monkeypatch.setattr(files_service, "download_file", count_downloads)
+
+    for _ in range(2):
+        results = await extract_batch(
+            rag_pipeline_service, [BatchDocumentDto(name=key, key=key)]
+        )
+        assert results[key].status == 200
+        assert "9028" in results[key].result["markup"]
+
+    assert downloads == [key]
+
+
+async def test_batch_reports_unknown_keys(
+    rag_pipeline_service: RAGPipelineService,
+) -> None:
+    results = await extract_batch(
+        rag_pipeline_service,
+        [BatchDocumentDto(name="unknown.pdf", key="unknown.pdf")],
+    )
+
+    assert results["unknown.pdf"].status == 404
+    assert results["unknown.pdf"].error == "File unknown.pdf not found"
+
+
+class ScriptedBackend(LLMBackend):
+    """
+    Backend streaming a fixed output in chunks of `chunk_size` characters.
+    """
+
+    def __init__(self, output: str, chunk_size: int) -> None:
+        super().__init__("scripted")
+        self._output = output
+        self._chunk_size = chunk_size
+
+    async def generate(
+        self, prompt: str, output_schema: dict[str, Any], **kwargs: Any
+    ) -> str:
+        return self._output
+
+    async def stream(
+        self, prompt: str, output_schema: dict[str, Any], **kwargs: Any
+    ) -> AsyncIterator[str]:
+        for start in range(0, len(self._output), self._chunk_size):
+            yield self._output[start : start + self._chunk_size]
+
+
+INVOICE_SCHEMA = JsonSchemaEntity.model_validate(
+    {
+        "name": "invoice",
+        "type": "object",
+        "required": True,
+        "description": "",
+        "properties": [
+            {"name": "number", "type": "string", "required": True, "description": ""},
+            {"name": "total", "type": "number", "required": True, "description": ""},
+            {"name": "notes", "type": "string", "required": True, "description": ""},
+        ],
+    }
+)
+
+OUTPUT = '{"number": "9028", "total": 120.5, "notes": "paid"}'
+
+
+@pytest.fixture
+def streaming_service(
+    files_service: FilesService, s3_client: AsyncS3Client
+) -> Iterator[Callable[[LLMBackend], RAGPipelineService]]:
+    pools = [
+        WorkerPool(WorkerPoolConfig(name=name, kind=kind, max_workers=2, max_queue=8))
+        for name, kind in [("ocr", "thread"), ("llm", "async"), ("embedding", "thread")]
+    ]
+    # Shared across the services, as replicas share the stored extractions
+    extractions_collection = ExtractionsCollection()
+
+    def create(backend: LLMBackend) -> RAGPipelineService:
+        return RAGPipelineService(
+            files_service,
+            s3_client,
+            OCRCacheService(OCRResultsCollection(), version="test", max_entries=8),
+            SchemaCacheService(max_entries=8),
+            extractions_collection,
+            RetrievalService(pools[2], max_documents=8),
+            ModelRouterService(),
+            ocr_pool=pools[0],
+            llm_pool=pools[1],
+            llm_backends={LLMBackendType.STUB: backend},
+        )
+
+    yield create
+    for pool in pools:
+        pool.shutdown()
+
+
+async def extract_stream(service: RAGPipelineService) -> list[PipelineEventDto]:
+    return [
+        event
+        async for event in service.extract_stream(
+            "invoice.txt",
+            "text/plain",
+            CONTENT,
+            INVOICE_SCHEMA,
+            llm_backend=LLMBackendType.STUB,
+        )
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7])
+async def test_stream_yields_the_complete_fields_so_far(
+    streaming_service: Callable[[LLMBackend], RAGPipelineService], chunk_size: int
+) -> None:
+    events = await extract_stream(
+        streaming_service(ScriptedBackend(OUTPUT, chunk_size))
+    )
+
+    # Incomplete strings and numbers still generating digits are left out
+    assert [event.data for event in events if event.event == PipelineEvent.PARTIAL] == [
+        {"number": "9028"},
+        {"number": "9028", "total": 120.5},
+        {"number": "9028", "total": 120.5, "notes": "paid"},
+    ]
+    assert events[-1].event == PipelineEvent.RESULT
+    assert events[-1].data == {"number": "9028", "total": 120.5, "notes": "paid"}
+
+
+async def test_stream_skips_partial_outputs_not_matching_the_schema(
+    streaming_service: Callable[[LLMBackend], RAGPipelineService],
+) -> None:
+    output = '{"number": "9028", "total": "unknown", "notes": "paid"}'
+
+    events = await extract_stream(streaming_service(ScriptedBackend(output, 4)))
+
+    assert [event.data for event in events if event.event == PipelineEvent.PARTIAL] == [
+        {"number": "9028"}
+    ]
+    assert events[-1].event == PipelineEvent.ERROR
+    assert events[-1].status == 500
+
+
+async def test_stream_reuses_stored_extractions(
+    streaming_service: Callable[[LLMBackend], RAGPipelineService],
+) -> None:
+    await extract_stream(streaming_service(ScriptedBackend(OUTPUT, 4)))
+
+    events = await extract_stream(streaming_service(ScriptedBackend("{}", 4)))
+
+    assert [(event.event, event.cached) for event in events] == [
+        (PipelineEvent.RESULT, True)
+    ]
+    assert events[0].data == {"number": "9028", "total": 120.5, "notes": "paid"}
@@ -0,0 +1,149 @@
+from typing import Iterator
+import numpy as np
+import pytest
+
+from src.infrastructure.workers import WorkerPool, WorkerPoolConfig
+from src.services import retrieval_service as retrieval_module
+from src.services.retrieval_service import (
+    CHUNK_SEPARATOR,
+    RetrievalService,
+    chunk_text,
+)
+
+VOCABULARY = ["invoice", "total", "date"]
+
+LINES = [
+    "invoice number 9028",
+    "lorem ipsum dolor sit",
+    "total amount 120.50",
+    "lorem ipsum dolor sit",
+    "due date 2024-09-27",
+]
+TEXT = "\n".join(LINES)
+
+
+def embed(model_name: str, texts: list[str]) -> np.ndarray:
+    """
+    Bag of words over `VOCABULARY`, so chunks only match queries sharing their words.
+    """
+    embeddings = np.asarray(
+        [[text.split().count(word) for word in VOCABULARY] for text in texts],
+        dtype=np.float32,
+    )
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+
+@pytest.fixture
+def embedded(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    calls: list[list[str]] = []
+
+    def embed_texts(model_name: str, texts: list[str]) -> np.ndarray:
+        calls.append(texts)
+        return embed(model_name, texts)
+
+    monkeypatch.setattr(retrieval_module, "embed_texts", embed_texts)
+    monkeypatch.setattr(retrieval_module, "embed_queries", embed)
+    # One line per chunk
+    monkeypatch.setattr(retrieval_module, "RAG_CHUNK_SIZE", 24)
+    monkeypatch.setattr(retrieval_module, "RAG_CHUNK_OVERLAP", 0)
+    monkeypatch.setattr(retrieval_module, "RAG_CONTEXT_MAX_CHARS", 50)
+    monkeypatch.setattr(retrieval_module, "RAG_TOP_K", 1)
+    return calls
+
+
+@pytest.fixture
+def retrieval_service(embedded: list[list[str]]) -> Iterator[RetrievalService]:
+    pool = WorkerPool(
+        WorkerPoolConfig(name="embedding", kind="thread", max_workers=1, max_queue=8)
+    )
+    yield RetrievalService(pool, max_documents=1)
+    pool.shutdown()
+
+
+def test_chunks_pack_whole_lines_with_overlap() -> None:
+    text = "\n".join(f"line {i:02d}" for i in range(7))
+
+    assert chunk_text(text, 24, 8) == [
+        "line 00\nline 01\nline 02",
+        "line 02\nline 03\nline 04",
+        "line 04\nline 05\nline 06",
+    ]
+    assert chunk_text(text, 24, 0) == [
+        "line 00\nline 01\nline 02",
+        "line 03\nline 04\nline 05",
+        "line 06",
+    ]
+
+
+def test_lines_longer_than_a_chunk_are_split() -> None:
+    assert chunk_text("x" * 50 + "\nend", 20, 0) == [
+        "x" * 20,
+        "x" * 20,
+        "x" * 10 + "\nend",
+    ]
+
+
+def test_blank_chunks_are_dropped() -> None:
+    assert chunk_text("a\n\n\nb", 100, 0) == ["a\n\n\nb"]
+    assert chunk_text("\n\n  \n", 2, 0) == []
+
+
+async def test_short_documents_are_not_retrieved(
+    retrieval_service: RetrievalService, embedded: list[list[str]]
+) -> None:
+    assert await retrieval_service.retrieve("invoice 9028", ["invoice", "total"]) == [
+        "invoice 9028",
+        "invoice 9028",
+    ]
+    assert await retrieval_service.retrieve(
+        "invoice 9028", ["invoice", "total"], merge=True
+    ) == ["invoice 9028"]
+    assert embedded == []
+
+
+async def test_top_k_chunks_are_retrieved_per_query(
+    retrieval_service: RetrievalService,
+) -> None:
+    assert await retrieval_service.retrieve(TEXT, ["invoice", "date"]) == [
+        LINES[0],
+        LINES[4],
+    ]
+
+
+async def test_top_k_chunks_are_kept_in_document_order(
+    retrieval_service: RetrievalService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(retrieval_module, "RAG_TOP_K", 2)
+
+    assert await retrieval_service.retrieve(TEXT, ["date total"]) == [
+        LINES[2] + CHUNK_SEPARATOR + LINES[4]
+    ]
+
+
+async def test_merged_chunks_fit_the_context_size(
+    retrieval_service: RetrievalService, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(retrieval_module, "RAG_CONTEXT_MAX_CHARS", 60)
+    assert await retrieval_service.retrieve(TEXT, ["date", "invoice"], merge=True) == [
+        LINES[0] + CHUNK_SEPARATOR + LINES[4]
+    ]
+
+    # The best ranked chunk of the first query is kept over the others
+    monkeypatch.setattr(retrieval_module, "RAG_CONTEXT_MAX_CHARS", 30)
+    assert await retrieval_service.retrieve(TEXT, ["date", "invoice"], merge=True) == [
+        LINES[4]
+    ]
+
+
+async def test_indexes_of_recent_documents_are_reused(
+    retrieval_service: RetrievalService, embedded: list[list[str]]
+) -> None:
+    await retrieval_service.retrieve(TEXT, ["invoice"])
+    await retrieval_service.retrieve(TEXT, ["total"])
+    assert embedded == [LINES]
+
+    other = TEXT.replace("9028", "9029")
+    await retrieval_service.retrieve(other, ["invoice"])
+    await retrieval_service.retrieve(TEXT, ["invoice"])
+    assert len(embedded) == 3
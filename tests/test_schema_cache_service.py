@@ -0,0 +1,80 @@
+import pytest
+from pydantic import ValidationError
+
+from src.entities.json_schema_entity import JsonSchemaEntity
+from src.services.schema_cache_service import SchemaCacheService
+
+
+def create_schema(description: str = "Invoice document data") -> JsonSchemaEntity:
+    return JsonSchemaEntity.model_validate(
+        {
+            "name": "invoice",
+            "type": "object",
+            "required": True,
+            "description": description,
+            "properties": [
+                {
+                    "name": "invoice_number",
+                    "type": "string",
+                    "required": True,
+                    "description": "Number of the invoice",
+                },
+                {
+                    "name": "total",
+                    "type": "number",
+                    "required": False,
+                    "description": "Total amount of the invoice",
+                },
+            ],
+        }
+    )
+
+
+def test_schemas_are_compiled_once() -> None:
+    cache = SchemaCacheService(max_entries=4)
+
+    compiled = cache.get("schema", create_schema())
+
+    assert cache.get("schema", create_schema()) is compiled
+    invoice = compiled.model.model_validate({"invoice_number": "9028", "total": None})
+    assert invoice.invoice_number == "9028"
+    with pytest.raises(ValidationError):
+        compiled.model.model_validate({"invoice_number": None, "total": 1})
+    assert (
+        compiled.partial_model.model_validate({}).model_dump(exclude_unset=True) == {}
+    )
+    assert "Number of the invoice" in compiled.metadata
+
+
+def test_changed_schemas_are_compiled_again() -> None:
+    cache = SchemaCacheService(max_entries=4)
+
+    compiled = cache.get("schema", create_schema())
+
+    assert cache.get("schema", create_schema("Updated invoice")) is not compiled
+    assert cache.get("other", create_schema()) is not compiled
+
+
+def test_invalidate_drops_every_version_of_the_schema() -> None:
+    cache = SchemaCacheService(max_entries=4)
+    compiled = cache.get("schema", create_schema())
+    updated = cache.get("schema", create_schema("Updated invoice"))
+    other = cache.get("other", create_schema())
+
+    cache.invalidate("schema")
+
+    assert cache.get("schema", create_schema()) is not compiled
+    assert cache.get("schema", create_schema("Updated invoice")) is not updated
+    assert cache.get("other", create_schema()) is other
+
+
+def test_least_recently_used_schemas_are_evicted() -> None:
+    cache = SchemaCacheService(max_entries=2)
+    first = cache.get("first", create_schema())
+    second = cache.get("second", create_schema())
+    assert cache.get("first", create_schema()) is first
+
+    cache.get("third", create_schema())
+
+    assert cache.get("first", create_schema()) is first
+    assert cache.get("second", create_schema()) is not second
@@ -0,0 +1,84 @@
+import pytest
+
+from src.dtos.ocr_file_dto import OCRFileDto
+from src.enums.ocr_file_type import OCRFileType
+from src.enums.ocr_output_format import OCROutputFormat
+from src.services.ocr.format_markup import format_markup
+from src.services.ocr.strategies import txt_strategy
+from src.services.ocr.strategies.txt_strategy import ENCODING_SAMPLE_SIZE, TXTStrategy
+
+TEXT = "Descrição do serviço\r\nmanutenção preventiva\n\ncorreção de avarias\n"
+
+
+def extract(content: bytes, delimiter: str | None = None) -> str:
+    markup = TXTStrategy(delimiter).execute(
+        OCRFileDto(content=content, type=OCRFileType.TXT)
+    )
+    return format_markup(markup, OCROutputFormat.TEXT)
+
+
+def test_small_content_is_sampled_whole() -> None:
+    assert TXTStrategy()._sample(b"abc\ndef") == b"abc\ndef"
+
+
+def test_sample_is_cut_at_the_last_line_break() -> None:
+    content = b"a" * 99 + b"\n"
+    content *= ENCODING_SAMPLE_SIZE // len(content) + 1
+
+    sample = TXTStrategy()._sample(content)
+
+    assert len(sample) <= ENCODING_SAMPLE_SIZE
+    assert sample.endswith(b"\n")
+    assert len(sample) % len(b"a" * 99 + b"\n") == 0
+
+
+def test_sample_keeps_the_whole_utf_16_line_break() -> None:
+    content = ("a" * 99 + "\n").encode("utf_16_le") * 400
+
+    sample = TXTStrategy()._sample(content)
+
+    assert sample.endswith("\n".encode("utf_16_le"))
+    assert len(sample) % 2 == 0
+
+
+@pytest.mark.parametrize("character", ["ç", "€", "😀"])
+def test_sample_without_line_breaks_drops_a_split_character(character: str) -> None:
+    content = ("a" + character * ENCODING_SAMPLE_SIZE).encode("utf-8")
+
+    sample = TXTStrategy()._sample(content)
+
+    assert len(sample) <= ENCODING_SAMPLE_SIZE
+    assert sample.decode("utf-8") == "a" + character * (
+        (len(sample) - 1) // len(character.encode("utf-8"))
+    )
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+@pytest.mark.parametrize("encoding", ["utf-8", "utf_16_le"])
+def test_lines_are_decoded_across_chunks(
+    chunk_size: int, encoding: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Split multibyte characters and `\r\n` line breaks between chunks
+    monkeypatch.setattr(txt_strategy, "DECODE_CHUNK_SIZE", chunk_size)
+
+    lines = list(TXTStrategy()._iter_lines(TEXT.encode(encoding), encoding))
+
+    assert lines == [
+        "Descrição do serviço",
+        "manutenção preventiva",
+        "",
+        "correção de avarias",
+    ]
+
+
+@pytest.mark.parametrize("encoding", ["utf-8", "utf_8_sig", "utf_16"])
+def test_encoding_is_detected(encoding: str) -> None:
+    assert extract(TEXT.encode(encoding)) == (
+        "Descrição do serviço\nmanutenção preventiva\n\ncorreção de avarias"
+    )
+
+
+def test_records_keep_quoted_line_breaks() -> None:
+    content = 'item;notes\n"filtro";"troca\r\nmensal"\n'.encode("utf-8")
+
+    assert extract(content, ";") == "item notes\nfiltro troca mensal"
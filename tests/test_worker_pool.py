@@ -0,0 +1,103 @@
+import asyncio
+import os
+import threading
+from typing import Iterator
+import pytest
+
+from src.infrastructure.workers import (
+    PoolSaturatedException,
+    PoolUnavailableException,
+    WorkerPool,
+    WorkerPoolConfig,
+)
+
+
+@pytest.fixture
+def pool() -> Iterator[WorkerPool]:
+    pool = WorkerPool(
+        WorkerPoolConfig(
+            name="ocr", kind="thread", max_workers=1, max_queue=1, retry_after=7
+        )
+    )
+    yield pool
+    pool.shutdown()
+
+
+async def test_tasks_above_the_queue_are_rejected(pool: WorkerPool) -> None:
+    release = threading.Event()
+    running = [asyncio.create_task(pool.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert (pool.stats().running, pool.stats().queued) == (1, 1)
+
+    with pytest.raises(PoolSaturatedException) as ex:
+        await pool.run(release.wait)
+    assert ex.value.status_code == 429
+    assert ex.value.headers == {"Retry-After": "7"}
+
+    release.set()
+    assert await asyncio.gather(*running) == [True, True]
+    # Admitted again once the pool has capacity
+    assert await pool.run(pow, 2, 3) == 8
+
+    stats = pool.stats()
+    assert (stats.running, stats.queued) == (0, 0)
+    assert (stats.completed_total, stats.rejected_total) == (3, 1)
+
+
+async def test_streams_holding_a_worker_count_towards_the_capacity(
+    pool: WorkerPool,
+) -> None:
+    async with pool.acquire():
+        queued = asyncio.create_task(pool.run(pow, 2, 3))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(PoolSaturatedException):
+            async with pool.acquire():
+                pass
+
+    assert await queued == 8
+
+
+async def test_cancelled_queued_tasks_leave_the_queue(pool: WorkerPool) -> None:
+    release = threading.Event()
+    running = asyncio.create_task(pool.run(release.wait))
+    queued = asyncio.create_task(pool.run(pow, 2, 3))
+    await asyncio.sleep(0.05)
+
+    queued.cancel()
+    await asyncio.sleep(0)
+    assert pool.stats().queued == 0
+
+    # The freed queue slot admits another task
+    admitted = asyncio.create_task(pool.run(pow, 2, 3))
+    await asyncio.sleep(0.05)
+    release.set()
+    assert await admitted == 8
+    assert await running is True
+
+
+async def test_failed_tasks_release_their_worker(pool: WorkerPool) -> None:
+    with pytest.raises(ZeroDivisionError):
+        await pool.run(divmod, 1, 0)
+
+    assert await pool.run(pow, 2, 3) == 8
+    assert pool.stats().failed_total == 1
+
+
+async def test_crashed_process_workers_make_the_pool_unavailable() -> None:
+    pool = WorkerPool(
+        WorkerPoolConfig(
+            name="ocr", kind="process", max_workers=1, max_queue=1, retry_after=7
+        )
+    )
+    try:
+        # The worker process exits without a result, as when killed for running out of memory
+        with pytest.raises(PoolUnavailableException) as ex:
+            await pool.run(os._exit, 1)
+        assert ex.value.status_code == 503
+        assert ex.value.headers == {"Retry-After": "7"}
+
+        # The broken executor is replaced for the next tasks
+        assert await pool.run(pow, 2, 3) == 8
+    finally:
+        pool.shutdown()